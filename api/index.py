@@ -4,4 +4,6 @@ import sys
 # Add the project root to the Python path
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
+# Serverless: set MODEL_WORKER_URL to a running model worker (python -m src.backend.model_worker)
+# so this function only imports the API layer; ASR, translation and grammar run there.
 from src.backend.app import app
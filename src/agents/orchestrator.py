@@ -4,62 +4,137 @@ Simple orchestrator that ties ASR -> translate -> LLM -> TTS -> feedback
 Returns structured dict suitable for frontends.
 """
 import os
+import asyncio
 from pathlib import Path
-from ..backend import asr, tts, translator, llm_helper, feedback
+from ..backend.config import settings
+if settings.stub_backends:
+    # Model-free pipeline for load tests (see backend/stubs.py)
+    from ..backend.stubs import asr, tts, translator, llm_helper, feedback
+elif settings.model_worker_url:
+    # Slim mode: models run in the model worker (see backend/remote.py)
+    from ..backend.remote import asr, translator, feedback
+    from ..backend import tts, llm_helper
+else:
+    from ..backend import asr, tts, translator, llm_helper, feedback
+from ..backend.audio_store import audio_url
+from ..backend.janitor import JANITOR
+from ..backend.context import CONTEXT, DEFAULT_SESSION
+from ..backend.phrasebook import PHRASEBOOK
+from ..backend.quality import QUALITY, QualityProfile
+from ..backend.deadline import Deadline
+from ..backend.exceptions import AudioDecodeException, DeadlineException
 import uuid
+from typing import Callable, Optional
 from ..backend.logger import app_logger
 from langdetect import detect
 
-MEMORY_FILE = Path("memory.json")
+def _report(progress: Optional[Callable[[str], None]], stage: str) -> None:
+    # Progress hook used by the job API; stages: asr, grammar, phrasebook, llm, tts
+    if progress:
+        progress(stage)
 
-import json
-
-async def _process_text(user_text: str, detected_lang: str, target_lang: str) -> dict:
+async def _process_text(user_text: str, detected_lang: str, target_lang: str, session_id: Optional[str] = None,
+                        progress: Optional[Callable[[str], None]] = None,
+                        profile: Optional[QualityProfile] = None, deadline: Optional[Deadline] = None) -> dict:
     """
     Core logic for processing text:
     - Grammar check (if target lang)
     - LLM response
-    - TTS generation
+    - TTS generation (engine chain and voice from the quality profile)
+    Once the deadline passes (or the client disconnects) the remaining stages
+    are skipped and what is done so far comes back with partial=True.
+    Without a session id (or with the shared default one) there is no history:
+    it would leak between users.
     """
+    remember = bool(session_id) and session_id != DEFAULT_SESSION
+    profile = profile or QUALITY.select()
+    deadline = deadline or Deadline()
     reply_text = ""
     grammar_matches = []
     
     try:
         if detected_lang == target_lang:
-            # Check grammar
-            grammar_matches = feedback.grammar_correct(user_text, lang=target_lang)
-            # Reply
-            reply_text = llm_helper.get_chat_response(user_text, context=f"User is practicing {target_lang}.")
+            # Off the event loop: with a shared store this is a network round-trip
+            context = ""
+            if remember:
+                context = await deadline.run("context", asyncio.to_thread(CONTEXT.build, session_id, target_lang))
+            single = None
+            if settings.llm_single_pass:
+                # One structured call for reply + corrections; LanguageTool only as fallback
+                _report(progress, "llm")
+                single = await deadline.call("llm", llm_helper.chat_with_corrections, user_text, target_lang,
+                                             context=context)
+            if single:
+                reply_text = single["reply"]
+                if single["grammar"] is not None:
+                    grammar_matches = single["grammar"]
+                else:
+                    _report(progress, "grammar")
+                    grammar_matches = await deadline.call("grammar", feedback.grammar_correct, user_text,
+                                                          lang=target_lang)
+            else:
+                # Check grammar
+                _report(progress, "grammar")
+                grammar_matches = await deadline.call("grammar", feedback.grammar_correct, user_text,
+                                                      lang=target_lang)
+                # Reply
+                _report(progress, "llm")
+                reply_text = await deadline.call("llm", llm_helper.get_chat_response, user_text, context=context)
         else:
-            # Translate/Explain
-            reply_text = llm_helper.explain_in_target_lang(user_text, target_lang=target_lang)
+            # Translate/Explain; everyday phrases come straight from the phrasebook
+            match = PHRASEBOOK.lookup(user_text, target_lang) if settings.phrasebook_enabled else None
+            if match:
+                _report(progress, "phrasebook")
+                app_logger.info(f"Phrasebook hit '{match['id']}' (score {match['score']})")
+                reply_text = match["answer"]
+            else:
+                _report(progress, "llm")
+                reply_text = await deadline.call("llm", llm_helper.explain_in_target_lang, user_text,
+                                                 target_lang=target_lang)
             
         app_logger.info(f"Bot reply: {reply_text}")
         
         # TTS
+        _report(progress, "tts")
         out_filename = f"response_{uuid.uuid4().hex}.mp3"
         out_path = os.path.join("temp", out_filename)
         os.makedirs("temp", exist_ok=True)
         
-        # Async TTS call
-        await tts.synthesize_to_file(reply_text, out_path, lang=target_lang)
+        # Async TTS call (engine may pick a different extension)
+        out_path = await deadline.run("tts", tts.synthesize_to_file(reply_text, out_path, lang=target_lang,
+                                                                     engines=profile.tts_chain(),
+                                                                     voice=profile.tts_voice(target_lang)))
+        JANITOR.register(out_path)
         
-        # store memory (append)
-        memory = []
-        if MEMORY_FILE.exists():
-            try:
-                memory = json.loads(MEMORY_FILE.read_text())
-            except Exception:
-                memory = []
-        memory.append({"user": user_text, "reply": reply_text, "lang": target_lang})
-        MEMORY_FILE.write_text(json.dumps(memory[-20:], ensure_ascii=False, indent=2))
+        # store memory (summarization of old turns happens in the background)
+        if remember:
+            await CONTEXT.record_async(session_id, user_text, reply_text, target_lang)
 
         return {
             "user_text": user_text,
             "detected_lang": detected_lang,
             "reply_text": reply_text,
             "reply_audio_path": out_path,
-            "grammar_matches": grammar_matches
+            "reply_audio_url": audio_url(out_path),
+            "grammar_matches": grammar_matches,
+            "quality": profile.name
+        }
+    except DeadlineException as e:
+        app_logger.warning(f"Returning partial result: {e}")
+        if remember and reply_text and deadline.reason != "disconnected":
+            # The client still gets this reply, so the conversation history should have it too
+            await CONTEXT.record_async(session_id, user_text, reply_text, target_lang)
+        return {
+            "user_text": user_text,
+            "detected_lang": detected_lang,
+            "reply_text": reply_text,
+            "reply_audio_path": None,
+            "reply_audio_url": None,
+            "grammar_matches": grammar_matches,
+            "quality": profile.name,
+            "partial": True,
+            "cut_at": deadline.stage,
+            "cut_reason": deadline.reason
         }
     except Exception as e:
         app_logger.error(f"Processing error: {e}")
@@ -69,19 +144,34 @@ async def _process_text(user_text: str, detected_lang: str, target_lang: str) ->
             "detected_lang": detected_lang,
             "reply_text": reply_text if reply_text else f"Error: {e}",
             "reply_audio_path": None,
-            "grammar_matches": grammar_matches
+            "reply_audio_url": None,
+            "grammar_matches": grammar_matches,
+            "quality": profile.name
         }
 
-async def handle_audio_interaction(audio_path: str, user_lang_hint: str = None, target_lang: str = "de"):
+async def handle_audio_interaction(audio_path: str, user_lang_hint: str = None, target_lang: str = "de",
+                                   session_id: Optional[str] = None, progress: Optional[Callable[[str], None]] = None,
+                                   long_audio: bool = False, quality: Optional[str] = None, audio=None,
+                                   deadline: Optional[Deadline] = None):
+    # audio: upload held in memory, raw bytes or decoded (audio_path is then just its name)
+    deadline = deadline or Deadline()
     try:
-        tr = asr.transcribe(audio_path, lang_hint=user_lang_hint)
+        # Requested profile (or the default), stepped down under load
+        profile = QUALITY.select(quality)
+        _report(progress, "asr")
+        # Blocking decode runs in a worker thread so replicas can work in parallel
+        tr = await deadline.run("asr", asyncio.to_thread(
+            asr.transcribe, audio_path, lang_hint=user_lang_hint, long_audio=long_audio,
+            model_size=profile.whisper_model, beam_size=profile.asr_beam_size, audio=audio))
         user_text = tr["text"]
         detected = tr.get("lang", None)
         
         app_logger.info(f"Audio User said ({detected}): {user_text}")
         
-        return await _process_text(user_text, detected, target_lang)
+        return await _process_text(user_text, detected, target_lang, session_id, progress, profile, deadline)
         
+    except (DeadlineException, AudioDecodeException):
+        raise  # nothing usable yet (no transcript); the API answers 504 / 400
     except Exception as e:
         app_logger.error(f"Orchestrator audio error: {e}")
         return {
@@ -89,11 +179,15 @@ async def handle_audio_interaction(audio_path: str, user_lang_hint: str = None,
             "detected_lang": "unknown",
             "reply_text": f"Error: {e}",
             "reply_audio_path": None,
+            "reply_audio_url": None,
             "grammar_matches": []
         }
 
-async def handle_text_interaction(user_text: str, target_lang: str = "de"):
+async def handle_text_interaction(user_text: str, target_lang: str = "de", session_id: Optional[str] = None,
+                                  progress: Optional[Callable[[str], None]] = None, quality: Optional[str] = None,
+                                  deadline: Optional[Deadline] = None):
     try:
+        profile = QUALITY.select(quality)
         # Detect language
         try:
             detected = detect(user_text)
@@ -102,7 +196,7 @@ async def handle_text_interaction(user_text: str, target_lang: str = "de"):
             
         app_logger.info(f"Text User said ({detected}): {user_text}")
         
-        return await _process_text(user_text, detected, target_lang)
+        return await _process_text(user_text, detected, target_lang, session_id, progress, profile, deadline)
 
     except Exception as e:
         app_logger.error(f"Orchestrator text error: {e}")
@@ -111,14 +205,18 @@ async def handle_text_interaction(user_text: str, target_lang: str = "de"):
             "detected_lang": "unknown",
             "reply_text": f"Error: {e}",
             "reply_audio_path": None,
+            "reply_audio_url": None,
             "grammar_matches": []
         }
 
 if __name__ == "__main__":
     # basic local test
-    import sys
-    import asyncio
-    if len(sys.argv) < 2:
-        print("Usage: python orchestrator.py sample.wav")
-    else:
-        print(asyncio.run(handle_audio_interaction(sys.argv[1])))
+    import argparse
+    parser = argparse.ArgumentParser(description="Run one audio interaction")
+    parser.add_argument("audio")
+    parser.add_argument("--target-lang", default="de")
+    parser.add_argument("--long", action="store_true", help="Parallel chunked ASR for long recordings")
+    parser.add_argument("--quality", choices=["fast", "balanced", "accurate"], default=None)
+    args = parser.parse_args()
+    print(asyncio.run(handle_audio_interaction(args.audio, target_lang=args.target_lang, long_audio=args.long,
+                                               quality=args.quality)))
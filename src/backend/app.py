@@ -1,11 +1,24 @@
-from fastapi import FastAPI, UploadFile, File, HTTPException, Form
+from fastapi import FastAPI, UploadFile, File, HTTPException, Form, Request, Query
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, FileResponse, Response, StreamingResponse
+from typing import Optional
 from pydantic import BaseModel
 import uvicorn
+import asyncio
+import json
 import os
+import sys
 import tempfile
 import uuid
 from pathlib import Path
+from .config import settings
+from .janitor import JANITOR
+from .jobs import JOBS
+from .scheduler import SCHEDULER, INTERACTIVE, BULK, estimate_text_cost, estimate_audio_cost, audio_duration
+from .exceptions import AudioDecodeException, DeadlineException, OverloadedException
+from .deadline import Deadline
+from .response_format import JSONGZipMiddleware, reply_response
+from .quality import QUALITY, PROFILES
 
 app = FastAPI(title="Multilingual Chatbot API", version="1.0.0")
 
@@ -15,7 +28,10 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "Content-Range", "Accept-Ranges"],
 )
+# Compresses JSON/text bodies; audio and binary chat replies are sent as-is
+app.add_middleware(JSONGZipMiddleware, minimum_size=1000)
 
 @app.get("/")
 async def root():
@@ -23,107 +39,107 @@ async def root():
 
 @app.on_event("startup")
 async def startup_event():
-    from .utils import cleanup_temp_files
-    # Clean up files older than 24 hours
-    cleanup_temp_files("temp", max_age_hours=24)
-    cleanup_temp_files("uploads", max_age_hours=24)
+    # Index leftovers once, evict expired/over-budget files, then sweep on a schedule
+    JANITOR.bootstrap()
+    JANITOR.sweep()
+    app.state.janitor_task = asyncio.create_task(JANITOR.run(settings.janitor_interval_seconds))
+
+    # Warm models in a worker thread so /health stays responsive meanwhile
+    from . import warmup
+    if settings.warmup_enabled and not settings.stub_backends:
+        stages = warmup.parse_stages(settings.warmup_stages)
+        if settings.model_worker_url:
+            stages = warmup.slim_stages(stages)
+        app.state.warmup_task = asyncio.create_task(asyncio.to_thread(warmup.run_warmup, stages))
+    else:
+        warmup.mark_skipped()
 
 @app.get("/health")
 async def health():
     return {"success": True, "data": {"status": "ok", "version": "1.0.0"}}
 
-@app.post("/chat_audio")
-async def chat_audio(file: UploadFile = File(...), target_lang: str = Form("de")):
-    try:
-        # Save uploaded file
-        upload_dir = Path("uploads")
-        upload_dir.mkdir(exist_ok=True)
-        
-        file_path = upload_dir / f"{uuid.uuid4().hex}{Path(file.filename).suffix}"
-        with open(file_path, "wb") as f:
-            content = await file.read()
-            f.write(content)
-        
-        # Process with orchestrator
-        try:
-            from ..agents.orchestrator import handle_audio_interaction
-            result = await handle_audio_interaction(str(file_path), target_lang=target_lang)
-        except Exception as e:
-            # Fallback response
-            result = {
-                "user_text": "",
-                "detected_lang": "",
-                "reply_text": f"Error: {str(e)}",
-                "reply_audio_path": None,
-                "grammar_matches": []
-            }
-        
-        # Cleanup
-        if file_path.exists():
-            file_path.unlink()
-        
-        return {"success": True, "data": result}
-        
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Processing failed: {str(e)}")
+@app.get("/ready")
+async def ready():
+    # Liveness is /health; readiness waits for the startup warmup to finish without a required stage failing
+    from .warmup import WARMUP_STATE, is_ready
+    body = {"success": is_ready(), "data": WARMUP_STATE}
+    return JSONResponse(body, status_code=200 if is_ready() else 503)
 
-class TextRequest(BaseModel):
-    text: str
-    target_lang: str = "de"
+@app.get("/stats")
+async def stats():
+    data = {"janitor": JANITOR.stats(), "jobs": JOBS.stats(), "scheduler": SCHEDULER.stats(),
+            "quality": QUALITY.stats()}
+    # Only report model pools that are already loaded; never import them from here
+    asr = sys.modules.get(f"{__package__}.asr")
+    if asr is not None:
+        data["asr"] = asr.pool_stats()
+    phrasebook = sys.modules.get(f"{__package__}.phrasebook")
+    if phrasebook is not None:
+        data["phrasebook"] = phrasebook.PHRASEBOOK.stats()
+    store = sys.modules.get(f"{__package__}.store")
+    if store is not None:
+        data["store"] = store.STORE.stats()
+    decoder = sys.modules.get(f"{__package__}.audio_decode")
+    if decoder is not None:
+        data["audio_decode"] = decoder.DECODER.stats()
+    remote = sys.modules.get(f"{__package__}.remote")
+    if remote is not None:
+        data["model_worker"] = remote.stats()
+    cache = sys.modules.get(f"{__package__}.transcription_cache")
+    if cache is not None:
+        data["transcription_cache"] = cache.TRANSCRIPTION_CACHE.stats()
+    return {"success": True, "data": data}
 
-@app.post("/chat_text")
-async def chat_text(request: TextRequest):
-    try:
-from fastapi import FastAPI, UploadFile, File, HTTPException, Form
-from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
-import uvicorn
-import os
-import tempfile
-import uuid
-from pathlib import Path
+def client_id(request: Request) -> str:
+    # Explicit id from trusted frontends, else the peer address
+    return request.headers.get("x-client-id") or (request.client.host if request.client else "anonymous")
 
-app = FastAPI(title="Multilingual Chatbot API", version="1.0.0")
+def new_session_id() -> str:
+    # Clients that send no session_id start a fresh conversation and get its id back to continue it
+    return uuid.uuid4().hex
 
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+def check_quality(quality: Optional[str]) -> Optional[str]:
+    if quality and quality not in PROFILES:
+        raise HTTPException(status_code=422, detail=f"quality must be one of {list(PROFILES)}")
+    return quality or None
 
-@app.get("/")
-async def root():
-    return {"success": True, "message": "Multilingual Chatbot API", "status": "healthy"}
+@app.exception_handler(OverloadedException)
+async def overloaded_handler(request: Request, exc: OverloadedException):
+    return JSONResponse({"success": False, "detail": str(exc)}, status_code=503, headers={"Retry-After": "5"})
 
-@app.on_event("startup")
-async def startup_event():
-    from .utils import cleanup_temp_files
-    # Clean up files older than 24 hours
-    cleanup_temp_files("temp", max_age_hours=24)
-    cleanup_temp_files("uploads", max_age_hours=24)
+@app.exception_handler(DeadlineException)
+async def deadline_handler(request: Request, exc: DeadlineException):
+    return JSONResponse({"success": False, "detail": str(exc)}, status_code=504)
 
-@app.get("/health")
-async def health():
-    return {"success": True, "data": {"status": "ok", "version": "1.0.0"}}
+def request_deadline(request: Request) -> Deadline:
+    # Budget starts when the request is handled; stages are cancelled if the client goes away
+    return Deadline.from_header(request.headers.get("x-request-timeout"), request.is_disconnected)
 
 @app.post("/chat_audio")
-async def chat_audio(file: UploadFile = File(...), target_lang: str = Form("de")):
+async def chat_audio(request: Request, file: UploadFile = File(...), target_lang: str = Form("de"),
+                     session_id: Optional[str] = Form(None), long_audio: bool = Form(False),
+                     quality: Optional[str] = Form(None)):
+    quality = check_quality(quality)
+    session_id = session_id or new_session_id()
+    deadline = request_deadline(request)
     try:
-        # Save uploaded file
-        upload_dir = Path("uploads")
-        upload_dir.mkdir(exist_ok=True)
-        
-        file_path = upload_dir / f"{uuid.uuid4().hex}{Path(file.filename).suffix}"
-        with open(file_path, "wb") as f:
-            content = await file.read()
-            f.write(content)
+        # The upload stays in memory (no temp file); ASR decodes it only on a cache miss,
+        # or the model worker does in slim mode. The WAV header gives the duration cheaply.
+        content = await file.read()
+        name = file.filename or "upload"
+        duration = audio_duration(content)
         
         # Process with orchestrator
         try:
             from ..agents.orchestrator import handle_audio_interaction
-            result = await handle_audio_interaction(str(file_path), target_lang=target_lang)
+            async with SCHEDULER.slot(client_id(request), BULK, estimate_audio_cost(name, duration)):
+                result = await handle_audio_interaction(name, target_lang=target_lang, session_id=session_id,
+                                                        long_audio=long_audio, quality=quality, audio=content,
+                                                        deadline=deadline)
+        except AudioDecodeException as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        except (OverloadedException, DeadlineException):
+            raise
         except Exception as e:
             # Fallback response
             result = {
@@ -131,31 +147,126 @@ async def chat_audio(file: UploadFile = File(...), target_lang: str = Form("de")
                 "detected_lang": "",
                 "reply_text": f"Error: {str(e)}",
                 "reply_audio_path": None,
+                "reply_audio_url": None,
                 "grammar_matches": []
             }
+        result["session_id"] = session_id
         
-        # Cleanup
-        if file_path.exists():
-            file_path.unlink()
-        
-        return {"success": True, "data": result}
+        # JSON by default; Accept: application/msgpack or multipart/mixed inlines the reply audio
+        return await reply_response({"success": True, "data": result}, request.headers.get("accept"))
         
+    except (OverloadedException, DeadlineException, HTTPException):
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Processing failed: {str(e)}")
 
 class TextRequest(BaseModel):
     text: str
     target_lang: str = "de"
+    session_id: Optional[str] = None  # omitted: a new conversation, its id comes back in the reply
+    quality: Optional[str] = None  # fast | balanced | accurate
 
 @app.post("/chat_text")
-async def chat_text(request: TextRequest):
+async def chat_text(request: TextRequest, http_request: Request):
+    check_quality(request.quality)
+    session_id = request.session_id or new_session_id()
+    deadline = request_deadline(http_request)
     try:
         from ..agents.orchestrator import handle_text_interaction
-        result = await handle_text_interaction(request.text, target_lang=request.target_lang)
-        return {"success": True, "data": result}
+        async with SCHEDULER.slot(client_id(http_request), INTERACTIVE, estimate_text_cost(request.text)):
+            result = await handle_text_interaction(request.text, target_lang=request.target_lang,
+                                                   session_id=session_id, quality=request.quality,
+                                                   deadline=deadline)
+        result["session_id"] = session_id
+        return await reply_response({"success": True, "data": result}, http_request.headers.get("accept"))
+    except (OverloadedException, DeadlineException):
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Processing failed: {str(e)}")
 
+@app.post("/jobs", status_code=202)
+async def create_job(
+    request: Request,
+    file: Optional[UploadFile] = File(None),
+    text: Optional[str] = Form(None),
+    target_lang: str = Form("de"),
+    session_id: Optional[str] = Form(None),
+    long_audio: bool = Form(False),
+    quality: Optional[str] = Form(None),
+):
+    """Queue an audio (file) or text interaction and return its job id immediately."""
+    if file is None and not text:
+        raise HTTPException(status_code=422, detail="Provide either an audio file or text")
+    session_id = session_id or new_session_id()
+    payload = {"target_lang": target_lang, "session_id": session_id, "client_id": client_id(request),
+               "quality": check_quality(quality)}
+    if file is not None:
+        upload_dir = Path("uploads")
+        upload_dir.mkdir(exist_ok=True)
+        file_path = upload_dir / f"{uuid.uuid4().hex}{Path(file.filename or '').suffix}"
+        with open(file_path, "wb") as f:
+            f.write(await file.read())
+        JANITOR.register(str(file_path))
+        job = JOBS.submit("audio", {**payload, "audio_path": str(file_path), "long_audio": long_audio})
+    else:
+        job = JOBS.submit("text", {**payload, "text": text})
+    return {"success": True, "data": {"job_id": job.id, "status": job.status, "session_id": session_id}}
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    job = JOBS.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return {"success": True, "data": job.to_dict()}
+
+@app.get("/jobs/{job_id}/events")
+async def job_events(job_id: str):
+    """Server-sent events: one "stage" event per progress step, then "result"."""
+    job = JOBS.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    async def event_stream():
+        async for event in JOBS.stream(job):
+            yield f"event: stage\ndata: {json.dumps(event, ensure_ascii=False)}\n\n"
+        yield f"event: result\ndata: {json.dumps(job.to_dict(), ensure_ascii=False)}\n\n"
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+# Reply audio ids embed a fresh uuid, so the bytes behind a URL never change
+AUDIO_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+@app.get("/audio/{audio_id}")
+async def get_audio(audio_id: str, request: Request, fmt: Optional[str] = Query(None, alias="format")):
+    """
+    Serve synthesized reply audio with ETag/If-None-Match, single byte-range
+    requests and long cache lifetimes. ?format=opus (or Accept: audio/webm)
+    returns a compact Opus/WebM version.
+    """
+    from . import audio_store
+    path = audio_store.find_audio(audio_id)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Audio not found")
+
+    if audio_store.wants_opus(fmt, request.headers.get("accept")):
+        try:
+            path = await asyncio.to_thread(audio_store.opus_version, path)
+            JANITOR.register(str(path))
+        except Exception as e:
+            if fmt:
+                raise HTTPException(status_code=500, detail=f"Opus transcoding failed: {str(e)}")
+            # Accept-negotiated: fall back to the original format
+
+    etag = audio_store.etag_for(path)
+    headers = {"ETag": etag, "Cache-Control": AUDIO_CACHE_CONTROL, "Accept-Ranges": "bytes", "Vary": "Accept"}
+    if audio_store.etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+
+    # FileResponse answers Range/If-Range itself (206, or 416 with Content-Range)
+    # and lets the server use sendfile/pathsend when it supports it
+    return FileResponse(path, media_type=audio_store.media_type(path), headers=headers)
+
 if __name__ == "__main__":
     import argparse
     parser = argparse.ArgumentParser()
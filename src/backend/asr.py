@@ -1,7 +1,11 @@
 import os
+import queue
+import threading
+import time
+from contextlib import contextmanager
 from typing import Optional, Dict
 from tenacity import retry, stop_after_attempt, wait_exponential
-from .exceptions import ASRException
+from .exceptions import ASRException, AudioDecodeException
 from .logger import app_logger
 from .config import settings
 
@@ -19,11 +23,14 @@ try:
 except Exception:
     WHISPER_AVAILABLE = False
 
-def load_model(model_size="small"):
+BEAM_SIZE = 5
+
+def load_model(model_size="small", cpu_threads: int = 0, num_workers: int = 1):
     try:
         if FASTER_AVAILABLE:
-            model = WhisperModel(model_size, device="cpu", compute_type="int8")
-            app_logger.info(f"Loaded faster-whisper model: {model_size}")
+            model = WhisperModel(model_size, device="cpu", compute_type="int8",
+                                 cpu_threads=cpu_threads, num_workers=num_workers)
+            app_logger.info(f"Loaded faster-whisper model: {model_size} (cpu_threads={cpu_threads or 'default'})")
             return ("faster", model)
         if WHISPER_AVAILABLE:
             model = whisper.load_model(model_size)
@@ -34,28 +41,150 @@ def load_model(model_size="small"):
         app_logger.error(f"Failed to load ASR model: {e}")
         raise ASRException(f"ASR model loading failed: {e}")
 
-_BACKEND, _MODEL = load_model(getattr(settings, 'whisper_model', 'tiny'))
+class ASRPool:
+    """
+    A fixed set of model replicas. Each transcription checks out an idle
+    replica, so up to `replicas` transcriptions run in parallel (each using
+    `cpu_threads` threads); further callers wait for one to free up.
+    """
+
+    def __init__(self, model_size: str, replicas: int = 1, cpu_threads: int = 0, num_workers: int = 1,
+                 loader=load_model):
+        self.model_size = model_size
+        self.replicas = max(1, replicas)
+        self.cpu_threads = cpu_threads
+        self._idle: "queue.Queue" = queue.Queue()
+        for _ in range(self.replicas):
+            self._idle.put(loader(model_size, cpu_threads, num_workers))
+        self._lock = threading.Lock()
+        self._created = time.monotonic()
+        self.busy = 0
+        self.requests = 0
+        self.busy_seconds = 0.0
+        self.wait_seconds = 0.0
+
+    @contextmanager
+    def acquire(self):
+        """Yield a (backend, model) replica for exclusive use."""
+        t0 = time.monotonic()
+        replica = self._idle.get()
+        t1 = time.monotonic()
+        with self._lock:
+            self.busy += 1
+            self.requests += 1
+            self.wait_seconds += t1 - t0
+        try:
+            yield replica
+        finally:
+            with self._lock:
+                self.busy -= 1
+                self.busy_seconds += time.monotonic() - t1
+            self._idle.put(replica)
 
-def transcribe(audio_path: str, lang_hint: Optional[str] = None) -> Dict:
+    def stats(self) -> dict:
+        with self._lock:
+            uptime = max(time.monotonic() - self._created, 1e-9)
+            return {
+                "model_size": self.model_size,
+                "replicas": self.replicas,
+                "cpu_threads": self.cpu_threads,
+                "busy": self.busy,
+                "utilization": round(self.busy_seconds / (uptime * self.replicas), 4),
+                "requests": self.requests,
+                "avg_wait_ms": round(1000 * self.wait_seconds / self.requests, 1) if self.requests else 0.0,
+            }
+
+_POOLS: Dict[str, ASRPool] = {}
+_POOLS_LOCK = threading.Lock()  # guards the dicts only; never held while loading
+_CREATE_LOCKS: Dict[str, threading.Lock] = {}
+
+def get_pool(model_size: Optional[str] = None, loader=load_model) -> ASRPool:
+    """
+    The replica pool for a model size, created (and loaded) on first use.
+    Loading holds only that size's lock, so loaded sizes and pool_stats() never wait on it.
+    """
+    model_size = model_size or getattr(settings, 'whisper_model', 'tiny')
+    pool = _POOLS.get(model_size)
+    if pool is not None:
+        return pool
+    with _POOLS_LOCK:
+        create_lock = _CREATE_LOCKS.setdefault(model_size, threading.Lock())
+    with create_lock:
+        pool = _POOLS.get(model_size)
+        if pool is None:
+            pool = ASRPool(model_size, settings.asr_replicas, settings.asr_cpu_threads, settings.asr_num_workers,
+                           loader=loader)
+            with _POOLS_LOCK:
+                _POOLS[model_size] = pool
+        return pool
+
+def pool_stats() -> list:
+    with _POOLS_LOCK:
+        pools = list(_POOLS.values())
+    return [p.stats() for p in pools]
+
+def transcribe(audio_path: str, lang_hint: Optional[str] = None, long_audio: bool = False,
+               model_size: Optional[str] = None, beam_size: Optional[int] = None, audio=None,
+               use_cache: bool = True) -> Dict:
     """
     Transcribe an audio file and return {text: str, segments: list, lang: str}
+    long_audio=True splits the recording at silences and decodes chunks in parallel
+    (always with WHISPER_MODEL). model_size/beam_size come from the quality profile.
+    `audio` is an upload held in memory: raw file bytes (decoded here only on a
+    cache miss) or an already decoded 16 kHz mono float32 array (see audio_decode);
+    audio_path is then only its name. use_cache=False always runs the model
+    (warmup: a cached result would leave the replicas unloaded).
     """
+    beam_size = beam_size or BEAM_SIZE
+    model_size = settings.whisper_model if long_audio else (model_size or settings.whisper_model)
     try:
-        # Convert to absolute path and normalize
-        audio_path = os.path.abspath(audio_path).replace('\\', '/')
-        
-        if not os.path.exists(audio_path):
-            raise ASRException(f"Audio file not found: {audio_path}")
+        if audio is None:
+            # Convert to absolute path and normalize
+            audio_path = os.path.abspath(audio_path).replace('\\', '/')
+
+            if not os.path.exists(audio_path):
+                raise ASRException(f"Audio file not found: {audio_path}")
+
+        cache_key = None
+        if use_cache and settings.transcription_cache_enabled:
+            from .transcription_cache import TRANSCRIPTION_CACHE, array_digest, audio_digest, bytes_digest, make_key
+            options = {"beam_size": BEAM_SIZE if long_audio else beam_size, "long_audio": long_audio}
+            if audio is None:
+                digest = audio_digest(audio_path)
+            else:
+                digest = bytes_digest(audio) if isinstance(audio, bytes) else array_digest(audio)
+            cache_key = make_key(digest, model_size, lang_hint, options)
+            cached = TRANSCRIPTION_CACHE.get(cache_key)
+            if cached is not None:
+                app_logger.info(f"Transcription cache hit for: {audio_path}")
+                return cached
+
+        if audio is None or isinstance(audio, bytes):
+            # In-process decode; the models would otherwise spawn ffmpeg per call
+            from .audio_decode import decode
+            audio = decode(audio_path) if audio is None else decode(audio, audio_path)
+
+        if long_audio:
+            from .long_audio import transcribe_long
+            result = transcribe_long(audio_path, lang_hint=lang_hint, audio=audio)
+            if cache_key:
+                TRANSCRIPTION_CACHE.put(cache_key, result)
+            return result
         
-        if _BACKEND == "faster":
-            model = _MODEL
-            segments, info = model.transcribe(audio_path, language=lang_hint, beam_size=5)
+        with get_pool(model_size).acquire() as (backend, model):
+            if backend == "faster":
+                segments, info = model.transcribe(audio, language=lang_hint, beam_size=beam_size)
+                segments = list(segments)  # decoding is lazy; finish it while we hold the replica
+                result = {"segments": segments, "language": info.language}
+            else:
+                result = model.transcribe(audio, language=lang_hint, beam_size=beam_size)
+
+        if backend == "faster":
+            segments = result["segments"]
             text = " ".join([s.text for s in segments])
             segs = [{"start": s.start, "end": s.end, "text": s.text} for s in segments]
-            result = {"text": text.strip(), "segments": segs, "lang": info.language}
+            result = {"text": text.strip(), "segments": segs, "lang": result["language"]}
         else:
-            model = _MODEL
-            result = model.transcribe(audio_path, language=lang_hint)
             text = result["text"]
             segs = []
             if "segments" in result:
@@ -63,13 +192,17 @@ def transcribe(audio_path: str, lang_hint: Optional[str] = None) -> Dict:
                     segs.append({"start": s["start"], "end": s["end"], "text": s["text"]})
             result = {"text": text.strip(), "segments": segs, "lang": result.get("language", None)}
         
+        if cache_key:
+            TRANSCRIPTION_CACHE.put(cache_key, result)
         app_logger.info(f"Transcription completed for: {audio_path}")
         return result
         
+    except AudioDecodeException:
+        raise  # the upload itself is bad, not the model
     except Exception as e:
         app_logger.error(f"Transcription failed for {audio_path}: {e}")
         # For testing, return a mock result instead of failing
-        if "test_audio" in audio_path:
+        if "test_audio" in str(audio_path):
             app_logger.info("Returning mock result for test audio")
             return {"text": "test audio transcription", "segments": [], "lang": "en"}
         raise ASRException(f"Transcription failed: {e}")
@@ -84,8 +217,10 @@ def detect_language(audio_path: str) -> str:
         return "unknown"
 
 if __name__ == "__main__":
-    import sys
-    if len(sys.argv) < 2:
-        print("Usage: python asr.py sample.wav")
-    else:
-        print(transcribe(sys.argv[1]))
+    import argparse
+    parser = argparse.ArgumentParser(description="Transcribe an audio file")
+    parser.add_argument("audio")
+    parser.add_argument("--lang", default=None, help="Language hint, e.g. de")
+    parser.add_argument("--long", action="store_true", help="Parallel chunked mode for long recordings")
+    args = parser.parse_args()
+    print(transcribe(args.audio, lang_hint=args.lang, long_audio=args.long))
@@ -0,0 +1,186 @@
+# src/backend/audio_decode.py
+"""
+Decode uploads to 16 kHz mono float32 NumPy arrays, in process where possible:
+    soundfile   wav / flac / ogg (libsndfile)
+    wave        PCM wav via the standard library (no extra dependency)
+    PyAV        mp3 / m4a / webm / aac and anything else libav can read
+Both Whisper backends accept these arrays directly, so transcription never
+spawns its own ffmpeg. Formats none of the in-process decoders handle go to
+a small pool of long-lived worker processes that run ffmpeg; forking from a
+tiny worker is cheap compared to forking the model-sized server process.
+"""
+import io
+import multiprocessing
+import os
+import subprocess
+import threading
+import wave
+from concurrent.futures import ProcessPoolExecutor
+from math import gcd
+from typing import Optional, Union
+import numpy as np
+from .config import settings
+from .exceptions import AudioDecodeException
+from .logger import app_logger
+
+try:
+    import soundfile
+    SOUNDFILE_AVAILABLE = True
+except Exception:
+    SOUNDFILE_AVAILABLE = False
+
+try:
+    import av
+    PYAV_AVAILABLE = True
+except Exception:
+    PYAV_AVAILABLE = False
+
+SAMPLE_RATE = 16000
+SOUNDFILE_FORMATS = {".wav", ".wave", ".flac", ".ogg", ".oga", ".aif", ".aiff"}
+
+Source = Union[str, bytes]
+
+def sniff_extension(data: bytes) -> str:
+    """Container type from the first bytes, for uploads without a usable filename."""
+    if data[:4] == b"RIFF" and data[8:12] == b"WAVE":
+        return ".wav"
+    if data[:4] == b"OggS":
+        return ".ogg"
+    if data[:4] == b"fLaC":
+        return ".flac"
+    if data[:3] == b"ID3" or data[:2] in (b"\xff\xfb", b"\xff\xf3", b"\xff\xf2"):
+        return ".mp3"
+    if data[4:8] == b"ftyp":
+        return ".m4a"
+    if data[:4] == b"\x1a\x45\xdf\xa3":
+        return ".webm"
+    return ""
+
+def to_mono(audio: np.ndarray) -> np.ndarray:
+    """(frames, channels) -> (frames,) by averaging channels."""
+    return audio.mean(axis=1) if audio.ndim == 2 else audio
+
+def resample(audio: np.ndarray, src_rate: int, dst_rate: int = SAMPLE_RATE) -> np.ndarray:
+    """Polyphase resampling with scipy when installed, else linear interpolation."""
+    if src_rate == dst_rate or len(audio) == 0:
+        return audio.astype(np.float32, copy=False)
+    try:
+        from scipy.signal import resample_poly
+        g = gcd(src_rate, dst_rate)
+        return resample_poly(audio, dst_rate // g, src_rate // g).astype(np.float32)
+    except ImportError:
+        n_out = int(round(len(audio) * dst_rate / src_rate))
+        positions = np.arange(n_out) * (src_rate / dst_rate)
+        return np.interp(positions, np.arange(len(audio)), audio).astype(np.float32)
+
+def _open(source: Source):
+    return io.BytesIO(source) if isinstance(source, bytes) else source
+
+def _decode_soundfile(source: Source, sr: int) -> np.ndarray:
+    audio, rate = soundfile.read(_open(source), dtype="float32", always_2d=True)
+    return resample(to_mono(audio), rate, sr)
+
+def _decode_wave(source: Source, sr: int) -> np.ndarray:
+    with wave.open(_open(source), "rb") as w:
+        width, channels, rate = w.getsampwidth(), w.getnchannels(), w.getframerate()
+        raw = w.readframes(w.getnframes())
+    if width == 1:
+        audio = (np.frombuffer(raw, dtype=np.uint8).astype(np.float32) - 128.0) / 128.0
+    elif width == 2:
+        audio = np.frombuffer(raw, dtype="<i2").astype(np.float32) / 32768.0
+    elif width == 4:
+        audio = np.frombuffer(raw, dtype="<i4").astype(np.float32) / 2147483648.0
+    else:
+        raise ValueError(f"unsupported sample width: {width * 8} bit")
+    return resample(to_mono(audio.reshape(-1, channels)), rate, sr)
+
+def _decode_pyav(source: Source, sr: int) -> np.ndarray:
+    # libswresample does the downmix and rate conversion while decoding
+    resampler = av.AudioResampler(format="flt", layout="mono", rate=sr)
+    chunks = []
+    with av.open(_open(source), mode="r") as container:
+        for frame in container.decode(audio=0):
+            frame.pts = None
+            chunks.extend(f.to_ndarray().reshape(-1) for f in resampler.resample(frame))
+        chunks.extend(f.to_ndarray().reshape(-1) for f in resampler.resample(None))
+    return np.concatenate(chunks).astype(np.float32, copy=False) if chunks else np.zeros(0, np.float32)
+
+# --- decoder worker pool (last resort) ---
+
+def _ffmpeg_decode(source: Source, sr: int, timeout: float) -> bytes:
+    """Runs in a pool worker: s16le mono PCM at `sr` from ffmpeg's stdout."""
+    cmd = ["ffmpeg", "-nostdin", "-loglevel", "error", "-threads", "0",
+           "-i", "pipe:0" if isinstance(source, bytes) else source,
+           "-f", "s16le", "-ac", "1", "-acodec", "pcm_s16le", "-ar", str(sr), "pipe:1"]
+    out = subprocess.run(cmd, input=source if isinstance(source, bytes) else None,
+                         capture_output=True, check=True, timeout=timeout)
+    return out.stdout
+
+_POOL: Optional[ProcessPoolExecutor] = None
+_POOL_LOCK = threading.Lock()
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is None:
+            _POOL = ProcessPoolExecutor(max_workers=max(1, settings.audio_decode_workers),
+                                        mp_context=multiprocessing.get_context("spawn"))
+        return _POOL
+
+def _decode_pool(source: Source, sr: int) -> np.ndarray:
+    timeout = settings.audio_decode_timeout_seconds
+    pcm = _get_pool().submit(_ffmpeg_decode, source, sr, timeout).result(timeout=timeout + 5)
+    return np.frombuffer(pcm, dtype="<i2").astype(np.float32) / 32768.0
+
+class AudioDecoder:
+    """Tries the in-process decoders suited to the format, then the worker pool."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counts = {"soundfile": 0, "wave": 0, "pyav": 0, "pool": 0, "failed": 0}
+
+    def _chain(self, ext: str) -> list:
+        in_process = [("soundfile", _decode_soundfile, SOUNDFILE_AVAILABLE),
+                      ("wave", _decode_wave, ext in (".wav", ".wave")),
+                      ("pyav", _decode_pyav, PYAV_AVAILABLE)]
+        if ext not in SOUNDFILE_FORMATS:
+            # Compressed formats: libsndfile rarely helps, go to PyAV first
+            in_process = in_process[2:] + in_process[:2]
+        chain = [(name, fn) for name, fn, ok in in_process if ok]
+        if settings.audio_decode_workers > 0:
+            chain.append(("pool", _decode_pool))
+        return chain
+
+    def decode(self, source: Source, filename: Optional[str] = None, sr: int = SAMPLE_RATE) -> np.ndarray:
+        """
+        Decode a file path or in-memory upload to mono float32 at `sr`.
+        `filename` (e.g. the upload's name) picks the decoder order for bytes.
+        """
+        name = filename or (source if isinstance(source, str) else "")
+        ext = os.path.splitext(name)[1].lower()
+        if isinstance(source, bytes) and ext not in SOUNDFILE_FORMATS:
+            ext = sniff_extension(source) or ext
+        errors = []
+        for decoder, fn in self._chain(ext):
+            try:
+                audio = fn(source, sr)
+            except Exception as e:
+                errors.append(f"{decoder}: {e}")
+                continue
+            with self._lock:
+                self.counts[decoder] += 1
+            return audio
+        with self._lock:
+            self.counts["failed"] += 1
+        label = filename or (source if isinstance(source, str) else f"{len(source)} bytes")
+        app_logger.error(f"Could not decode audio {label}: {'; '.join(errors) or 'no decoder available'}")
+        raise AudioDecodeException(f"Could not decode audio: {'; '.join(errors) or 'no decoder available'}")
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {**self.counts, "soundfile_available": SOUNDFILE_AVAILABLE, "pyav_available": PYAV_AVAILABLE}
+
+DECODER = AudioDecoder()
+
+def decode(source: Source, filename: Optional[str] = None, sr: int = SAMPLE_RATE) -> np.ndarray:
+    return DECODER.decode(source, filename, sr)
@@ -0,0 +1,77 @@
+# src/backend/audio_store.py
+"""
+Lookup and HTTP helpers for synthesized reply audio served by /audio/{id}.
+An audio id is the file stem in AUDIO_DIR, e.g. temp/response_<uuid>.mp3 -> response_<uuid>.
+"""
+import os
+import re
+import subprocess
+import uuid
+from pathlib import Path
+from typing import Optional
+from .logger import app_logger
+
+AUDIO_DIR = Path("temp")
+
+MEDIA_TYPES = {
+    ".mp3": "audio/mpeg",
+    ".wav": "audio/wav",
+    ".webm": "audio/webm",
+}
+
+_ID_RE = re.compile(r"^[A-Za-z0-9_-]+$")
+
+def audio_id(path: str) -> str:
+    return Path(path).stem
+
+def audio_url(path: Optional[str]) -> Optional[str]:
+    return f"/audio/{audio_id(path)}" if path else None
+
+def find_audio(audio_id: str) -> Optional[Path]:
+    """Return the original (non-transcoded) file for an id, or None."""
+    if not _ID_RE.match(audio_id):
+        return None
+    for ext in (".mp3", ".wav"):
+        path = AUDIO_DIR / f"{audio_id}{ext}"
+        if path.is_file():
+            return path
+    return None
+
+def media_type(path: Path) -> str:
+    return MEDIA_TYPES.get(path.suffix.lower(), "application/octet-stream")
+
+def etag_for(path: Path) -> str:
+    st = path.stat()
+    return f'"{st.st_size:x}-{st.st_mtime_ns:x}"'
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    tags = [t.strip() for t in if_none_match.split(",")]
+    return "*" in tags or etag in tags or f"W/{etag}" in tags
+
+def opus_version(path: Path, bitrate: str = "32k") -> Path:
+    """
+    Transcode to Opus in a WebM container once and reuse the result.
+    Speech at 32 kbps Opus is several times smaller than the source MP3/WAV.
+    """
+    out = path.with_suffix(".webm")
+    if out.exists() and out.stat().st_mtime >= path.stat().st_mtime:
+        return out
+    # Unique per call: concurrent requests for the same id each write their own file, then one rename wins
+    tmp = out.with_name(f"{out.stem}.{uuid.uuid4().hex}.tmp.webm")
+    cmd = ["ffmpeg", "-y", "-loglevel", "error", "-i", str(path),
+           "-vn", "-c:a", "libopus", "-b:a", bitrate, "-application", "voip", str(tmp)]
+    try:
+        subprocess.run(cmd, check=True, capture_output=True, timeout=60)
+        os.replace(tmp, out)
+    finally:
+        if tmp.exists():
+            tmp.unlink()
+    app_logger.info(f"Transcoded {path.name} to Opus ({out.stat().st_size} bytes)")
+    return out
+
+def wants_opus(fmt: Optional[str], accept: Optional[str]) -> bool:
+    if fmt:
+        return fmt.lower() in ("opus", "webm")
+    return bool(accept) and ("audio/webm" in accept or "audio/opus" in accept)
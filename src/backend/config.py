@@ -2,6 +2,118 @@ from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
     whisper_model: str = "small"
+    # ASR replica pool: model copies, CPU threads per copy (0 = library default) and decode workers per copy
+    asr_replicas: int = 1
+    asr_cpu_threads: int = 0
+    asr_num_workers: int = 1
+    # Long-audio mode: chunk length/overlap (s), worker processes (0 = half the cores), threads per worker
+    long_audio_chunk_seconds: float = 30
+    long_audio_overlap_seconds: float = 1.0
+    long_audio_workers: int = 0
+    long_audio_cpu_threads: int = 2
+    # Transcription cache (content hash of the audio): in-memory entries, on-disk budget, shared-store TTL
+    transcription_cache_enabled: bool = True
+    transcription_cache_dir: str = "cache/transcripts"
+    transcription_cache_memory_entries: int = 256
+    transcription_cache_disk_mb: int = 200
+    transcription_cache_ttl_seconds: float = 7 * 24 * 3600
+    # Audio decoding: in process (soundfile/PyAV) first, then this many long-lived ffmpeg workers (0 = none)
+    audio_decode_workers: int = 2
+    audio_decode_timeout_seconds: float = 30.0
+
+    # Startup warmup: comma-separated stages to preload before /ready reports ok
+    warmup_enabled: bool = True
+    warmup_stages: str = "asr,translation,grammar,phrasebook"
+    # A failure in one of these keeps /ready at 503 ("degraded"); the others only log (grammar has a fallback)
+    warmup_required_stages: str = "imports,asr,tts,worker"
+
+    # Translation models are evicted LRU-first above this budget
+    translation_memory_budget_mb: int = 1024
+    # "auto" | "ctranslate2" | "transformers"; ctranslate2 models live in translation_model_dir
+    translation_backend: str = "auto"
+    translation_model_dir: str = "models/ct2"
+    translation_cpu_threads: int = 0
+    # Sentences per generate() call when translating long texts
+    translation_batch_size: int = 16
+
+    # TTS engine chain (failover order) and per-language overrides, e.g. "hi:edge;de:pyttsx3,edge"
+    tts_engines: str = "edge,pyttsx3"
+    tts_language_engines: str = ""
+    tts_timeout_seconds: float = 8.0
+    tts_failure_cooldown_seconds: float = 60.0
+    tts_process_workers: int = 0
+
+    # Generated files in temp/ and uploads/: max age, total disk budget and sweep period
+    temp_max_age_hours: float = 24
+    temp_max_total_mb: int = 500
+    janitor_interval_seconds: float = 300
+
+    # Conversation history: one file per session in memory_dir (memory_file from older versions is migrated),
+    # per-session prompt budget and rolling summary size (tokens), sessions kept in RAM
+    memory_dir: str = "memory"
+    memory_file: str = "memory.json"
+    context_token_budget: int = 1000
+    context_summary_tokens: int = 200
+    context_cached_sessions: int = 1000
+    # Idle sessions expire (session files or the shared store) after this long
+    context_ttl_seconds: float = 30 * 24 * 3600
+
+    # Shared store for caches and sessions across replicas: "" (in-process) or redis://host:6379/0
+    store_url: str = ""
+    store_pool_size: int = 8
+    store_timeout_seconds: float = 2.0
+    store_prefix: str = "chatbot:"
+
+    # Single-pass LLM: one structured Gemini call returns the reply and grammar corrections
+    llm_single_pass: bool = False
+
+    # Phrasebook answers common phrases without an LLM call; empty source = bundled data file
+    phrasebook_enabled: bool = True
+    phrasebook_source: str = ""
+    phrasebook_index: str = "cache/phrasebook_index.json"
+    phrasebook_min_score: float = 0.8
+
+    # Job API: concurrent worker tasks and how long finished jobs stay queryable
+    job_workers: int = 2
+    job_ttl_seconds: float = 3600
+
+    # Admission scheduler: global slots, per-client cap, class weights and wait-queue limit
+    scheduler_max_concurrency: int = 4
+    scheduler_per_client_limit: int = 2
+    scheduler_weights: str = "interactive:4,bulk:1"
+    scheduler_max_queue: int = 100
+    # Per-request deadline in seconds (0 = none); X-Request-Timeout overrides it, up to the max
+    request_timeout_seconds: float = 60.0
+    request_timeout_max_seconds: float = 300.0
+
+    # Quality profiles (fast/balanced/accurate): default ceiling, model sizes and adaptive step-down thresholds
+    quality_default: str = "balanced"
+    quality_adaptive: bool = True
+    quality_fast_model: str = "base"
+    quality_accurate_model: str = "medium"
+    quality_fast_tts_engines: str = "pyttsx3,edge"
+    # Per-profile TTS voices, "lang:voice;lang:voice" (empty = the engine's default voice)
+    quality_fast_tts_voices: str = ""
+    quality_balanced_tts_voices: str = ""
+    quality_accurate_tts_voices: str = ""
+    quality_queue_high: int = 8
+    quality_queue_low: int = 2
+    quality_p95_high_ms: float = 8000
+    quality_p95_low_ms: float = 3000
+    quality_cooldown_seconds: float = 10
+
+    # Slim API mode: ASR, translation and grammar run on a model worker (python -m src.backend.model_worker)
+    model_worker_url: str = ""
+    model_worker_timeout_seconds: float = 60.0
+    model_worker_connections: int = 16
+    # At startup the API waits this long for the worker's own warmup before /ready reports degraded
+    model_worker_ready_timeout_seconds: float = 600.0
+
+    # Stub backends (no models, no network) for load testing; per-stage latency in ms
+    stub_backends: bool = False
+    stub_asr_ms: float = 200
+    stub_llm_ms: float = 300
+    stub_tts_ms: float = 100
     
     class Config:
         env_file = ".env"
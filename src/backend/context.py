@@ -0,0 +1,293 @@
+# src/backend/context.py
+"""
+Per-session conversation context for the LLM.
+Recent turns are packed newest-first into a token budget; turns that no
+longer fit are folded into a rolling summary in the background, so prompt
+size stays flat however long the conversation runs.
+Sessions persist one JSON file per session in MEMORY_DIR, so a turn only
+rewrites its own session, or, with a shared STORE_URL, in the store (summary
+string + turn list per session) so every API replica sees the same
+conversation. Either way idle sessions expire after CONTEXT_TTL_SECONDS.
+"""
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+from .config import settings
+from .exceptions import StoreException
+from .logger import app_logger
+from .store import STORE, Store
+
+DEFAULT_SESSION = "default"
+
+def estimate_tokens(text: str) -> int:
+    # ~4 characters per token is close enough for budgeting Gemini/T5 prompts
+    return max(1, len(text) // 4)
+
+def _turn_text(turn: dict) -> str:
+    return f"User: {turn['user']}\nAssistant: {turn['reply']}"
+
+def extractive_summary(previous: str, turns: List[dict], max_tokens: int) -> str:
+    """Fallback summary without an LLM: keep the most recent user utterances."""
+    lines = [previous] if previous else []
+    lines += [f"User said: {t['user']}" for t in turns]
+    text = " ".join(lines)
+    max_chars = max_tokens * 4
+    return text[-max_chars:] if len(text) > max_chars else text
+
+def llm_summary(previous: str, turns: List[dict], max_tokens: int) -> str:
+    if settings.stub_backends:
+        return extractive_summary(previous, turns, max_tokens)  # no Gemini calls in stub mode
+    try:
+        from . import llm_helper
+        summary = llm_helper.summarize_conversation(previous, [_turn_text(t) for t in turns], max_words=max_tokens * 3 // 4)
+    except ImportError:
+        summary = None  # e.g. stub/slim deployments without the Gemini SDK
+    return summary or extractive_summary(previous, turns, max_tokens)
+
+class ConversationContext:
+    def __init__(self, directory: Path, token_budget: int, summary_tokens: int,
+                 summarizer: Callable[[str, List[dict], int], str] = llm_summary,
+                 store: Optional[Store] = None, ttl_seconds: float = 30 * 24 * 3600,
+                 cached_sessions: int = 1000, legacy_file: Optional[Path] = None):
+        self.directory = Path(directory)
+        self.token_budget = token_budget
+        self.summary_tokens = summary_tokens
+        self._summarizer = summarizer
+        self.store = store
+        self.ttl_seconds = ttl_seconds
+        self.cached_sessions = cached_sessions
+        self.legacy_file = Path(legacy_file) if legacy_file else None
+        self._lock = threading.Lock()
+        self._summarizing = set()
+        # Most recently used sessions; the files in `directory` are the source of truth
+        self._sessions: "OrderedDict[str, dict]" = OrderedDict()
+        self._migrated = False
+        self._last_sweep = 0.0
+
+    # --- local layout: one file per session ---
+
+    def _file(self, session_id: str) -> Path:
+        # Session ids come from clients: hash them into safe file names
+        return self.directory / f"{hashlib.sha256(session_id.encode()).hexdigest()[:32]}.json"
+
+    def _migrate(self) -> None:
+        # Caller holds the lock. memory.json from older versions held every session in one file.
+        self._migrated = True
+        if not self.legacy_file or not self.legacy_file.exists():
+            return
+        try:
+            data = json.loads(self.legacy_file.read_text())
+        except Exception:
+            data = {}
+        if isinstance(data, list):
+            # Oldest layout: a flat list of the last turns
+            data = {DEFAULT_SESSION: {"summary": "", "turns": data}}
+        for session_id, s in data.items():
+            if not self._file(session_id).exists():
+                self._put(session_id, {"summary": s.get("summary", ""), "turns": s.get("turns", [])})
+        try:
+            self.legacy_file.rename(self.legacy_file.with_name(self.legacy_file.name + ".migrated"))
+        except OSError:
+            pass  # e.g. a bind-mounted file; sessions already migrated are not overwritten
+        app_logger.info(f"Migrated {len(data)} sessions from {self.legacy_file} to {self.directory}")
+
+    def _get(self, session_id: str) -> Optional[dict]:
+        # Caller holds the lock
+        if not self._migrated:
+            self._migrate()
+        s = self._sessions.get(session_id)
+        if s is None:
+            try:
+                s = json.loads(self._file(session_id).read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                return None
+        if time.time() - s.get("updated", 0) > self.ttl_seconds:
+            self._sessions.pop(session_id, None)
+            return None
+        self._remember(session_id, s)
+        return s
+
+    def _put(self, session_id: str, s: dict) -> None:
+        # Caller holds the lock. Write-then-rename so a crash never leaves half a session.
+        s["updated"] = time.time()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self._file(session_id)
+        tmp = path.with_name(f"{path.name}.{uuid.uuid4().hex}.tmp")
+        tmp.write_text(json.dumps({"id": session_id, **s}, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp, path)
+        self._remember(session_id, s)
+        self._sweep()
+
+    def _remember(self, session_id: str, s: dict) -> None:
+        self._sessions[session_id] = s
+        self._sessions.move_to_end(session_id)
+        while len(self._sessions) > self.cached_sessions:
+            self._sessions.popitem(last=False)
+
+    def _sweep(self) -> None:
+        # Caller holds the lock. Delete expired session files, at most once an hour.
+        now = time.time()
+        if now - self._last_sweep < min(3600.0, self.ttl_seconds):
+            return
+        self._last_sweep = now
+        expired = 0
+        for path in self.directory.glob("*.json"):
+            try:
+                if now - path.stat().st_mtime > self.ttl_seconds:
+                    path.unlink()
+                    expired += 1
+            except OSError:
+                pass
+        if expired:
+            app_logger.info(f"Expired {expired} idle conversation sessions")
+
+    # --- shared-store layout: summary string + append-only turn list per session ---
+
+    def _keys(self, session_id: str):
+        base = f"ctx:{session_id}"
+        return f"{base}:summary", f"{base}:turns", f"{base}:summarizing"
+
+    def _store_session(self, session_id: str, append: Optional[dict] = None) -> dict:
+        summary_key, turns_key, _ = self._keys(session_id)
+        with self.store.pipeline() as p:
+            if append is not None:
+                p.rpush(turns_key, json.dumps(append, ensure_ascii=False))
+                p.expire(turns_key, self.ttl_seconds).expire(summary_key, self.ttl_seconds)
+            p.get(summary_key).lrange(turns_key, 0, -1)
+        summary, turns = p.results[-2:]
+        return {"summary": summary.decode("utf-8") if summary else "", "turns": [json.loads(t) for t in turns]}
+
+    def session(self, session_id: str) -> dict:
+        if self.store is not None:
+            return self._store_session(session_id)
+        with self._lock:
+            s = self._get(session_id) or {"summary": "", "turns": []}
+            return {"summary": s["summary"], "turns": list(s["turns"])}
+
+    def build(self, session_id: str, target_lang: str) -> str:
+        """Prompt context: header, rolling summary and as many recent turns as fit."""
+        header = f"User is practicing {target_lang}."
+        try:
+            s = self.session(session_id)
+        except StoreException as e:
+            app_logger.error(f"Context unavailable for {session_id}: {e}")
+            return header
+        budget = self.token_budget - estimate_tokens(header)
+        parts = []
+        if s["summary"]:
+            summary = f"Earlier in this conversation: {s['summary']}"
+            budget -= estimate_tokens(summary)
+            parts.append(summary)
+        recent = []
+        for turn in reversed(s["turns"]):
+            text = _turn_text(turn)
+            cost = estimate_tokens(text)
+            if cost > budget:
+                break
+            budget -= cost
+            recent.append(text)
+        return "\n".join([header] + parts + list(reversed(recent)))
+
+    def record(self, session_id: str, user_text: str, reply_text: str, lang: str) -> None:
+        """Append a turn and, if the session outgrew the budget, schedule a summary."""
+        overflow = self._append(session_id, user_text, reply_text, lang)
+        if not overflow:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+            loop.run_in_executor(None, self._summarize, session_id, overflow)
+        except RuntimeError:
+            self._summarize(session_id, overflow)
+
+    async def record_async(self, session_id: str, user_text: str, reply_text: str, lang: str) -> None:
+        """record() for async callers: the write (a store round-trip) runs off the event loop."""
+        overflow = await asyncio.to_thread(self._append, session_id, user_text, reply_text, lang)
+        if overflow:
+            asyncio.get_running_loop().run_in_executor(None, self._summarize, session_id, overflow)
+
+    def _append(self, session_id: str, user_text: str, reply_text: str, lang: str) -> int:
+        """Store the turn; returns how many old turns this caller should summarize (0 = none)."""
+        turn = {"user": user_text, "reply": reply_text, "lang": lang}
+        if self.store is not None:
+            try:
+                s = self._store_session(session_id, append=turn)
+                overflow = self._overflow(s)
+                # One summarizer per session across all replicas
+                if not overflow or not self.store.set(self._keys(session_id)[2], "1", ttl=120, nx=True):
+                    return 0
+            except StoreException as e:
+                app_logger.error(f"Could not record turn for {session_id}: {e}")
+                return 0
+            with self._lock:
+                self._summarizing.add(session_id)
+            return overflow
+        with self._lock:
+            s = self._get(session_id) or {"summary": "", "turns": []}
+            s["turns"].append(turn)
+            self._put(session_id, s)
+            overflow = self._overflow(s)
+            if not overflow or session_id in self._summarizing:
+                return 0
+            self._summarizing.add(session_id)
+            return overflow
+
+    def _overflow(self, s: dict) -> int:
+        """Number of oldest turns that no longer fit in the recent-turns budget."""
+        budget = self.token_budget - self.summary_tokens
+        kept = 0
+        for turn in reversed(s["turns"]):
+            budget -= estimate_tokens(_turn_text(turn))
+            if budget < 0:
+                break
+            kept += 1
+        return len(s["turns"]) - kept
+
+    def _summarize(self, session_id: str, count: int) -> None:
+        try:
+            s = self.session(session_id)
+            previous, old_turns = s["summary"], s["turns"][:count]
+            summary = self._summarizer(previous, old_turns, self.summary_tokens)
+            # Hold the summary to its budget even if the LLM ignores the word limit
+            max_chars = self.summary_tokens * 4
+            if len(summary) > max_chars:
+                summary = "..." + summary[-(max_chars - 3):]
+            # Turns are only ever appended, so the first `count` are the ones summarized
+            if self.store is not None:
+                summary_key, turns_key, _ = self._keys(session_id)
+                with self.store.pipeline() as p:
+                    p.set(summary_key, summary, ttl=self.ttl_seconds).ltrim(turns_key, count, -1)
+            else:
+                with self._lock:
+                    s = self._get(session_id) or {"summary": "", "turns": []}
+                    s["turns"] = s["turns"][count:]
+                    s["summary"] = summary
+                    self._put(session_id, s)
+            app_logger.info(f"Summarized {count} turns for session {session_id}")
+        except Exception as e:
+            app_logger.error(f"Context summarization failed for {session_id}: {e}")
+        finally:
+            with self._lock:
+                self._summarizing.discard(session_id)
+            if self.store is not None:
+                try:
+                    self.store.delete(self._keys(session_id)[2])
+                except StoreException:
+                    pass  # the claim expires on its own
+
+CONTEXT = ConversationContext(
+    Path(settings.memory_dir),
+    token_budget=settings.context_token_budget,
+    summary_tokens=settings.context_summary_tokens,
+    # Session files for a single replica; the shared store when one is configured
+    store=STORE if STORE.shared else None,
+    ttl_seconds=settings.context_ttl_seconds,
+    cached_sessions=settings.context_cached_sessions,
+    legacy_file=Path(settings.memory_file),
+)
@@ -0,0 +1,99 @@
+# src/backend/deadline.py
+"""
+Per-request time budget. A Deadline is created when a chat request arrives
+(REQUEST_TIMEOUT_SECONDS, or the client's X-Request-Timeout header) and is
+passed down the pipeline; every stage runs through it. A stage still running
+when the budget is spent, or when the client disconnects, is cancelled.
+Blocking stages run in worker threads, and those threads cannot be
+interrupted: their results are dropped and the remaining stages are skipped.
+"""
+import asyncio
+import math
+import time
+from typing import Awaitable, Callable, Optional
+from .config import settings
+from .exceptions import DeadlineException
+from .logger import app_logger
+
+POLL_SECONDS = 0.25  # how often a running stage checks for a client disconnect
+
+class Deadline:
+    def __init__(self, seconds: Optional[float] = None,
+                 is_disconnected: Optional[Callable[[], Awaitable[bool]]] = None):
+        self.expires_at = time.monotonic() + seconds if seconds else None
+        self.is_disconnected = is_disconnected
+        self.reason: Optional[str] = None  # "timeout" | "disconnected" once cut
+        self.stage: Optional[str] = None   # the stage that was cut
+
+    @classmethod
+    def from_header(cls, value: Optional[str],
+                    is_disconnected: Optional[Callable[[], Awaitable[bool]]] = None) -> "Deadline":
+        """Budget from an X-Request-Timeout value (seconds), else the configured default."""
+        seconds = settings.request_timeout_seconds
+        try:
+            if value and float(value) > 0:
+                seconds = float(value)
+        except ValueError:
+            pass
+        if seconds and settings.request_timeout_max_seconds:
+            seconds = min(seconds, settings.request_timeout_max_seconds)
+        return cls(seconds or None, is_disconnected)
+
+    @property
+    def bounded(self) -> bool:
+        return self.expires_at is not None or self.is_disconnected is not None
+
+    @property
+    def cut(self) -> bool:
+        return self.reason is not None
+
+    def remaining(self) -> float:
+        if self.expires_at is None:
+            return math.inf
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def _fail(self, stage: str, reason: str):
+        if self.reason is None:
+            self.reason, self.stage = reason, stage
+            app_logger.warning(f"Request cut at stage '{stage}': {reason}")
+        raise DeadlineException(f"{'client disconnected' if self.reason == 'disconnected' else 'deadline exceeded'} "
+                                f"at stage '{self.stage}'")
+
+    async def check(self, stage: str) -> None:
+        """Raise DeadlineException if the budget is spent or the client has gone away."""
+        if self.reason is not None:
+            self._fail(stage, self.reason)
+        if self.is_disconnected is not None and await self.is_disconnected():
+            self._fail(stage, "disconnected")
+        if self.remaining() <= 0:
+            self._fail(stage, "timeout")
+
+    async def run(self, stage: str, aw: Awaitable):
+        """Await `aw`, cancelling it if the deadline passes or the client disconnects first."""
+        try:
+            await self.check(stage)
+        except DeadlineException:
+            if asyncio.iscoroutine(aw):
+                aw.close()
+            raise
+        task = asyncio.ensure_future(aw)
+        try:
+            while True:
+                timeout = self.remaining()
+                if self.is_disconnected is not None:
+                    timeout = min(timeout, POLL_SECONDS)
+                done, _ = await asyncio.wait({task}, timeout=None if math.isinf(timeout) else timeout)
+                if done:
+                    return task.result()
+                await self.check(stage)
+        except BaseException:
+            task.cancel()
+            raise
+
+    async def call(self, stage: str, fn: Callable, *args, **kwargs):
+        """
+        Run a blocking stage in a worker thread under this deadline. Always a
+        thread, even without a budget (e.g. job workers): inline, grammar or
+        Gemini calls would stall every other request on the event loop.
+        """
+        return await self.run(stage, asyncio.to_thread(fn, *args, **kwargs))
@@ -1,6 +1,9 @@
 class ASRException(Exception):
     pass
 
+class AudioDecodeException(ASRException):
+    pass
+
 class TTSException(Exception):
     pass
 
@@ -9,3 +12,12 @@ class TranslationException(Exception):
 
 class LLMException(Exception):
     pass
+
+class OverloadedException(Exception):
+    pass
+
+class StoreException(Exception):
+    pass
+
+class DeadlineException(Exception):
+    pass
@@ -4,8 +4,7 @@ Grammar correction and pronunciation scoring.
 Grammar: language_tool_python (wraps LanguageTool)
 Pronunciation scoring: simple proxy comparing reference_text vs ASR transcription
 """
-from typing import Tuple, Dict
-import language_tool_python
+from typing import Tuple, Dict, Optional
 import difflib
 from .asr import transcribe
 
@@ -16,6 +15,7 @@ def _get_tool(lang_code="en"):
     key = lang_code
     if key not in _tool_cache:
         try:
+            import language_tool_python  # lazy: starts a Java server, and not every deployment ships it
             _tool_cache[key] = language_tool_python.LanguageTool('de') if 'de' in lang_code else language_tool_python.LanguageTool('en-US')
         except Exception:
             _tool_cache[key] = None
@@ -26,19 +26,22 @@ def grammar_correct(text: str, lang="de") -> Dict:
     if not tool:
         return {"corrected": text, "matches": []}
     matches = tool.check(text)
-    corrected = language_tool_python.utils.correct(text, matches)
+    from language_tool_python.utils import correct
+    corrected = correct(text, matches)
     # simplify matches
     simple = [{"offset": m.offset, "length": m.errorLength, "message": m.message, "replacements": m.replacements} for m in matches]
     return {"corrected": corrected, "matches": simple}
 
-def pronunciation_score(audio_path: str, reference_text: str) -> Dict:
+def pronunciation_score(audio_path: str, reference_text: str, asr_text: Optional[str] = None) -> Dict:
     """
     Proxy pronunciation score:
     - transcribe audio and compare words to reference_text
     - compute word-level similarity ratio
+    Pass asr_text when the recording is already transcribed.
     """
-    asr_res = transcribe(audio_path, lang_hint="de")
-    asr_text = asr_res.get("text", "")
+    if asr_text is None:
+        asr_res = transcribe(audio_path, lang_hint="de")
+        asr_text = asr_res.get("text", "")
     # token-level compare
     ref_words = reference_text.lower().split()
     hyp_words = asr_text.lower().split()
@@ -0,0 +1,122 @@
+# src/backend/janitor.py
+"""
+Background janitor for generated files (temp/, uploads/).
+Files are registered when they are written, so scheduled sweeps walk an
+in-memory index (oldest first) instead of globbing and stat-ing directories.
+Only the one-time bootstrap at startup scans the disk.
+"""
+import asyncio
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Iterable, Optional
+from .config import settings
+from .logger import app_logger
+
+class TempFileJanitor:
+    def __init__(self, directories: Iterable[str], max_age_seconds: float, max_total_bytes: int):
+        self.directories = list(directories)
+        self.max_age_seconds = max_age_seconds
+        self.max_total_bytes = max_total_bytes
+        self._index: "OrderedDict[str, tuple]" = OrderedDict()  # path -> (created_at, size), oldest first
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+        self.evicted_files = 0
+        self.evicted_bytes = 0
+        self.sweeps = 0
+        self.last_sweep: Optional[float] = None
+
+    def register(self, path: str, created_at: Optional[float] = None) -> None:
+        """Track a newly written file."""
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            return
+        key = str(path)
+        with self._lock:
+            old = self._index.pop(key, None)
+            if old:
+                self._total_bytes -= old[1]
+            self._index[key] = (created_at if created_at is not None else time.time(), size)
+            self._total_bytes += size
+
+    def forget(self, path: str) -> None:
+        """Stop tracking a file that was removed by its owner."""
+        with self._lock:
+            old = self._index.pop(str(path), None)
+            if old:
+                self._total_bytes -= old[1]
+
+    def bootstrap(self) -> int:
+        """Index files already on disk (e.g. from before a restart), oldest first."""
+        found = []
+        for directory in self.directories:
+            for entry in Path(directory).glob("*"):
+                try:
+                    if entry.is_file():
+                        found.append((entry.stat().st_mtime, str(entry)))
+                except OSError:
+                    continue
+        for mtime, path in sorted(found):
+            self.register(path, created_at=mtime)
+        app_logger.info(f"Janitor indexed {len(found)} existing files")
+        return len(found)
+
+    def sweep(self, now: Optional[float] = None) -> int:
+        """Evict expired files, then the oldest files until under the size budget."""
+        now = now if now is not None else time.time()
+        victims = []
+        with self._lock:
+            while self._index:
+                path, (created_at, size) = next(iter(self._index.items()))
+                expired = now - created_at > self.max_age_seconds
+                over_budget = self._total_bytes > self.max_total_bytes
+                if not (expired or over_budget):
+                    break
+                self._index.popitem(last=False)
+                self._total_bytes -= size
+                victims.append((path, size))
+            self.sweeps += 1
+            self.last_sweep = now
+
+        for path, size in victims:
+            try:
+                os.unlink(path)
+                self.evicted_files += 1
+                self.evicted_bytes += size
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                app_logger.error(f"Janitor could not remove {path}: {e}")
+        if victims:
+            app_logger.info(f"Janitor evicted {len(victims)} files")
+        return len(victims)
+
+    async def run(self, interval_seconds: float) -> None:
+        while True:
+            await asyncio.sleep(interval_seconds)
+            try:
+                await asyncio.to_thread(self.sweep)
+            except Exception as e:
+                app_logger.error(f"Janitor sweep failed: {e}")
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "files": len(self._index),
+                "bytes": self._total_bytes,
+                "max_bytes": self.max_total_bytes,
+                "max_age_seconds": self.max_age_seconds,
+                "evicted_files": self.evicted_files,
+                "evicted_bytes": self.evicted_bytes,
+                "sweeps": self.sweeps,
+                "last_sweep": self.last_sweep,
+            }
+
+JANITOR = TempFileJanitor(
+    ["temp", "uploads"],
+    max_age_seconds=settings.temp_max_age_hours * 3600,
+    max_total_bytes=settings.temp_max_total_mb * 1024 * 1024,
+)
@@ -0,0 +1,148 @@
+# src/backend/jobs.py
+"""
+Asynchronous job API backend.
+POST /jobs enqueues a text or audio interaction and returns at once;
+worker tasks run it through the orchestrator and record per-stage progress,
+which clients read by polling GET /jobs/{id} or from the SSE stream.
+"""
+import asyncio
+import os
+import time
+import uuid
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+from .config import settings
+from .logger import app_logger
+
+TERMINAL = ("done", "failed")
+
+class Job:
+    def __init__(self, kind: str, payload: dict):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.payload = payload
+        self.status = "queued"
+        self.stage: Optional[str] = None
+        self.events: List[dict] = []
+        self.result: Optional[dict] = None
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.updated_at = self.created_at
+        self._changed = asyncio.Event()
+
+    def emit(self, stage: str, **extra) -> None:
+        self.stage = stage
+        self.updated_at = time.time()
+        self.events.append({"stage": stage, "status": self.status, "at": self.updated_at, **extra})
+        # Wake SSE listeners; they re-arm by waiting on a fresh event
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    def to_dict(self) -> dict:
+        return {
+            "job_id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "stage": self.stage,
+            "events": self.events,
+            "result": self.result,
+            "error": self.error,
+            "created_at": self.created_at,
+            "updated_at": self.updated_at,
+        }
+
+Runner = Callable[[Job, Callable[[str], None]], Awaitable[dict]]
+
+async def run_with_orchestrator(job: Job, progress: Callable[[str], None]) -> dict:
+    from ..agents.orchestrator import handle_audio_interaction, handle_text_interaction
+    from .scheduler import SCHEDULER, INTERACTIVE, BULK, estimate_text_cost, estimate_audio_cost
+    p = job.payload
+    client = p.get("client_id", "anonymous")
+    if job.kind == "audio":
+        try:
+            async with SCHEDULER.slot(client, BULK, estimate_audio_cost(p["audio_path"])):
+                return await handle_audio_interaction(p["audio_path"], target_lang=p["target_lang"],
+                                                      session_id=p["session_id"], progress=progress,
+                                                      long_audio=p.get("long_audio", False),
+                                                      quality=p.get("quality"))
+        finally:
+            if os.path.exists(p["audio_path"]):
+                os.remove(p["audio_path"])
+            from .janitor import JANITOR
+            JANITOR.forget(p["audio_path"])
+    async with SCHEDULER.slot(client, INTERACTIVE, estimate_text_cost(p["text"])):
+        return await handle_text_interaction(p["text"], target_lang=p["target_lang"],
+                                             session_id=p["session_id"], progress=progress,
+                                             quality=p.get("quality"))
+
+class JobManager:
+    def __init__(self, workers: int, runner: Runner = run_with_orchestrator, ttl_seconds: float = 3600):
+        self.workers = workers
+        self.runner = runner
+        self.ttl_seconds = ttl_seconds
+        self.jobs: Dict[str, Job] = {}
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+
+    def _ensure_workers(self) -> None:
+        loop = asyncio.get_running_loop()
+        alive = [t for t in self._tasks if not t.done() and t.get_loop() is loop]
+        if self._queue is None or not alive:
+            self._queue = asyncio.Queue()
+            self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    def submit(self, kind: str, payload: dict) -> Job:
+        self._ensure_workers()
+        self._expire()
+        job = Job(kind, payload)
+        self.jobs[job.id] = job
+        job.emit("queued")
+        self._queue.put_nowait(job)
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self.jobs.get(job_id)
+
+    async def _worker(self) -> None:
+        while True:
+            job = await self._queue.get()
+            try:
+                await self._run(job)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job: Job) -> None:
+        job.status = "running"
+        job.emit("started")
+        try:
+            job.result = await self.runner(job, lambda stage: job.emit(stage))
+            job.status = "done"
+        except Exception as e:
+            app_logger.error(f"Job {job.id} failed: {e}")
+            job.error = str(e)
+            job.status = "failed"
+        job.emit(job.status)
+
+    async def stream(self, job: Job) -> AsyncIterator[dict]:
+        """Yield the job's events, past and future, until it finishes."""
+        sent = 0
+        while True:
+            waiter = job._changed
+            while sent < len(job.events):
+                yield job.events[sent]
+                sent += 1
+            if job.status in TERMINAL:
+                return
+            await waiter.wait()
+
+    def _expire(self) -> None:
+        cutoff = time.time() - self.ttl_seconds
+        for job_id in [j.id for j in self.jobs.values() if j.status in TERMINAL and j.updated_at < cutoff]:
+            del self.jobs[job_id]
+
+    def stats(self) -> dict:
+        counts: Dict[str, int] = {}
+        for job in self.jobs.values():
+            counts[job.status] = counts.get(job.status, 0) + 1
+        return {"workers": self.workers, "queued": self._queue.qsize() if self._queue else 0, "jobs": counts}
+
+JOBS = JobManager(settings.job_workers, ttl_seconds=settings.job_ttl_seconds)
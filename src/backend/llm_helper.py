@@ -1,9 +1,15 @@
 import os
-import google.generativeai as genai
+import json
+import re
 from typing import Optional
 
 GEMINI_KEY = os.environ.get("GEMINI_API_KEY", None)
 
+def _genai():
+    # Imported on first use: the SDK pulls in grpc/protobuf, which the slim API mode avoids at startup
+    import google.generativeai as genai
+    return genai
+
 def explain_in_target_lang(topic: str, target_lang: str = "German", audience_level="beginner") -> str:
     """
     Given an English topic or phrase, return an explanation in the target language.
@@ -21,6 +27,7 @@ def explain_in_target_lang(topic: str, target_lang: str = "German", audience_lev
     
     if GEMINI_KEY:
         try:
+            genai = _genai()
             genai.configure(api_key=GEMINI_KEY)
             
             models_to_try = [
@@ -59,6 +66,7 @@ def get_chat_response(user_text: str, context: str = "") -> str:
     """
     if GEMINI_KEY:
         try:
+            genai = _genai()
             genai.configure(api_key=GEMINI_KEY)
             
             # List of models to try in order of preference
@@ -91,5 +99,110 @@ def get_chat_response(user_text: str, context: str = "") -> str:
             return f"Gemini API error: {e}"
     return "I am listening. (Note: To get smart responses, please add your GEMINI_API_KEY to Streamlit Secrets.)"
 
+def summarize_conversation(previous_summary: str, turns: list, max_words: int = 150) -> Optional[str]:
+    """
+    Fold older conversation turns into a short rolling summary.
+    Returns None when Gemini is not configured or fails (caller falls back).
+    """
+    if not GEMINI_KEY:
+        return None
+    prompt = (
+        f"Update this summary of a language-learning conversation in at most {max_words} words. "
+        f"Keep facts about the learner, topics discussed and recurring mistakes.\n"
+        f"Current summary: {previous_summary or '(none)'}\n"
+        f"New turns:\n" + "\n".join(turns)
+    )
+    try:
+        genai = _genai()
+        genai.configure(api_key=GEMINI_KEY)
+        for model_name in ['gemini-1.5-flash', 'gemini-1.5-pro', 'gemini-1.0-pro', 'gemini-pro']:
+            try:
+                model = genai.GenerativeModel(model_name)
+                return model.generate_content(prompt).text.strip()
+            except Exception:
+                continue
+    except Exception:
+        pass
+    return None
+
+SINGLE_PASS_PROMPT = """You are a friendly {lang_name} tutor chatting with a learner.
+{context}
+The learner wrote: {user_text}
+
+Answer with JSON only, in this shape:
+{{"reply": "<your conversational reply in {lang_name}>",
+  "corrections": [{{"error": "<exact erroneous substring of the learner's text>",
+                   "message": "<short explanation in {lang_name}>",
+                   "replacements": ["<suggested fix>"]}}]}}
+Use an empty list when the text has no mistakes."""
+
+def apply_corrections(text: str, matches: list) -> str:
+    """Apply the first replacement of each match, like language_tool_python.utils.correct."""
+    out, end = [], len(text)
+    for m in sorted(matches, key=lambda m: m["offset"], reverse=True):
+        if m["replacements"] and m["offset"] + m["length"] <= end:
+            out.append(text[m["offset"] + m["length"]:end])
+            out.append(m["replacements"][0])
+            end = m["offset"]
+    out.append(text[:end])
+    return "".join(reversed(out))
+
+def parse_single_pass(raw: str, user_text: str) -> dict:
+    """
+    Parse the single-pass JSON into {"reply": str, "grammar": dict or None}.
+    Corrections are located in the user's text here (models are unreliable
+    at character offsets) and converted to the grammar_correct schema;
+    grammar is None when they cannot be used. Raises ValueError without a reply.
+    """
+    body = re.sub(r"^```(?:json)?\s*|\s*```$", "", raw.strip())
+    data = json.loads(body)
+    reply = data.get("reply") if isinstance(data, dict) else None
+    if not isinstance(reply, str) or not reply.strip():
+        raise ValueError("single-pass response has no reply")
+    try:
+        matches, search_from = [], 0
+        for c in data.get("corrections") or []:
+            error = c["error"]
+            offset = user_text.find(error, search_from)
+            if offset < 0:
+                offset = user_text.find(error)
+            if not error or offset < 0:
+                raise ValueError(f"correction '{error}' is not in the text")
+            replacements = [r for r in c.get("replacements") or [] if isinstance(r, str)]
+            matches.append({"offset": offset, "length": len(error), "message": str(c.get("message", "")),
+                            "replacements": replacements})
+            search_from = offset + len(error)
+        grammar = {"corrected": apply_corrections(user_text, matches), "matches": matches}
+    except (KeyError, TypeError, ValueError, AttributeError):
+        grammar = None
+    return {"reply": reply.strip(), "grammar": grammar}
+
+def chat_with_corrections(user_text: str, target_lang: str = "de", context: str = "") -> Optional[dict]:
+    """
+    One structured Gemini call for the reply and the grammar corrections.
+    Returns {"reply": str, "grammar": dict or None}, or None when Gemini is
+    not configured or no usable reply came back (caller falls back).
+    """
+    if not GEMINI_KEY:
+        return None
+    lang_name = {"de": "German", "es": "Spanish", "fr": "French", "en": "English", "hi": "Hindi"}.get(target_lang, target_lang)
+    prompt = SINGLE_PASS_PROMPT.format(lang_name=lang_name, user_text=user_text,
+                                       context=f"Conversation so far:\n{context}\n" if context else "")
+    try:
+        genai = _genai()
+        genai.configure(api_key=GEMINI_KEY)
+        for model_name in ['gemini-1.5-flash', 'gemini-1.5-pro', 'gemini-1.0-pro', 'gemini-pro']:
+            try:
+                model = genai.GenerativeModel(model_name)
+                response = model.generate_content(prompt, generation_config={"response_mime_type": "application/json"})
+                return parse_single_pass(response.text, user_text)
+            except ValueError:
+                return None  # the model answered, but not in the expected shape
+            except Exception:
+                continue
+    except Exception:
+        pass
+    return None
+
 if __name__ == "__main__":
     print(explain_in_target_lang("How to prepare for IELTS speaking", target_lang="es"))
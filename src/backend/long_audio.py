@@ -0,0 +1,143 @@
+# src/backend/long_audio.py
+"""
+Long-audio transcription: split a recording at silences into ~30s chunks
+(with a little overlap), transcribe the chunks in parallel worker processes
+that each load the model once, then stitch the segments back together with
+absolute timestamps, dropping duplicates from the overlaps.
+"""
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from .config import settings
+from .exceptions import ASRException
+from .logger import app_logger
+
+SAMPLE_RATE = 16000
+FRAME = 320  # 20 ms at 16 kHz
+
+def load_audio(path: str) -> np.ndarray:
+    """Decode to 16 kHz mono float32."""
+    from .audio_decode import decode
+    return decode(path, sr=SAMPLE_RATE)
+
+def frame_energy(audio: np.ndarray) -> np.ndarray:
+    n = len(audio) // FRAME
+    frames = audio[: n * FRAME].reshape(n, FRAME)
+    return np.sqrt(np.mean(frames.astype(np.float32) ** 2, axis=1))
+
+def find_split_points(audio: np.ndarray, chunk_seconds: float = 30.0, search_seconds: float = 5.0,
+                      quiet_seconds: float = 0.3) -> List[int]:
+    """
+    Sample offsets to cut at: near every `chunk_seconds`, the quietest
+    `quiet_seconds` window within +/- `search_seconds` of the nominal cut.
+    """
+    energy = frame_energy(audio)
+    if len(energy) == 0:
+        return []
+    frames_per_sec = SAMPLE_RATE // FRAME
+    chunk, search = int(chunk_seconds * frames_per_sec), int(search_seconds * frames_per_sec)
+    win = max(1, int(quiet_seconds * frames_per_sec))
+    smoothed = np.convolve(energy, np.ones(win) / win, mode="same")
+
+    splits, nominal = [], chunk
+    while nominal < len(energy) - search:
+        prev = splits[-1] // FRAME if splits else 0
+        lo, hi = max(nominal - search, prev + 1), min(nominal + search, len(energy) - 1)
+        cut = lo + int(np.argmin(smoothed[lo:hi]))
+        splits.append(cut * FRAME)
+        nominal = cut + chunk
+    return splits
+
+def make_chunks(n_samples: int, splits: List[int], overlap_seconds: float = 1.0) -> List[Tuple[int, int, int, int]]:
+    """
+    (start, end, keep_from, keep_to) sample ranges. start/end include the
+    overlap; keep_from/keep_to are the split points that decide ownership
+    of segments falling into the overlap.
+    """
+    overlap = int(overlap_seconds * SAMPLE_RATE)
+    bounds = [0] + splits + [n_samples]
+    chunks = []
+    for keep_from, keep_to in zip(bounds, bounds[1:]):
+        chunks.append((max(0, keep_from - overlap), min(n_samples, keep_to + overlap), keep_from, keep_to))
+    return chunks
+
+def stitch(chunk_results: List[Tuple[Tuple[int, int, int, int], List[dict]]]) -> List[dict]:
+    """
+    Merge per-chunk segments (timestamps already absolute). A segment
+    belongs to the chunk whose keep range contains its midpoint; repeated
+    text straddling a cut is dropped.
+    """
+    merged: List[dict] = []
+    for (_, _, keep_from, keep_to), segments in sorted(chunk_results, key=lambda r: r[0][0]):
+        lo, hi = keep_from / SAMPLE_RATE, keep_to / SAMPLE_RATE
+        for seg in segments:
+            mid = (seg["start"] + seg["end"]) / 2
+            if not (lo <= mid < hi):
+                continue
+            if merged and merged[-1]["text"].strip().lower() == seg["text"].strip().lower() \
+                    and seg["start"] < merged[-1]["end"]:
+                continue
+            merged.append(seg)
+    return merged
+
+# --- worker process side ---
+_WORKER_MODEL = None
+
+def _init_worker(model_size: str, cpu_threads: int) -> None:
+    global _WORKER_MODEL
+    from .asr import load_model
+    _WORKER_MODEL = load_model(model_size, cpu_threads=cpu_threads)
+
+def _transcribe_chunk(audio: np.ndarray, offset: float, lang: Optional[str]) -> Tuple[List[dict], Optional[str]]:
+    from .asr import BEAM_SIZE
+    backend, model = _WORKER_MODEL
+    if backend == "faster":
+        segments, info = model.transcribe(audio, language=lang, beam_size=BEAM_SIZE)
+        segs = [{"start": s.start + offset, "end": s.end + offset, "text": s.text} for s in segments]
+        return segs, info.language
+    result = model.transcribe(audio, language=lang)
+    segs = [{"start": s["start"] + offset, "end": s["end"] + offset, "text": s["text"]} for s in result.get("segments", [])]
+    return segs, result.get("language")
+
+_POOL: Optional[ProcessPoolExecutor] = None
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _POOL
+    if _POOL is None:
+        _POOL = ProcessPoolExecutor(
+            max_workers=settings.long_audio_workers or max(1, (multiprocessing.cpu_count() or 2) // 2),
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(settings.whisper_model, settings.long_audio_cpu_threads),
+        )
+    return _POOL
+
+def transcribe_long(audio_path: str, lang_hint: Optional[str] = None, audio: Optional[np.ndarray] = None) -> Dict:
+    """
+    Transcribe a long recording in parallel chunks.
+    Returns the same shape as asr.transcribe plus the number of chunks.
+    """
+    try:
+        if audio is None:
+            audio = load_audio(audio_path)
+        splits = find_split_points(audio, settings.long_audio_chunk_seconds)
+        chunks = make_chunks(len(audio), splits, settings.long_audio_overlap_seconds)
+        pool = _get_pool()
+
+        def submit(chunk, lang):
+            start, end = chunk[0], chunk[1]
+            return pool.submit(_transcribe_chunk, audio[start:end], start / SAMPLE_RATE, lang)
+
+        # First chunk fixes the language so every chunk decodes consistently
+        first_segments, lang = submit(chunks[0], lang_hint).result()
+        futures = [submit(c, lang_hint or lang) for c in chunks[1:]]
+        results = [(chunks[0], first_segments)] + [(c, f.result()[0]) for c, f in zip(chunks[1:], futures)]
+
+        segments = stitch(results)
+        text = " ".join(s["text"].strip() for s in segments)
+        app_logger.info(f"Long-audio transcription: {len(chunks)} chunks, {len(audio) / SAMPLE_RATE:.0f}s")
+        return {"text": text.strip(), "segments": segments, "lang": lang_hint or lang, "chunks": len(chunks)}
+    except Exception as e:
+        app_logger.error(f"Long-audio transcription failed for {audio_path}: {e}")
+        raise ASRException(f"Long-audio transcription failed: {e}")
@@ -0,0 +1,97 @@
+# src/backend/model_worker.py
+"""
+Model worker: serves ASR, translation and grammar over HTTP for API
+processes running in slim mode (MODEL_WORKER_URL). It loads the models once
+(startup warmup) and reuses the same replica pools and caches as the
+monolithic app:
+    python -m src.backend.model_worker --port 8100
+    MODEL_WORKER_URL=http://localhost:8100 python -m src.backend.app --port 8000
+"""
+import asyncio
+from typing import Optional
+import uvicorn
+from fastapi import FastAPI, File, Form, HTTPException, UploadFile
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+from .config import settings
+from .exceptions import ASRException, TranslationException
+from .logger import app_logger
+
+app = FastAPI(title="Multilingual Chatbot model worker", version="1.0.0")
+
+@app.on_event("startup")
+async def startup_event():
+    from . import warmup
+    if settings.warmup_enabled:
+        # Model stages only; phrasebook, TTS and the LLM stay with the API
+        stages = [s for s in warmup.parse_stages(settings.warmup_stages) if s in warmup.WORKER_STAGES]
+        app.state.warmup_task = asyncio.create_task(asyncio.to_thread(warmup.run_warmup, stages))
+    else:
+        warmup.mark_skipped()
+
+@app.get("/health")
+async def health():
+    return {"success": True, "data": {"status": "ok"}}
+
+@app.get("/ready")
+async def ready():
+    from .warmup import WARMUP_STATE, is_ready
+    return JSONResponse({"success": is_ready(), "data": WARMUP_STATE}, status_code=200 if is_ready() else 503)
+
+@app.get("/stats")
+async def stats():
+    from . import asr
+    return {"success": True, "data": {"asr": asr.pool_stats()}}
+
+@app.post("/asr")
+async def transcribe(file: UploadFile = File(...), lang_hint: Optional[str] = Form(None),
+                     long_audio: bool = Form(False), model_size: Optional[str] = Form(None),
+                     beam_size: Optional[int] = Form(None), pcm_f32: bool = Form(False)):
+    import numpy as np
+    from . import asr
+    content = await file.read()
+    name = file.filename or "upload"
+    try:
+        # Raw uploads are decoded by asr.transcribe, and only on a transcription cache miss
+        audio = np.frombuffer(content, dtype="<f4") if pcm_f32 else content
+        result = await asyncio.to_thread(asr.transcribe, name, lang_hint=lang_hint, long_audio=long_audio,
+                                         model_size=model_size, beam_size=beam_size, audio=audio)
+    except ASRException as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    return {"success": True, "data": result}
+
+class TranslateRequest(BaseModel):
+    text: str
+    src: str = "en"
+    tgt: str = "de"
+    batch_size: Optional[int] = None
+    num_beams: Optional[int] = None
+
+@app.post("/translate")
+async def translate(request: TranslateRequest):
+    from . import translator
+    try:
+        result = await asyncio.to_thread(translator.translate, request.text, request.src, request.tgt,
+                                         batch_size=request.batch_size, num_beams=request.num_beams)
+    except TranslationException as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    return {"success": True, "data": result}
+
+class GrammarRequest(BaseModel):
+    text: str
+    lang: str = "de"
+
+@app.post("/grammar")
+async def grammar(request: GrammarRequest):
+    from . import feedback
+    result = await asyncio.to_thread(feedback.grammar_correct, request.text, lang=request.lang)
+    return {"success": True, "data": result}
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Model worker for the slim API mode")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8100)
+    args = parser.parse_args()
+    app_logger.info(f"Model worker listening on {args.host}:{args.port}")
+    uvicorn.run(app, host=args.host, port=args.port)
@@ -0,0 +1,171 @@
+# src/backend/phrasebook.py
+"""
+Local phrasebook: curated everyday phrases (data/phrasebook.json) with
+ready-made explanations per target language. Greetings and other common
+questions are answered from a normalized-text index, with trigram fuzzy
+matching for typos and missing punctuation, instead of an LLM call.
+
+Precompile the index (e.g. in the Docker build) for fast startup:
+    python -m src.backend.phrasebook build
+"""
+import hashlib
+import json
+import os
+import time
+import unicodedata
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Optional
+from .config import settings
+from .logger import app_logger
+
+DEFAULT_SOURCE = Path(__file__).parent / "data" / "phrasebook.json"
+INDEX_FORMAT = 1
+
+def normalize(text: str) -> str:
+    """Casefold, drop Latin accents and punctuation, collapse whitespace."""
+    out = []
+    for ch in unicodedata.normalize("NFKD", text.casefold()):
+        if unicodedata.combining(ch) and out and out[-1].isascii():
+            continue  # é -> e, but keep Devanagari vowel signs
+        out.append(ch if ch.isalnum() or unicodedata.category(ch).startswith("M") else " ")
+    return " ".join("".join(out).split())
+
+def trigrams(norm: str) -> List[str]:
+    padded = f" {norm} "
+    return sorted({padded[i:i + 3] for i in range(len(padded) - 2)})
+
+def build_index(entries: List[dict], source_sha256: str = "") -> dict:
+    """The serializable index: phrases, their entry, answers and trigram postings."""
+    phrases: List[str] = []
+    phrase_entry: List[int] = []
+    postings: Dict[str, List[int]] = {}
+    seen: Dict[str, str] = {}
+    for idx, entry in enumerate(entries):
+        for phrase in entry["phrases"]:
+            norm = normalize(phrase)
+            if not norm:
+                continue
+            if norm in seen:
+                if seen[norm] != entry["id"]:
+                    app_logger.warning(f"Phrasebook phrase '{phrase}' is in both {seen[norm]} and {entry['id']}")
+                continue
+            seen[norm] = entry["id"]
+            pid = len(phrases)
+            phrases.append(norm)
+            phrase_entry.append(idx)
+            for gram in trigrams(norm):
+                postings.setdefault(gram, []).append(pid)
+    return {
+        "format": INDEX_FORMAT,
+        "source_sha256": source_sha256,
+        "entries": [{"id": e["id"], "answers": e["answers"]} for e in entries],
+        "phrases": phrases,
+        "phrase_entry": phrase_entry,
+        "postings": postings,
+    }
+
+def _source_digest(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+def compile_index(source: Path = DEFAULT_SOURCE, out: Optional[str] = None) -> str:
+    out = out or settings.phrasebook_index
+    data = Path(source).read_bytes()
+    index = build_index(json.loads(data)["entries"], _source_digest(data))
+    os.makedirs(os.path.dirname(out) or ".", exist_ok=True)
+    tmp = f"{out}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(index, f, ensure_ascii=False, separators=(",", ":"))
+    os.replace(tmp, out)
+    app_logger.info(f"Phrasebook index: {len(index['phrases'])} phrases from {len(index['entries'])} entries -> {out}")
+    return out
+
+class Phrasebook:
+    def __init__(self, source: Path = DEFAULT_SOURCE, index_path: Optional[str] = None, min_score: float = 0.8):
+        self.source = Path(source)
+        self.index_path = index_path
+        self.min_score = min_score
+        self._index: Optional[dict] = None
+        self._exact: Dict[str, int] = {}
+        self._sizes: List[int] = []
+        self.hits = 0
+        self.misses = 0
+
+    def load(self) -> "Phrasebook":
+        """Use the precompiled index if it matches the source, else build in memory."""
+        data = self.source.read_bytes()
+        digest = _source_digest(data)
+        index = None
+        if self.index_path and os.path.exists(self.index_path):
+            with open(self.index_path, encoding="utf-8") as f:
+                index = json.load(f)
+            if index.get("format") != INDEX_FORMAT or index.get("source_sha256") != digest:
+                app_logger.warning("Phrasebook index is stale; rebuilding in memory "
+                                   "(run `python -m src.backend.phrasebook build`)")
+                index = None
+        if index is None:
+            index = build_index(json.loads(data)["entries"], digest)
+        self._index = index
+        self._exact = {p: i for i, p in enumerate(index["phrases"])}
+        self._sizes = [len(trigrams(p)) for p in index["phrases"]]
+        return self
+
+    def lookup(self, text: str, target_lang: str) -> Optional[dict]:
+        """
+        Best match for `text` with an answer in `target_lang`, or None below
+        `min_score`. Score is 1.0 for an exact normalized match, else the
+        Dice coefficient of character trigrams.
+        """
+        if self._index is None:
+            self.load()
+        norm = normalize(text)
+        pid, score = self._exact.get(norm), 1.0
+        if pid is None and norm:
+            grams = trigrams(norm)
+            shared = Counter(p for g in grams for p in self._index["postings"].get(g, ()))
+            best = max(shared, key=lambda p: shared[p] / (len(grams) + self._sizes[p]), default=None)
+            if best is not None:
+                pid, score = best, 2 * shared[best] / (len(grams) + self._sizes[best])
+        if pid is None or score < self.min_score:
+            self.misses += 1
+            return None
+        entry = self._index["entries"][self._index["phrase_entry"][pid]]
+        answer = entry["answers"].get(target_lang)
+        if answer is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return {"id": entry["id"], "phrase": self._index["phrases"][pid], "score": round(score, 3), "answer": answer}
+
+    def stats(self) -> dict:
+        return {
+            "loaded": self._index is not None,
+            "phrases": len(self._exact),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+PHRASEBOOK = Phrasebook(
+    Path(settings.phrasebook_source) if settings.phrasebook_source else DEFAULT_SOURCE,
+    index_path=settings.phrasebook_index,
+    min_score=settings.phrasebook_min_score,
+)
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Phrasebook index tools")
+    sub = parser.add_subparsers(dest="command", required=True)
+    build = sub.add_parser("build", help="Precompile the phrasebook index")
+    build.add_argument("--source", default=str(PHRASEBOOK.source))
+    build.add_argument("--out", default=settings.phrasebook_index)
+    look = sub.add_parser("lookup", help="Look up a phrase")
+    look.add_argument("text")
+    look.add_argument("--target-lang", default="de")
+    args = parser.parse_args()
+    if args.command == "build":
+        print(compile_index(Path(args.source), args.out))
+    else:
+        PHRASEBOOK.load()
+        start = time.perf_counter()
+        match = PHRASEBOOK.lookup(args.text, args.target_lang)
+        print(json.dumps(match, ensure_ascii=False), f"({(time.perf_counter() - start) * 1e6:.0f} us)")
@@ -0,0 +1,111 @@
+# src/backend/quality.py
+"""
+Quality profiles (fast / balanced / accurate) and the load-adaptive
+controller that picks one per request.
+A profile fixes the Whisper model size and beam width, the TTS engine chain
+and, optionally, the TTS voice per language. Requests may ask for a profile (else
+QUALITY_DEFAULT). While the scheduler queue or p95 latency is above its
+high-water mark the controller steps every request down one profile at a
+time, and steps back up once both are below the low-water marks.
+"""
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+from .config import settings
+from .logger import app_logger
+
+@dataclass(frozen=True)
+class QualityProfile:
+    name: str
+    whisper_model: str
+    asr_beam_size: int
+    tts_engines: Optional[str] = None  # None = TTS_ENGINES / TTS_LANGUAGE_ENGINES
+    tts_voices: Optional[str] = None   # "de:de-DE-ConradNeural;en:en-US-GuyNeural"; None = engine default
+
+    def tts_chain(self) -> Optional[List[str]]:
+        return [n.strip() for n in self.tts_engines.split(",") if n.strip()] if self.tts_engines else None
+
+    def tts_voice(self, lang: str) -> Optional[str]:
+        for entry in (self.tts_voices or "").split(";"):
+            if ":" in entry:
+                code, voice = entry.split(":", 1)
+                if code.strip() == lang and voice.strip():
+                    return voice.strip()
+        return None
+
+# Ordered cheapest first; the controller steps along this list
+PROFILES: Dict[str, QualityProfile] = {
+    "fast": QualityProfile("fast", settings.quality_fast_model, asr_beam_size=1,
+                           tts_engines=settings.quality_fast_tts_engines or None,
+                           tts_voices=settings.quality_fast_tts_voices or None),
+    "balanced": QualityProfile("balanced", settings.whisper_model, asr_beam_size=5,
+                               tts_voices=settings.quality_balanced_tts_voices or None),
+    "accurate": QualityProfile("accurate", settings.quality_accurate_model, asr_beam_size=5,
+                               tts_voices=settings.quality_accurate_tts_voices or None),
+}
+ORDER = list(PROFILES)
+
+class QualityController:
+    def __init__(self, load: Callable[[], Tuple[int, float]], default: str = "balanced", adaptive: bool = True,
+                 queue_high: int = 8, queue_low: int = 2, p95_high_ms: float = 8000, p95_low_ms: float = 3000,
+                 cooldown_seconds: float = 10.0):
+        if default not in PROFILES:
+            raise ValueError(f"Unknown quality profile: {default}")
+        self.load = load
+        self.default = default
+        self.adaptive = adaptive
+        self.queue_high, self.queue_low = queue_high, queue_low
+        self.p95_high, self.p95_low = p95_high_ms / 1000.0, p95_low_ms / 1000.0
+        self.cooldown_seconds = cooldown_seconds
+        self.level = ORDER.index(default)
+        self._changed_at = 0.0
+        self._lock = threading.Lock()
+        self.steps_down = 0
+        self.steps_up = 0
+
+    def update(self, now: Optional[float] = None) -> str:
+        """Re-evaluate load and move at most one step; returns the level for default requests."""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            if not self.adaptive or now - self._changed_at < self.cooldown_seconds:
+                return ORDER[self.level]
+            queued, p95 = self.load()
+            if (queued >= self.queue_high or p95 >= self.p95_high) and self.level > 0:
+                self.level -= 1
+                self.steps_down += 1
+            elif queued <= self.queue_low and p95 <= self.p95_low and self.level < ORDER.index(self.default):
+                self.level += 1
+                self.steps_up += 1
+            else:
+                return ORDER[self.level]
+            self._changed_at = now
+            app_logger.info(f"Quality profile -> {ORDER[self.level]} (queued={queued}, p95={p95 * 1000:.0f}ms)")
+            return ORDER[self.level]
+
+    def select(self, requested: Optional[str] = None) -> QualityProfile:
+        """The profile for one request: the requested one (or the default), stepped down by current load."""
+        if requested is not None and requested not in PROFILES:
+            raise ValueError(f"Unknown quality profile: {requested}")
+        steps_down = ORDER.index(self.default) - ORDER.index(self.update())
+        wanted = ORDER.index(requested or self.default)
+        return PROFILES[ORDER[max(0, wanted - steps_down)]]
+
+    def stats(self) -> dict:
+        return {"current": ORDER[self.level], "default": self.default, "adaptive": self.adaptive,
+                "steps_down": self.steps_down, "steps_up": self.steps_up}
+
+def _scheduler_load() -> Tuple[int, float]:
+    from .scheduler import SCHEDULER
+    return SCHEDULER.queued(), SCHEDULER.p95_latency()
+
+QUALITY = QualityController(
+    _scheduler_load,
+    default=settings.quality_default,
+    adaptive=settings.quality_adaptive,
+    queue_high=settings.quality_queue_high,
+    queue_low=settings.quality_queue_low,
+    p95_high_ms=settings.quality_p95_high_ms,
+    p95_low_ms=settings.quality_p95_low_ms,
+    cooldown_seconds=settings.quality_cooldown_seconds,
+)
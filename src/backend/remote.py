@@ -0,0 +1,93 @@
+# src/backend/remote.py
+"""
+Model-worker client for the slim API mode (MODEL_WORKER_URL set).
+Same call signatures as asr, translator and feedback, but every call is an
+HTTP request to src/backend/model_worker.py, which holds the models. The API
+process then never imports numpy, torch, transformers, Whisper or
+LanguageTool, so it starts fast and small enough for serverless.
+"""
+import os
+import threading
+import time
+from types import SimpleNamespace
+from typing import Optional
+import httpx
+from .config import settings
+from .exceptions import ASRException, TranslationException
+from .logger import app_logger
+
+_CLIENT: Optional[httpx.Client] = None
+_CLIENT_LOCK = threading.Lock()
+_STATS = {"requests": 0, "errors": 0, "seconds": 0.0}
+_STATS_LOCK = threading.Lock()
+
+def _client() -> httpx.Client:
+    global _CLIENT
+    with _CLIENT_LOCK:
+        if _CLIENT is None:
+            # One keep-alive pool shared by all worker threads
+            _CLIENT = httpx.Client(
+                base_url=settings.model_worker_url.rstrip("/"),
+                timeout=settings.model_worker_timeout_seconds,
+                limits=httpx.Limits(max_connections=settings.model_worker_connections,
+                                    max_keepalive_connections=settings.model_worker_connections),
+            )
+        return _CLIENT
+
+def _call(method: str, path: str, error=Exception, **kwargs) -> dict:
+    t0 = time.monotonic()
+    try:
+        response = _client().request(method, path, **kwargs)
+        response.raise_for_status()
+        return response.json()["data"]
+    except (httpx.HTTPError, KeyError, ValueError) as e:
+        with _STATS_LOCK:
+            _STATS["errors"] += 1
+        app_logger.error(f"Model worker {path} failed: {e}")
+        raise error(f"Model worker {path} failed: {e}")
+    finally:
+        with _STATS_LOCK:
+            _STATS["requests"] += 1
+            _STATS["seconds"] += time.monotonic() - t0
+
+def _transcribe(audio_path: str, lang_hint: Optional[str] = None, long_audio: bool = False,
+                model_size: Optional[str] = None, beam_size: Optional[int] = None, audio=None) -> dict:
+    # The upload goes over as-is (the worker decodes it); an already decoded array as raw float32
+    name, pcm = os.path.basename(str(audio_path)) or "audio", False
+    if audio is None:
+        with open(audio_path, "rb") as f:
+            data = f.read()
+    elif isinstance(audio, (bytes, bytearray)):
+        data = bytes(audio)
+    else:
+        data, pcm = audio.astype("<f4").tobytes(), True
+    form = {"long_audio": str(long_audio).lower(), "pcm_f32": str(pcm).lower()}
+    for key, value in (("lang_hint", lang_hint), ("model_size", model_size), ("beam_size", beam_size)):
+        if value is not None:
+            form[key] = str(value)
+    return _call("POST", "/asr", ASRException, files={"file": (name, data)}, data=form)
+
+def _translate(text: str, src="en", tgt="de", batch_size: int = None, num_beams: int = None) -> dict:
+    body = {"text": text, "src": src, "tgt": tgt, "batch_size": batch_size, "num_beams": num_beams}
+    return _call("POST", "/translate", TranslationException, json=body)
+
+def _grammar_correct(text: str, lang="de") -> dict:
+    try:
+        return _call("POST", "/grammar", json={"text": text, "lang": lang})
+    except Exception:
+        # Same degradation as a missing LanguageTool: no corrections, never a failed turn
+        return {"corrected": text, "matches": []}
+
+def ready() -> dict:
+    """The worker's warmup state; raises if it is unreachable."""
+    return _call("GET", "/ready")
+
+def stats() -> dict:
+    with _STATS_LOCK:
+        n = _STATS["requests"]
+        return {"url": settings.model_worker_url, "requests": n, "errors": _STATS["errors"],
+                "avg_ms": round(1000 * _STATS["seconds"] / n, 1) if n else 0.0}
+
+asr = SimpleNamespace(transcribe=_transcribe)
+translator = SimpleNamespace(translate=_translate)
+feedback = SimpleNamespace(grammar_correct=_grammar_correct)
@@ -0,0 +1,153 @@
+# src/backend/response_format.py
+"""
+Content negotiation for chat replies.
+Accept: application/msgpack -> MessagePack with the reply audio as raw bytes
+Accept: multipart/mixed     -> JSON metadata part + audio part
+anything else               -> the usual JSON body (reply_audio_url only)
+Either binary format delivers the reply and its audio in one round-trip
+without base64. JSONGZipMiddleware compresses JSON/text responses only.
+"""
+import asyncio
+import gzip
+import json
+import uuid
+from pathlib import Path
+from typing import List, Optional, Tuple
+from fastapi.responses import JSONResponse, Response
+from starlette.datastructures import Headers, MutableHeaders
+from .audio_store import media_type
+
+try:
+    import msgpack
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    MSGPACK_AVAILABLE = False
+
+MSGPACK_TYPES = ("application/msgpack", "application/x-msgpack", "application/vnd.msgpack")
+MULTIPART_TYPES = ("multipart/mixed", "multipart/*")
+
+def parse_accept(accept: Optional[str]) -> List[Tuple[str, float]]:
+    """Media ranges ordered by q-value (stable for equal q)."""
+    ranges = []
+    for item in (accept or "").split(","):
+        mtype, *params = [p.strip() for p in item.split(";")]
+        q = 1.0
+        for p in params:
+            if p.startswith("q="):
+                try:
+                    q = float(p[2:])
+                except ValueError:
+                    q = 0.0
+        if mtype and q > 0:
+            ranges.append((mtype.lower(), q))
+    return sorted(ranges, key=lambda r: -r[1])
+
+def negotiate(accept: Optional[str]) -> str:
+    """"msgpack", "multipart" or "json"."""
+    for mtype, _ in parse_accept(accept):
+        if mtype in MSGPACK_TYPES and MSGPACK_AVAILABLE:
+            return "msgpack"
+        if mtype in MULTIPART_TYPES:
+            return "multipart"
+        if mtype in ("application/json", "application/*", "*/*"):
+            return "json"
+    return "json"
+
+def pack_msgpack(body: dict, audio: Optional[bytes], audio_type: Optional[str]) -> bytes:
+    data = dict(body.get("data") or {})
+    data["reply_audio"] = audio
+    data["reply_audio_type"] = audio_type
+    return msgpack.packb({**body, "data": data}, use_bin_type=True)
+
+def pack_multipart(body: dict, audio: Optional[bytes], audio_type: Optional[str], filename: str,
+                   boundary: str) -> bytes:
+    meta = json.dumps(body, ensure_ascii=False).encode("utf-8")
+    parts = [
+        f"--{boundary}\r\nContent-Type: application/json; charset=utf-8\r\n"
+        f"Content-Disposition: inline; name=\"metadata\"\r\n\r\n".encode(),
+        meta,
+        b"\r\n",
+    ]
+    if audio is not None:
+        parts += [
+            f"--{boundary}\r\nContent-Type: {audio_type}\r\n"
+            f"Content-Disposition: attachment; name=\"audio\"; filename=\"{filename}\"\r\n"
+            f"Content-Length: {len(audio)}\r\n\r\n".encode(),
+            audio,
+            b"\r\n",
+        ]
+    parts.append(f"--{boundary}--\r\n".encode())
+    return b"".join(parts)
+
+async def reply_response(body: dict, accept: Optional[str]) -> Response:
+    """Render a {"success", "data"} chat body in the negotiated format."""
+    fmt = negotiate(accept)
+    if fmt == "json":
+        return JSONResponse(body, headers={"Vary": "Accept"})
+
+    audio, audio_type, filename = None, None, ""
+    audio_path = (body.get("data") or {}).get("reply_audio_path")
+    if audio_path and Path(audio_path).exists():
+        path = Path(audio_path)
+        audio = await asyncio.to_thread(path.read_bytes)
+        audio_type, filename = media_type(path), path.name
+
+    if fmt == "msgpack":
+        return Response(pack_msgpack(body, audio, audio_type), media_type="application/msgpack",
+                        headers={"Vary": "Accept"})
+    boundary = uuid.uuid4().hex
+    return Response(pack_multipart(body, audio, audio_type, filename, boundary),
+                    media_type=f"multipart/mixed; boundary={boundary}", headers={"Vary": "Accept"})
+
+COMPRESSIBLE = ("application/json", "text/plain", "text/html", "text/csv")
+
+class JSONGZipMiddleware:
+    """
+    GZip for complete JSON/text bodies only. Audio, binary replies, range
+    responses and streams (SSE, file ranges) pass through untouched, so no
+    CPU is spent recompressing MP3/Opus and byte ranges stay valid.
+    """
+
+    def __init__(self, app, minimum_size: int = 1000, compresslevel: int = 6):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.compresslevel = compresslevel
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or "gzip" not in Headers(scope=scope).get("accept-encoding", ""):
+            await self.app(scope, receive, send)
+            return
+
+        start = None
+        passthrough = False
+
+        async def send_maybe_compressed(message):
+            nonlocal start, passthrough
+            if passthrough:
+                await send(message)
+                return
+            if message["type"] == "http.response.start":
+                headers = Headers(raw=message["headers"])
+                ctype = headers.get("content-type", "").split(";")[0].strip().lower()
+                if message["status"] == 206 or "content-encoding" in headers or ctype not in COMPRESSIBLE:
+                    passthrough = True
+                    await send(message)
+                else:
+                    start = message
+                return
+            body = message.get("body", b"")
+            if message["type"] != "http.response.body" or message.get("more_body", False) \
+                    or len(body) < self.minimum_size:
+                passthrough = True
+                await send(start)
+                await send(message)
+                return
+            compressed = gzip.compress(body, compresslevel=self.compresslevel)
+            headers = MutableHeaders(raw=start["headers"])
+            headers["Content-Encoding"] = "gzip"
+            headers["Content-Length"] = str(len(compressed))
+            headers.add_vary_header("Accept-Encoding")
+            await send(start)
+            await send({**message, "body": compressed})
+
+        await self.app(scope, receive, send_maybe_compressed)
@@ -0,0 +1,180 @@
+# src/backend/scheduler.py
+"""
+Admission scheduler in front of the orchestrator.
+Requests wait for one of `max_concurrency` slots. Between priority classes
+dispatch is weighted-fair (each class advances a virtual clock by
+cost / weight); within a class the cheapest request goes first (SJF).
+A per-client cap keeps one heavy user from occupying every slot.
+"""
+import asyncio
+import io
+import itertools
+import math
+import os
+import time
+import wave
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Dict, List, Optional, Union
+from .config import settings
+from .exceptions import OverloadedException
+from .logger import app_logger
+
+INTERACTIVE = "interactive"
+BULK = "bulk"
+
+def parse_weights(spec: str) -> Dict[str, float]:
+    weights = {}
+    for entry in spec.split(","):
+        if ":" in entry:
+            name, weight = entry.split(":", 1)
+            weights[name.strip()] = float(weight)
+    return weights
+
+def estimate_text_cost(text: str) -> float:
+    """Rough seconds of work for a text turn (LLM + TTS scale with length)."""
+    return 1.0 + len(text) / 200.0
+
+def audio_duration(source: Union[str, bytes]) -> float:
+    """
+    Duration in seconds of a file path or in-memory upload from the WAV
+    header, else estimated from its size (~128 kbps). Never decodes.
+    """
+    try:
+        with wave.open(io.BytesIO(source) if isinstance(source, bytes) else source, "rb") as w:
+            return w.getnframes() / float(w.getframerate())
+    except Exception:
+        try:
+            return (len(source) if isinstance(source, bytes) else os.path.getsize(source)) / 16000.0
+        except OSError:
+            return 0.0
+
+def estimate_audio_cost(path: str, duration: Optional[float] = None) -> float:
+    """Text-turn cost plus ASR time, assuming ASR runs at ~0.3x real time on CPU."""
+    return 2.0 + 0.3 * (audio_duration(path) if duration is None else duration)
+
+class _Ticket:
+    __slots__ = ("client_id", "klass", "cost", "seq", "future")
+
+    def __init__(self, client_id: str, klass: str, cost: float, seq: int):
+        self.client_id = client_id
+        self.klass = klass
+        self.cost = cost
+        self.seq = seq
+        self.future: asyncio.Future = asyncio.get_running_loop().create_future()
+
+class AdmissionScheduler:
+    def __init__(self, max_concurrency: int, per_client_limit: int, weights: Dict[str, float], max_queue: int = 100,
+                 latency_window: int = 200):
+        self.max_concurrency = max_concurrency
+        self.per_client_limit = per_client_limit
+        self.weights = weights
+        self.max_queue = max_queue
+        self._queues: Dict[str, List[_Ticket]] = {k: [] for k in weights}
+        self._vtime: Dict[str, float] = {k: 0.0 for k in weights}
+        # Virtual start time of the last admitted request; a class returning from idle starts here
+        self._vclock = 0.0
+        self._running = 0
+        self._per_client: Dict[str, int] = {}
+        self._seq = itertools.count()
+        self.admitted = 0
+        self.rejected = 0
+        # Queue wait + run time of the most recent requests, for load-adaptive quality
+        self._latencies: deque = deque(maxlen=latency_window)
+
+    def queued(self) -> int:
+        return sum(len(q) for q in self._queues.values())
+
+    def p95_latency(self) -> float:
+        """Nearest-rank p95 of recent request latencies in seconds (0 before any finished)."""
+        if not self._latencies:
+            return 0.0
+        ordered = sorted(self._latencies)
+        return ordered[max(1, math.ceil(0.95 * len(ordered))) - 1]
+
+    @asynccontextmanager
+    async def slot(self, client_id: str, klass: str = INTERACTIVE, cost: float = 1.0):
+        """Wait for admission, run the body, then hand the slot to the next request."""
+        if klass not in self._queues:
+            klass = BULK if BULK in self._queues else next(iter(self._queues))
+        if self.queued() >= self.max_queue:
+            self.rejected += 1
+            app_logger.warning(f"Rejecting {klass} request from {client_id}: queue full")
+            raise OverloadedException("Server is overloaded, please retry later")
+
+        enqueued = time.monotonic()
+        ticket = _Ticket(client_id, klass, cost, next(self._seq))
+        if not self._queues[klass]:
+            # An idle class must not bank credit: it rejoins at the current virtual time
+            self._vtime[klass] = max(self._vtime[klass], self._vclock)
+        self._queues[klass].append(ticket)
+        self._dispatch()
+        try:
+            await ticket.future
+        except asyncio.CancelledError:
+            if ticket.future.done() and not ticket.future.cancelled():
+                self._release(ticket)
+            elif ticket in self._queues[klass]:
+                self._queues[klass].remove(ticket)
+            raise
+        try:
+            yield
+        finally:
+            self._latencies.append(time.monotonic() - enqueued)
+            self._release(ticket)
+
+    def _eligible(self, queue: List[_Ticket]) -> Optional[_Ticket]:
+        best = None
+        for t in queue:
+            if self._per_client.get(t.client_id, 0) >= self.per_client_limit:
+                continue
+            if best is None or (t.cost, t.seq) < (best.cost, best.seq):
+                best = t
+        return best
+
+    def _dispatch(self) -> None:
+        # Waiters cancelled since the last dispatch have not run their cleanup yet; never admit them
+        for queue in self._queues.values():
+            queue[:] = [t for t in queue if not t.future.done()]
+        while self._running < self.max_concurrency:
+            choice = None
+            for klass, queue in self._queues.items():
+                ticket = self._eligible(queue)
+                if ticket and (choice is None or self._vtime[klass] < self._vtime[choice.klass]):
+                    choice = ticket
+            if choice is None:
+                return
+            self._queues[choice.klass].remove(choice)
+            choice.future.set_result(None)
+            self._vclock = self._vtime[choice.klass]
+            self._vtime[choice.klass] += choice.cost / self.weights[choice.klass]
+            self._running += 1
+            self._per_client[choice.client_id] = self._per_client.get(choice.client_id, 0) + 1
+            self.admitted += 1
+
+    def _release(self, ticket: _Ticket) -> None:
+        self._running -= 1
+        count = self._per_client.get(ticket.client_id, 1) - 1
+        if count:
+            self._per_client[ticket.client_id] = count
+        else:
+            self._per_client.pop(ticket.client_id, None)
+        self._dispatch()
+
+    def stats(self) -> dict:
+        return {
+            "running": self._running,
+            "max_concurrency": self.max_concurrency,
+            "queued": {k: len(q) for k, q in self._queues.items()},
+            "clients": dict(self._per_client),
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "p95_ms": round(self.p95_latency() * 1000, 1),
+        }
+
+SCHEDULER = AdmissionScheduler(
+    max_concurrency=settings.scheduler_max_concurrency,
+    per_client_limit=settings.scheduler_per_client_limit,
+    weights=parse_weights(settings.scheduler_weights),
+    max_queue=settings.scheduler_max_queue,
+)
@@ -0,0 +1,383 @@
+# src/backend/store.py
+"""
+Shared key/value store for caches and conversation state.
+STORE_URL selects the backend:
+    ""  or memory://            in-process (single replica; the default)
+    redis://[:password@]host:port/db   any Redis-protocol server, shared by all replicas
+Both backends expose the same small command set (strings with TTL, lists)
+and pipelines that send a batch of commands in one round-trip.
+For development and tests, src/tools/miniredis.py serves this store over RESP.
+"""
+import queue
+import socket
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+from .config import settings
+from .exceptions import StoreException
+from .logger import app_logger
+
+Command = Tuple[str, tuple]
+
+def _key_positions(name: str, args: tuple) -> range:
+    # DEL takes only keys; every other command here takes one key first
+    return range(len(args)) if name == "delete" else range(min(1, len(args)))
+
+class Store:
+    """Base class; subclasses implement `_run` for a batch of commands."""
+    name = "base"
+    shared = False  # visible to other replicas?
+
+    def __init__(self, prefix: str = ""):
+        self.prefix = prefix
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self._run_one("get", key)
+
+    def set(self, key: str, value, ttl: Optional[float] = None, nx: bool = False) -> bool:
+        """Store value (optionally only if absent); ttl in seconds."""
+        return self._run_one("set", key, value, ttl, nx)
+
+    def delete(self, *keys: str) -> int:
+        return self._run_one("delete", *keys)
+
+    def expire(self, key: str, ttl: float) -> bool:
+        return self._run_one("expire", key, ttl)
+
+    def rpush(self, key: str, *values) -> int:
+        return self._run_one("rpush", key, *values)
+
+    def lrange(self, key: str, start: int, stop: int) -> List[bytes]:
+        return self._run_one("lrange", key, start, stop)
+
+    def ltrim(self, key: str, start: int, stop: int) -> bool:
+        return self._run_one("ltrim", key, start, stop)
+
+    def pipeline(self) -> "Pipeline":
+        return Pipeline(self)
+
+    def _prefixed(self, commands: List[Command]) -> List[Command]:
+        if not self.prefix:
+            return commands
+        out = []
+        for name, args in commands:
+            args = list(args)
+            for i in _key_positions(name, args):
+                args[i] = self.prefix + args[i]
+            out.append((name, tuple(args)))
+        return out
+
+    def _run_one(self, name: str, *args):
+        return self._run([(name, args)])[0]
+
+    def _run(self, commands: List[Command]) -> list:
+        raise NotImplementedError
+
+    def stats(self) -> dict:
+        return {"backend": self.name, "shared": self.shared}
+
+class Pipeline:
+    """Queue commands, then send them together with execute() (or on leaving a with-block)."""
+
+    def __init__(self, store: Store):
+        self.store = store
+        self.commands: List[Command] = []
+        self.results: Optional[list] = None
+
+    def _add(self, name: str, *args) -> "Pipeline":
+        self.commands.append((name, args))
+        return self
+
+    def get(self, key):
+        return self._add("get", key)
+
+    def set(self, key, value, ttl=None, nx=False):
+        return self._add("set", key, value, ttl, nx)
+
+    def delete(self, *keys):
+        return self._add("delete", *keys)
+
+    def expire(self, key, ttl):
+        return self._add("expire", key, ttl)
+
+    def rpush(self, key, *values):
+        return self._add("rpush", key, *values)
+
+    def lrange(self, key, start, stop):
+        return self._add("lrange", key, start, stop)
+
+    def ltrim(self, key, start, stop):
+        return self._add("ltrim", key, start, stop)
+
+    def execute(self) -> list:
+        self.results = self.store._run(self.commands) if self.commands else []
+        self.commands = []
+        return self.results
+
+    def __enter__(self) -> "Pipeline":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.execute()
+
+def _to_bytes(value) -> bytes:
+    if isinstance(value, bytes):
+        return value
+    return str(value).encode("utf-8")
+
+def _slice(length: int, start: int, stop: int) -> Tuple[int, int]:
+    """Redis inclusive, negative-aware list indices -> Python slice bounds."""
+    if start < 0:
+        start = max(0, length + start)
+    if stop < 0:
+        stop = length + stop
+    return start, min(stop, length - 1) + 1
+
+class LocalStore(Store):
+    """In-process backend with Redis semantics; also the data engine of miniredis."""
+    name = "memory"
+
+    def __init__(self, prefix: str = ""):
+        super().__init__(prefix)
+        self._data: Dict[str, Any] = {}
+        self._expires: Dict[str, float] = {}
+        self._lock = threading.RLock()
+
+    def _run(self, commands: List[Command]) -> list:
+        with self._lock:
+            return [getattr(self, f"_op_{name}")(*args) for name, args in self._prefixed(commands)]
+
+    def _live(self, key: str) -> bool:
+        deadline = self._expires.get(key)
+        if deadline is not None and deadline <= time.monotonic():
+            self._data.pop(key, None)
+            self._expires.pop(key, None)
+        return key in self._data
+
+    def _list(self, key: str) -> list:
+        if not self._live(key):
+            return []
+        value = self._data[key]
+        if not isinstance(value, list):
+            raise StoreException("WRONGTYPE Operation against a key holding the wrong kind of value")
+        return value
+
+    def _op_get(self, key):
+        if not self._live(key):
+            return None
+        value = self._data[key]
+        if isinstance(value, list):
+            raise StoreException("WRONGTYPE Operation against a key holding the wrong kind of value")
+        return value
+
+    def _op_set(self, key, value, ttl=None, nx=False):
+        if nx and self._live(key):
+            return False
+        self._data[key] = _to_bytes(value)
+        if ttl:
+            self._expires[key] = time.monotonic() + float(ttl)
+        else:
+            self._expires.pop(key, None)
+        return True
+
+    def _op_delete(self, *keys):
+        removed = 0
+        for key in keys:
+            if self._live(key):
+                del self._data[key]
+                removed += 1
+            self._expires.pop(key, None)
+        return removed
+
+    def _op_expire(self, key, ttl):
+        if not self._live(key):
+            return False
+        self._expires[key] = time.monotonic() + float(ttl)
+        return True
+
+    def _op_rpush(self, key, *values):
+        items = self._list(key)
+        if key not in self._data:
+            self._data[key] = items
+        items.extend(_to_bytes(v) for v in values)
+        return len(items)
+
+    def _op_lrange(self, key, start, stop):
+        items = self._list(key)
+        lo, hi = _slice(len(items), int(start), int(stop))
+        return items[lo:hi]
+
+    def _op_ltrim(self, key, start, stop):
+        items = self._list(key)
+        lo, hi = _slice(len(items), int(start), int(stop))
+        if key in self._data:
+            if lo >= hi:
+                self._op_delete(key)
+            else:
+                self._data[key] = items[lo:hi]
+        return True
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {**super().stats(), "keys": len(self._data)}
+
+# --- RESP client ---
+
+def encode_command(*args) -> bytes:
+    out = [f"*{len(args)}\r\n".encode()]
+    for arg in args:
+        data = _to_bytes(arg)
+        out.append(f"${len(data)}\r\n".encode() + data + b"\r\n")
+    return b"".join(out)
+
+class RedisError(Exception):
+    """An error reply; kept as a value so the rest of a pipeline can still be read."""
+
+def read_reply(reader):
+    line = reader.readline()
+    if not line:
+        raise ConnectionError("connection closed by server")
+    kind, body = line[:1], line[1:-2]
+    if kind == b"+":
+        return body.decode()
+    if kind == b"-":
+        return RedisError(body.decode())
+    if kind == b":":
+        return int(body)
+    if kind == b"$":
+        n = int(body)
+        if n < 0:
+            return None
+        data = reader.read(n + 2)
+        if len(data) != n + 2:
+            raise ConnectionError("connection closed mid-reply")
+        return data[:-2]
+    if kind == b"*":
+        n = int(body)
+        return None if n < 0 else [read_reply(reader) for _ in range(n)]
+    raise ConnectionError(f"bad reply: {line!r}")
+
+class _Connection:
+    def __init__(self, host: str, port: int, timeout: float):
+        self.sock = socket.create_connection((host, port), timeout=timeout)
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.reader = self.sock.makefile("rb")
+
+    def call(self, payloads: List[tuple]) -> list:
+        self.sock.sendall(b"".join(encode_command(*p) for p in payloads))
+        return [read_reply(self.reader) for _ in payloads]
+
+    def close(self) -> None:
+        try:
+            self.reader.close()
+            self.sock.close()
+        except OSError:
+            pass
+
+def _resp_args(name: str, args: tuple) -> tuple:
+    if name == "set":
+        key, value, ttl, nx = args
+        out = ("SET", key, value)
+        if ttl:
+            out += ("PX", int(float(ttl) * 1000))
+        return out + (("NX",) if nx else ())
+    if name == "expire":
+        return ("PEXPIRE", args[0], int(float(args[1]) * 1000))
+    return ({"get": "GET", "delete": "DEL", "rpush": "RPUSH", "lrange": "LRANGE", "ltrim": "LTRIM"}[name],) + args
+
+def _convert(name: str, reply):
+    if name == "set":
+        return reply == "OK"
+    if name == "expire":
+        return reply == 1
+    if name == "ltrim":
+        return reply == "OK"
+    return reply
+
+class RedisStore(Store):
+    """
+    Redis-protocol client with a bounded connection pool. Connections are
+    opened lazily; a connection that errors is dropped, not reused.
+    """
+    name = "redis"
+    shared = True
+
+    def __init__(self, url: str, pool_size: int = 8, timeout: float = 2.0, prefix: str = ""):
+        super().__init__(prefix)
+        parsed = urlparse(url)
+        self.host = parsed.hostname or "localhost"
+        self.port = parsed.port or 6379
+        self.password = parsed.password
+        self.db = int(parsed.path.lstrip("/") or 0)
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self._idle: "queue.LifoQueue[_Connection]" = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(pool_size)
+        self.opened = 0
+        self.round_trips = 0
+
+    def _connect(self) -> _Connection:
+        conn = _Connection(self.host, self.port, self.timeout)
+        setup = []
+        if self.password:
+            setup.append(("AUTH", self.password))
+        if self.db:
+            setup.append(("SELECT", self.db))
+        for reply in conn.call(setup) if setup else []:
+            if isinstance(reply, RedisError):
+                conn.close()
+                raise StoreException(f"Redis setup failed: {reply}")
+        self.opened += 1
+        return conn
+
+    def _run(self, commands: List[Command]) -> list:
+        if not self._slots.acquire(timeout=self.timeout):
+            raise StoreException("Redis connection pool exhausted")
+        conn = None
+        try:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                conn = self._connect()
+            commands = self._prefixed(commands)
+            replies = conn.call([_resp_args(name, args) for name, args in commands])
+            self.round_trips += 1
+            self._idle.put(conn)
+        except (OSError, ConnectionError, ValueError) as e:
+            # A malformed reply leaves the stream at an unknown offset, so the connection is never reused
+            if conn is not None:
+                conn.close()
+            app_logger.error(f"Redis store {self.host}:{self.port} failed: {e}")
+            raise StoreException(f"Redis store unavailable: {e}")
+        except BaseException:
+            if conn is not None:
+                conn.close()
+            raise
+        finally:
+            self._slots.release()
+        errors = [r for r in replies if isinstance(r, RedisError)]
+        if errors:
+            raise StoreException(str(errors[0]))
+        return [_convert(name, r) for (name, _), r in zip(commands, replies)]
+
+    def close(self) -> None:
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+    def stats(self) -> dict:
+        return {**super().stats(), "url": f"redis://{self.host}:{self.port}/{self.db}",
+                "connections": self.opened, "idle": self._idle.qsize(), "round_trips": self.round_trips}
+
+def make_store(url: str, pool_size: int = 8, timeout: float = 2.0, prefix: str = "") -> Store:
+    if not url or url.startswith("memory://"):
+        return LocalStore(prefix)
+    if url.startswith("redis://"):
+        return RedisStore(url, pool_size=pool_size, timeout=timeout, prefix=prefix)
+    raise ValueError(f"Unsupported STORE_URL: {url}")
+
+STORE = make_store(settings.store_url, settings.store_pool_size, settings.store_timeout_seconds, settings.store_prefix)
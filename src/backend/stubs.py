@@ -0,0 +1,68 @@
+# src/backend/stubs.py
+"""
+Stub pipeline backends for load testing and CI (STUB_BACKENDS=1).
+Same call signatures as asr, tts, translator, llm_helper and feedback, but
+no models and no network: each stage sleeps for a configurable time and
+returns canned output, so the HTTP, scheduling and file-serving layers can
+be measured on their own.
+"""
+import asyncio
+import os
+import time
+from types import SimpleNamespace
+from typing import Optional
+from .config import settings
+
+STUB_TRANSCRIPT = "I would like to practice talking about my weekend plans."
+
+# A tiny valid MPEG-1 Layer III frame header padded to one frame of silence
+_SILENT_MP3 = b"\xff\xfb\x90\x64" + b"\x00" * 413
+
+def _sleep_ms(ms: float) -> None:
+    if ms > 0:
+        time.sleep(ms / 1000.0)
+
+def _transcribe(audio_path: str, lang_hint: Optional[str] = None, long_audio: bool = False, **kwargs) -> dict:
+    from .scheduler import audio_duration
+    # Blocking, like the real decoder; scaled by audio length
+    audio = kwargs.get("audio")
+    if audio is None or isinstance(audio, bytes):
+        duration = audio_duration(audio_path if audio is None else audio)
+    else:
+        duration = len(audio) / 16000.0
+    _sleep_ms(settings.stub_asr_ms * max(1.0, duration / 5.0))
+    # Not a phrasebook phrase: the turn must go through the LLM stage to be worth measuring
+    return {"text": STUB_TRANSCRIPT, "segments": [], "lang": lang_hint or "en"}
+
+async def _synthesize_to_file(text: str, out_path: str, lang: str = "en", **kwargs) -> str:
+    await asyncio.sleep(settings.stub_tts_ms / 1000.0)
+    os.makedirs(os.path.dirname(out_path) or ".", exist_ok=True)
+    with open(out_path, "wb") as f:
+        f.write(_SILENT_MP3)
+    return out_path
+
+def _get_chat_response(user_text: str, context: str = "") -> str:
+    _sleep_ms(settings.stub_llm_ms)
+    return f"(stub) Du hast gesagt: {user_text}"
+
+def _explain_in_target_lang(topic: str, target_lang: str = "German", audience_level="beginner") -> str:
+    _sleep_ms(settings.stub_llm_ms)
+    return f"(stub {target_lang}) {topic}"
+
+def _chat_with_corrections(user_text: str, target_lang: str = "de", context: str = "") -> dict:
+    _sleep_ms(settings.stub_llm_ms)
+    return {"reply": f"(stub) Du hast gesagt: {user_text}", "grammar": {"corrected": user_text, "matches": []}}
+
+def _grammar_correct(text: str, lang="de") -> dict:
+    return {"corrected": text, "matches": []}
+
+def _translate(text: str, src="en", tgt="de", **kwargs) -> dict:
+    return {"translated_text": text, "source_language": src, "target_language": tgt,
+            "confidence": 1.0, "route": [f"{src}-{tgt}"], "pivot": None, "models": [], "backends": ["stub"]}
+
+asr = SimpleNamespace(transcribe=_transcribe)
+tts = SimpleNamespace(synthesize_to_file=_synthesize_to_file)
+llm_helper = SimpleNamespace(get_chat_response=_get_chat_response, explain_in_target_lang=_explain_in_target_lang,
+                             chat_with_corrections=_chat_with_corrections)
+feedback = SimpleNamespace(grammar_correct=_grammar_correct)
+translator = SimpleNamespace(translate=_translate)
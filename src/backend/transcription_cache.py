@@ -0,0 +1,176 @@
+# src/backend/transcription_cache.py
+"""
+Content-addressed transcription cache.
+Key = sha256(audio bytes) + model size + language hint + decode options, so
+re-submitted recordings (Streamlit reruns, identical takes, pronunciation
+scoring of already recognized audio) skip Whisper entirely.
+Two tiers: an in-memory LRU and JSON files on disk, both size-bounded.
+With a shared STORE_URL a third tier between them (TTL-bounded) lets all
+API replicas reuse each other's transcriptions.
+"""
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+from .config import settings
+from .exceptions import StoreException
+from .logger import app_logger
+from .store import STORE, Store
+
+def audio_digest(audio_path: str) -> str:
+    h = hashlib.sha256()
+    with open(audio_path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+def bytes_digest(data: bytes) -> str:
+    """Digest of an upload held in memory; equal to audio_digest of the same file on disk."""
+    return hashlib.sha256(data).hexdigest()
+
+def array_digest(audio) -> str:
+    """Digest of already decoded samples (uploads decoded in memory never touch disk)."""
+    return hashlib.sha256(b"pcm:" + audio.astype("float32", copy=False).tobytes()).hexdigest()
+
+def make_key(digest: str, model_size: str, lang_hint: Optional[str], options: dict) -> str:
+    params = json.dumps({"model": model_size, "lang": lang_hint, **options}, sort_keys=True)
+    return hashlib.sha256(f"{digest}:{params}".encode()).hexdigest()
+
+class TranscriptionCache:
+    def __init__(self, directory: str, memory_entries: int, disk_max_bytes: int,
+                 store: Optional[Store] = None, store_ttl: float = 7 * 24 * 3600):
+        self.directory = Path(directory)
+        self.memory_entries = memory_entries
+        self.disk_max_bytes = disk_max_bytes
+        self.store = store
+        self.store_ttl = store_ttl
+        self._memory: "OrderedDict[str, dict]" = OrderedDict()
+        self._disk: Optional["OrderedDict[str, int]"] = None  # key -> size, least recently used first
+        self._disk_bytes = 0
+        self._lock = threading.Lock()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.store_hits = 0
+        self.misses = 0
+
+    def _path(self, key: str) -> Path:
+        return self.directory / key[:2] / f"{key}.json"
+
+    def _disk_index(self) -> "OrderedDict[str, int]":
+        # Caller holds the lock; one scan on first use, then maintained incrementally
+        if self._disk is None:
+            found = []
+            if self.directory.exists():
+                for p in self.directory.glob("*/*.json"):
+                    st = p.stat()
+                    found.append((st.st_mtime, p.stem, st.st_size))
+            self._disk = OrderedDict((key, size) for _, key, size in sorted(found))
+            self._disk_bytes = sum(self._disk.values())
+        return self._disk
+
+    def get(self, key: str) -> Optional[dict]:
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return dict(self._memory[key])
+            index = self._disk_index()
+            on_disk = key in index
+            if on_disk:
+                index.move_to_end(key)
+        if on_disk:
+            try:
+                result = json.loads(self._path(key).read_text(encoding="utf-8"))
+                with self._lock:
+                    self.disk_hits += 1
+                    self._remember(key, result)
+                return dict(result)
+            except (OSError, ValueError):
+                with self._lock:
+                    self._drop_disk(key)
+        result = self._store_get(key)
+        with self._lock:
+            if result is None:
+                self.misses += 1
+                return None
+            self.store_hits += 1
+            self._remember(key, result)
+        return dict(result)
+
+    def _store_get(self, key: str) -> Optional[dict]:
+        # Shared tier: another replica may already have transcribed this audio
+        if self.store is None:
+            return None
+        try:
+            raw = self.store.get(f"asr:{key}")
+            return json.loads(raw) if raw is not None else None
+        except (StoreException, ValueError) as e:
+            app_logger.error(f"Transcription cache store read failed: {e}")
+            return None
+
+    def put(self, key: str, result: dict) -> None:
+        data = json.dumps(result, ensure_ascii=False)
+        if self.store is not None:
+            try:
+                self.store.set(f"asr:{key}", data, ttl=self.store_ttl)
+            except StoreException as e:
+                app_logger.error(f"Transcription cache store write failed: {e}")
+        path = self._path(key)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+            tmp.write_text(data, encoding="utf-8")
+            os.replace(tmp, path)
+        except OSError as e:
+            app_logger.error(f"Transcription cache write failed: {e}")
+            path = None
+        with self._lock:
+            self._remember(key, result)
+            if path is not None:
+                index = self._disk_index()
+                self._drop_disk(key, unlink=False)
+                index[key] = len(data.encode("utf-8"))
+                self._disk_bytes += index[key]
+                while self._disk_bytes > self.disk_max_bytes and len(index) > 1:
+                    self._drop_disk(next(iter(index)))
+
+    def _remember(self, key: str, result: dict) -> None:
+        # Caller holds the lock
+        self._memory[key] = dict(result)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def _drop_disk(self, key: str, unlink: bool = True) -> None:
+        # Caller holds the lock
+        size = self._disk_index().pop(key, None)
+        if size is not None:
+            self._disk_bytes -= size
+        if unlink:
+            try:
+                self._path(key).unlink()
+            except OSError:
+                pass
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "memory_entries": len(self._memory),
+                "disk_entries": len(self._disk or {}),
+                "disk_bytes": self._disk_bytes,
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "store_hits": self.store_hits,
+                "misses": self.misses,
+            }
+
+TRANSCRIPTION_CACHE = TranscriptionCache(
+    settings.transcription_cache_dir,
+    memory_entries=settings.transcription_cache_memory_entries,
+    disk_max_bytes=settings.transcription_cache_disk_mb * 1024 * 1024,
+    store=STORE if STORE.shared else None,
+    store_ttl=settings.transcription_cache_ttl_seconds,
+)
@@ -0,0 +1,125 @@
+# src/backend/translation_backends.py
+"""
+Translation inference engines for the opus-mt models.
+- transformers: full-precision PyTorch MarianMT (always available)
+- ctranslate2: int8-quantized CTranslate2 model, converted once offline
+
+Convert models once with:
+    python -m src.backend.translation_backends convert --pairs en-de,de-en
+"""
+import os
+from pathlib import Path
+from typing import List, Optional
+from .config import settings
+from .logger import app_logger
+
+# ctranslate2 is optional (faster, smaller int8 models)
+try:
+    import ctranslate2
+    CT2_AVAILABLE = True
+except Exception:
+    CT2_AVAILABLE = False
+
+def converted_dir(model_name: str, quantization: str = "int8") -> Path:
+    return Path(settings.translation_model_dir) / f"{model_name.replace('/', '--')}-{quantization}"
+
+def _dir_size(path: Path) -> int:
+    return sum(f.stat().st_size for f in path.rglob("*") if f.is_file())
+
+class TransformersEngine:
+    name = "transformers"
+
+    def __init__(self, model_name: str):
+        from transformers import MarianMTModel, MarianTokenizer
+        self.model_name = model_name
+        self.tokenizer = MarianTokenizer.from_pretrained(model_name)
+        self.model = MarianMTModel.from_pretrained(model_name)
+        self.size_bytes = int(sum(p.numel() * p.element_size() for p in self.model.parameters()))
+
+    def translate_batch(self, texts: List[str], max_length: int = 512, num_beams: Optional[int] = None) -> List[str]:
+        batch = self.tokenizer(texts, return_tensors="pt", padding=True, truncation=True, max_length=max_length)
+        kwargs = {"max_length": max_length}
+        if num_beams:
+            kwargs["num_beams"] = num_beams
+        out = self.model.generate(**batch, **kwargs)
+        return self.tokenizer.batch_decode(out, skip_special_tokens=True)
+
+class CTranslate2Engine:
+    name = "ctranslate2"
+
+    def __init__(self, model_name: str, model_dir: Path):
+        from transformers import MarianTokenizer
+        self.model_name = model_name
+        self.tokenizer = MarianTokenizer.from_pretrained(model_name)
+        self.translator = ctranslate2.Translator(
+            str(model_dir),
+            device="cpu",
+            compute_type="int8",
+            intra_threads=settings.translation_cpu_threads,
+        )
+        self.size_bytes = _dir_size(model_dir)
+
+    def translate_batch(self, texts: List[str], max_length: int = 512, num_beams: Optional[int] = None) -> List[str]:
+        tokens = [self.tokenizer.convert_ids_to_tokens(self.tokenizer.encode(t)) for t in texts]
+        results = self.translator.translate_batch(
+            tokens,
+            beam_size=num_beams or 4,
+            max_decoding_length=max_length,
+        )
+        return [
+            self.tokenizer.decode(self.tokenizer.convert_tokens_to_ids(r.hypotheses[0]), skip_special_tokens=True)
+            for r in results
+        ]
+
+def load_engine(model_name: str, backend: Optional[str] = None):
+    """
+    Load the configured engine for a model.
+    "auto" uses CTranslate2 when it is installed and the model was converted,
+    and any CTranslate2 failure falls back to transformers.
+    """
+    backend = backend or settings.translation_backend
+    if backend in ("auto", "ctranslate2"):
+        model_dir = converted_dir(model_name)
+        if CT2_AVAILABLE and model_dir.exists():
+            try:
+                engine = CTranslate2Engine(model_name, model_dir)
+                app_logger.info(f"Using CTranslate2 int8 engine for {model_name}")
+                return engine
+            except Exception as e:
+                app_logger.error(f"CTranslate2 engine failed for {model_name}, falling back: {e}")
+        elif backend == "ctranslate2":
+            app_logger.warning(
+                f"CTranslate2 requested but {'model not converted' if CT2_AVAILABLE else 'ctranslate2 not installed'}"
+                f" for {model_name}; using transformers"
+            )
+    return TransformersEngine(model_name)
+
+def convert(model_name: str, quantization: str = "int8", force: bool = False) -> Path:
+    """One-time offline conversion of an opus-mt model to CTranslate2."""
+    if not CT2_AVAILABLE:
+        raise RuntimeError("ctranslate2 is not installed. pip install ctranslate2")
+    out_dir = converted_dir(model_name, quantization)
+    if out_dir.exists() and not force:
+        app_logger.info(f"Already converted: {out_dir}")
+        return out_dir
+    os.makedirs(out_dir.parent, exist_ok=True)
+    converter = ctranslate2.converters.TransformersConverter(model_name)
+    converter.convert(str(out_dir), quantization=quantization, force=True)
+    app_logger.info(f"Converted {model_name} -> {out_dir}")
+    return out_dir
+
+if __name__ == "__main__":
+    import argparse
+    from .translation_models import OPUS_MODELS
+
+    parser = argparse.ArgumentParser(description="Translation backend tools")
+    sub = parser.add_subparsers(dest="command", required=True)
+    conv = sub.add_parser("convert", help="Convert opus-mt models to int8 CTranslate2")
+    conv.add_argument("--pairs", default="en-de,de-en", help="Comma-separated pairs, or 'all'")
+    conv.add_argument("--quantization", default="int8")
+    conv.add_argument("--force", action="store_true")
+    args = parser.parse_args()
+
+    pairs = list(OPUS_MODELS) if args.pairs == "all" else [p.strip() for p in args.pairs.split(",")]
+    for pair in pairs:
+        print(convert(OPUS_MODELS[pair], args.quantization, args.force))
@@ -0,0 +1,160 @@
+# src/backend/translation_models.py
+"""
+Translation model manager.
+Resolves a language pair to a direct opus-mt model or a pivot route through
+English, and keeps loaded models in an LRU cache bounded by a memory budget.
+Concurrent requests for the same model share a single load.
+"""
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Callable, Dict, List, Optional, Any
+from .exceptions import TranslationException
+from .logger import app_logger
+
+PIVOT_LANG = "en"
+
+# Direct Helsinki-NLP opus-mt models we know to exist
+OPUS_MODELS: Dict[str, str] = {
+    "en-de": "Helsinki-NLP/opus-mt-en-de",
+    "de-en": "Helsinki-NLP/opus-mt-de-en",
+    "en-es": "Helsinki-NLP/opus-mt-en-es",
+    "es-en": "Helsinki-NLP/opus-mt-es-en",
+    "en-fr": "Helsinki-NLP/opus-mt-en-fr",
+    "fr-en": "Helsinki-NLP/opus-mt-fr-en",
+    "en-hi": "Helsinki-NLP/opus-mt-en-hi",
+    "hi-en": "Helsinki-NLP/opus-mt-hi-en",
+    "de-es": "Helsinki-NLP/opus-mt-de-es",
+    "es-de": "Helsinki-NLP/opus-mt-es-de",
+    "de-fr": "Helsinki-NLP/opus-mt-de-fr",
+    "fr-de": "Helsinki-NLP/opus-mt-fr-de",
+    "es-fr": "Helsinki-NLP/opus-mt-es-fr",
+    "fr-es": "Helsinki-NLP/opus-mt-fr-es",
+}
+
+# Used when a loaded entry does not expose its parameters (fp32 Marian ~300MB)
+DEFAULT_MODEL_BYTES = 300 * 1024 * 1024
+
+def resolve_route(src: str, tgt: str, models: Dict[str, str] = OPUS_MODELS) -> List[str]:
+    """
+    Return the list of pairs to run, e.g. ["es-de"] or ["hi-en", "en-de"].
+    """
+    if src == tgt:
+        return []
+    pair = f"{src}-{tgt}"
+    if pair in models:
+        return [pair]
+    first, second = f"{src}-{PIVOT_LANG}", f"{PIVOT_LANG}-{tgt}"
+    if first in models and second in models:
+        return [first, second]
+    raise TranslationException(f"Unsupported translation pair: {pair}")
+
+def estimate_bytes(entry: Any) -> int:
+    """Memory of a loaded engine, or of a (tokenizer, model) tuple."""
+    if hasattr(entry, "size_bytes"):
+        return int(entry.size_bytes)
+    model = entry[1] if isinstance(entry, tuple) and len(entry) > 1 else entry
+    try:
+        return int(sum(p.numel() * p.element_size() for p in model.parameters()))
+    except Exception:
+        return getattr(model, "size_bytes", DEFAULT_MODEL_BYTES)
+
+class TranslationModelManager:
+    """
+    LRU cache of translation models under a memory budget.
+
+    `loader(model_name)` does the actual loading and returns whatever the
+    caller wants cached (a translation engine, see translation_backends).
+    """
+
+    def __init__(self, loader: Callable[[str], Any], memory_budget_mb: int = 1024,
+                 models: Dict[str, str] = OPUS_MODELS,
+                 sizer: Callable[[Any], int] = estimate_bytes):
+        self._loader = loader
+        self._sizer = sizer
+        self.models = models
+        self.budget_bytes = int(memory_budget_mb * 1024 * 1024)
+        self._loaded: "OrderedDict[str, tuple]" = OrderedDict()  # pair -> (entry, size)
+        self._loading: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def route(self, src: str, tgt: str) -> List[str]:
+        return resolve_route(src, tgt, self.models)
+
+    def model_name(self, pair: str) -> str:
+        if pair not in self.models:
+            raise TranslationException(f"Unsupported translation pair: {pair}")
+        return self.models[pair]
+
+    def get(self, pair: str) -> Any:
+        """Return the loaded entry for a direct pair, loading it if needed."""
+        model_name = self.model_name(pair)
+        with self._lock:
+            if pair in self._loaded:
+                self._loaded.move_to_end(pair)
+                self.hits += 1
+                return self._loaded[pair][0]
+            future = self._loading.get(pair)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._loading[pair] = future
+                self.misses += 1
+
+        if not owner:
+            # Another caller is already loading this model; wait for it
+            return future.result()
+
+        try:
+            entry = self._loader(model_name)
+            size = self._sizer(entry)
+        except Exception as e:
+            with self._lock:
+                self._loading.pop(pair, None)
+            future.set_exception(e)
+            raise
+
+        with self._lock:
+            self._evict_for(size)
+            self._loaded[pair] = (entry, size)
+            self._loading.pop(pair, None)
+        future.set_result(entry)
+        app_logger.info(f"Loaded translation model: {model_name} ({size / 1e6:.0f}MB)")
+        return entry
+
+    def _evict_for(self, size: int) -> None:
+        # Caller holds the lock
+        used = sum(s for _, s in self._loaded.values())
+        while self._loaded and used + size > self.budget_bytes:
+            pair, (_, freed) = self._loaded.popitem(last=False)
+            used -= freed
+            self.evictions += 1
+            app_logger.info(f"Evicted translation model {pair} to stay under budget")
+        if size > self.budget_bytes:
+            app_logger.warning(f"Translation model larger than budget ({size} > {self.budget_bytes} bytes)")
+
+    def unload(self, pair: Optional[str] = None) -> None:
+        with self._lock:
+            if pair is None:
+                self._loaded.clear()
+            else:
+                self._loaded.pop(pair, None)
+
+    def loaded_pairs(self) -> List[str]:
+        with self._lock:
+            return list(self._loaded.keys())
+
+    def stats(self) -> dict:
+        with self._lock:
+            used = sum(s for _, s in self._loaded.values())
+            return {
+                "loaded": list(self._loaded.keys()),
+                "used_bytes": used,
+                "budget_bytes": self.budget_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
@@ -1,31 +1,28 @@
 # src/backend/translator.py
 """
-Simple EN<->DE translator using MarianMT from Hugging Face.
-For small/fast demos, this works offline.
+Translator using MarianMT (Helsinki-NLP opus-mt) from Hugging Face.
+Pairs without a direct model are pivoted through English; models are
+loaded on demand by a memory-bounded manager. Inference runs on the
+configured engine (int8 CTranslate2 or transformers, see
+translation_backends). Long inputs are split into sentences and
+translated in length-sorted batches. Works offline once cached.
 """
-from transformers import MarianMTModel, MarianTokenizer
+import re
+from typing import Iterator, List, Optional, Tuple
 from langdetect import detect
 from .exceptions import TranslationException
 from .logger import app_logger
+from .config import settings
+from .translation_models import TranslationModelManager
+from .translation_backends import load_engine
 
-MODEL_CACHE = {}
+MODEL_MANAGER = TranslationModelManager(load_engine, memory_budget_mb=settings.translation_memory_budget_mb)
 
 def load_model_pair(src_tgt="en-de"):
     try:
-        if src_tgt in MODEL_CACHE:
-            return MODEL_CACHE[src_tgt]
-        if src_tgt == "en-de":
-            model_name = "Helsinki-NLP/opus-mt-en-de"
-        elif src_tgt == "de-en":
-            model_name = "Helsinki-NLP/opus-mt-de-en"
-        else:
-            raise TranslationException(f"Unsupported translation pair: {src_tgt}")
-        
-        tok = MarianTokenizer.from_pretrained(model_name)
-        model = MarianMTModel.from_pretrained(model_name)
-        MODEL_CACHE[src_tgt] = (tok, model)
-        app_logger.info(f"Loaded translation model: {model_name}")
-        return tok, model
+        return MODEL_MANAGER.get(src_tgt)
+    except TranslationException:
+        raise
     except Exception as e:
         app_logger.error(f"Failed to load translation model: {e}")
         raise TranslationException(f"Model loading failed: {e}")
@@ -38,20 +35,105 @@ def detect_language(text: str) -> dict:
         app_logger.error(f"Language detection failed: {e}")
         return {"language": "unknown", "confidence": 0.0}
 
-def translate(text: str, src="en", tgt="de") -> dict:
+
+# Sentence end followed by whitespace; the whitespace is kept so output keeps the layout
+_SENTENCE_SPLIT = re.compile(r"(?<=[.!?;\u2026\u0964\u3002])(\s+)|(\n+)")
+
+def split_sentences(text: str, max_chars: int = 400) -> List[Tuple[str, str]]:
+    """
+    Split text into (sentence, trailing_separator) pairs.
+    Sentences longer than max_chars are cut at word boundaries (or anywhere,
+    when there is no space) so no single sequence hits the model's
+    max_length. Joining every sentence + separator reproduces `text`.
+    """
+    parts = _SENTENCE_SPLIT.split(text)
+    pieces = []
+    # re.split with two groups yields: text, sep1, sep2, text, ...
+    for i in range(0, len(parts), 3):
+        sentence = parts[i] or ""
+        sep = (parts[i + 1] or "") + (parts[i + 2] or "") if i + 1 < len(parts) else ""
+        if not sentence.strip():
+            if pieces:
+                pieces[-1] = (pieces[-1][0], pieces[-1][1] + sentence + sep)
+            continue
+        while len(sentence) > max_chars:
+            cut = sentence.rfind(" ", 0, max_chars)
+            if cut > 0:
+                rest = sentence[cut:].lstrip()
+                pieces.append((sentence[:cut], sentence[cut:len(sentence) - len(rest)]))
+            else:
+                # No space to cut at (a URL, CJK text): nothing goes between the halves
+                rest = sentence[max_chars:]
+                pieces.append((sentence[:max_chars], ""))
+            sentence = rest
+        pieces.append((sentence, sep))
+    return pieces
+
+def _translate_sentences(sentences: List[str], route: List[str], batch_size: int,
+                         num_beams: Optional[int] = None) -> Tuple[List[str], List[str]]:
+    """
+    Translate sentences hop by hop. Batches are built from length-sorted
+    sentences to minimize padding; results come back in input order.
+    """
+    backends = []
+    current = list(sentences)
+    for pair in route:
+        engine = load_model_pair(pair)
+        order = sorted(range(len(current)), key=lambda i: len(current[i]))
+        out = [""] * len(current)
+        for start in range(0, len(order), batch_size):
+            idx = order[start:start + batch_size]
+            results = engine.translate_batch([current[i] for i in idx], max_length=512, num_beams=num_beams)
+            for i, r in zip(idx, results):
+                out[i] = r
+        current = out
+        backends.append(engine.name)
+    return current, backends
+
+def translate_stream(text: str, src="en", tgt="de", batch_size: int = None, num_beams: int = None) -> Iterator[str]:
+    """
+    Translate text window by window and yield each translated sentence
+    (with its original trailing whitespace) as soon as its window finishes.
+    "".join(translate_stream(...)) equals translate(...)["translated_text"].
+    """
+    batch_size = batch_size or settings.translation_batch_size
+    try:
+        route = MODEL_MANAGER.route(src, tgt)
+        pieces = split_sentences(text)
+        for start in range(0, len(pieces), batch_size):
+            window = pieces[start:start + batch_size]
+            translated, _ = _translate_sentences([s for s, _ in window], route, batch_size, num_beams)
+            for t, (_, sep) in zip(translated, window):
+                yield t + sep
+    except TranslationException:
+        raise
+    except Exception as e:
+        app_logger.error(f"Streaming translation failed: {e}")
+        raise TranslationException(f"Translation failed: {e}")
+
+def translate(text: str, src="en", tgt="de", batch_size: int = None, num_beams: int = None) -> dict:
+    """
+    Translate text, directly or via the English pivot.
+    The result reports the route taken and the models that served it.
+    num_beams overrides the model's default beam width (quality profiles).
+    """
+    batch_size = batch_size or settings.translation_batch_size
     try:
-        pair = f"{src}-{tgt}"
-        tok, model = load_model_pair(pair)
-        batch = tok([text], return_tensors="pt", padding=True)
-        out = model.generate(**batch, max_length=512)
-        translated = tok.batch_decode(out, skip_special_tokens=True)[0]
+        route = MODEL_MANAGER.route(src, tgt)
+        pieces = split_sentences(text)
+        translated_sentences, backends = _translate_sentences([s for s, _ in pieces], route, batch_size, num_beams)
+        translated = "".join(t + sep for t, (_, sep) in zip(translated_sentences, pieces))
         
-        app_logger.info(f"Translation completed: {src} -> {tgt}")
+        app_logger.info(f"Translation completed: {src} -> {tgt} via {route} ({len(pieces)} sentences)")
         return {
             "translated_text": translated,
             "source_language": src,
             "target_language": tgt,
-            "confidence": 0.9
+            "confidence": 0.9 if len(route) <= 1 else 0.8,
+            "route": route,
+            "pivot": "en" if len(route) > 1 else None,
+            "models": [MODEL_MANAGER.model_name(p) for p in route],
+            "backends": backends
         }
     except Exception as e:
         app_logger.error(f"Translation failed: {e}")
@@ -1,8 +1,19 @@
-import edge_tts
 import asyncio
+import os
+import time
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
 from .logger import app_logger
 from .exceptions import TTSException
-from typing import Optional
+from .config import settings
+
+# edge-tts (online neural voices)
+try:
+    import edge_tts
+    EDGE_AVAILABLE = True
+except Exception:
+    EDGE_AVAILABLE = False
 
 # Voice mapping
 VOICES = {
@@ -13,26 +24,155 @@ VOICES = {
     "hi": "hi-IN-SwaraNeural"
 }
 
-async def synthesize(text: str, lang: str = "en", output_file: Optional[str] = None) -> str:
+class TTSEngine:
+    """Base class: synthesize text into a file and return the written path."""
+    name = "base"
+
+    def available(self) -> bool:
+        return True
+
+    def output_path(self, out_path: str) -> str:
+        """The file synthesize() writes for `out_path` (engines may change the extension)."""
+        return out_path
+
+    async def synthesize(self, text: str, lang: str, out_path: str, voice: Optional[str] = None) -> str:
+        """`voice` overrides the engine's default voice for `lang` (e.g. from a quality profile)."""
+        raise NotImplementedError
+
+class EdgeTTSEngine(TTSEngine):
+    name = "edge"
+
+    def available(self) -> bool:
+        return EDGE_AVAILABLE
+
+    async def synthesize(self, text: str, lang: str, out_path: str, voice: Optional[str] = None) -> str:
+        voice = voice or VOICES.get(lang, "en-US-AriaNeural")
+        communicate = edge_tts.Communicate(text, voice)
+        await communicate.save(out_path)
+        return out_path
+
+def _pyttsx3_synthesize(text: str, lang: str, out_path: str, voice_name: Optional[str] = None) -> str:
+    # Runs inside a worker process: pyttsx3 drivers are blocking and not thread-safe
+    import pyttsx3
+    engine = pyttsx3.init()
+    voices = engine.getProperty("voices")
+    # An installed voice named by the profile wins; other names (e.g. edge voices) are ignored
+    named = [v for v in voices if voice_name and voice_name in (v.id, v.name)]
+    if named:
+        engine.setProperty("voice", named[0].id)
+    else:
+        for voice in voices:
+            langs = [l.decode(errors="ignore") if isinstance(l, bytes) else str(l) for l in (voice.languages or [])]
+            if any(lang in l for l in langs) or f"/{lang}" in voice.id or voice.id.startswith(lang):
+                engine.setProperty("voice", voice.id)
+                break
+    engine.save_to_file(text, out_path)
+    engine.runAndWait()
+    engine.stop()
+    return out_path
+
+_PROCESS_POOL: Optional[ProcessPoolExecutor] = None
+
+def _get_process_pool() -> ProcessPoolExecutor:
+    global _PROCESS_POOL
+    if _PROCESS_POOL is None:
+        workers = settings.tts_process_workers or os.cpu_count() or 1
+        _PROCESS_POOL = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+    return _PROCESS_POOL
+
+class Pyttsx3Engine(TTSEngine):
+    """Offline engine (espeak/SAPI/NSSpeech) run in a process pool; writes WAV."""
+    name = "pyttsx3"
+
+    def available(self) -> bool:
+        try:
+            import importlib.util
+            return importlib.util.find_spec("pyttsx3") is not None
+        except Exception:
+            return False
+
+    def output_path(self, out_path: str) -> str:
+        return os.path.splitext(out_path)[0] + ".wav"
+
+    async def synthesize(self, text: str, lang: str, out_path: str, voice: Optional[str] = None) -> str:
+        # A timeout or cancellation only abandons the future: the pool worker still finishes the file
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_get_process_pool(), _pyttsx3_synthesize, text, lang,
+                                          self.output_path(out_path), voice)
+
+ENGINES: Dict[str, TTSEngine] = {
+    "edge": EdgeTTSEngine(),
+    "pyttsx3": Pyttsx3Engine(),
+}
+
+# engine name -> time until which it is skipped after a failure
+_COOLDOWN: Dict[str, float] = {}
+
+def _discard(engine: TTSEngine, out_path: str) -> None:
+    """Remove what a failed engine left behind, and let the janitor sweep a file still being written."""
+    from .janitor import JANITOR
+    path = engine.output_path(out_path)
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+    if isinstance(engine, Pyttsx3Engine):
+        JANITOR.register(path)  # the process pool cannot be cancelled and may write it later
+
+def engines_for(lang: str) -> List[str]:
     """
-    Synthesize text to speech using edge-tts (async).
+    Engine chain for a language: per-language override from
+    TTS_LANGUAGE_ENGINES ("hi:edge;de:pyttsx3,edge"), else TTS_ENGINES.
     """
-    try:
-        voice = VOICES.get(lang, "en-US-AriaNeural")
-        communicate = edge_tts.Communicate(text, voice)
-        
-        if output_file:
-            await communicate.save(output_file)
-            app_logger.info(f"TTS synthesis completed: {output_file}")
-            return output_file
-        else:
-            # If no file path provided, we can't easily return audio bytes without a temp file in this lib
-            # But for our use case we always provide a path.
-            raise TTSException("Output file path is required for edge-tts")
-            
-    except Exception as e:
-        app_logger.error(f"TTS failed: {e}")
-        raise TTSException(f"TTS failed: {e}")
-
-async def synthesize_to_file(text: str, out_path: str, lang: str = "en") -> str:
-    return await synthesize(text, lang, out_path)
+    for entry in settings.tts_language_engines.split(";"):
+        if ":" in entry:
+            code, names = entry.split(":", 1)
+            if code.strip() == lang:
+                return [n.strip() for n in names.split(",") if n.strip()]
+    return [n.strip() for n in settings.tts_engines.split(",") if n.strip()]
+
+async def synthesize(text: str, lang: str = "en", output_file: Optional[str] = None,
+                     engines: Optional[List[str]] = None, voice: Optional[str] = None) -> str:
+    """
+    Synthesize text to speech, trying the language's engines (or `engines`,
+    e.g. from a quality profile) in order, optionally with a specific voice.
+    An engine that errors or exceeds TTS_TIMEOUT_SECONDS is tried last for
+    TTS_FAILURE_COOLDOWN_SECONDS, so a reply never fails only because every
+    engine had a recent error. A failed engine's partial output is deleted
+    before the next one runs; pyttsx3 work already in its process pool is
+    not cancelled, so a late file from it is left to the janitor. Returns the
+    path actually written, whose extension depends on the engine (.mp3 for
+    edge, .wav for pyttsx3).
+    """
+    if not output_file:
+        raise TTSException("Output file path is required")
+
+    candidates = [n for n in engines or engines_for(lang) if n in ENGINES and ENGINES[n].available()]
+    now = time.monotonic()
+    ready = [n for n in candidates if _COOLDOWN.get(n, 0) <= now]
+    # Engines cooling down are a last resort, the one that failed longest ago first
+    cooling = sorted((n for n in candidates if n not in ready), key=lambda n: _COOLDOWN[n])
+
+    errors = []
+    for name in ready + cooling:
+        engine = ENGINES[name]
+        try:
+            path = await asyncio.wait_for(engine.synthesize(text, lang, output_file, voice=voice),
+                                          timeout=settings.tts_timeout_seconds)
+            app_logger.info(f"TTS synthesis completed ({name}): {path}")
+            return path
+        except asyncio.CancelledError:
+            _discard(engine, output_file)  # e.g. the request deadline ran out mid-synthesis
+            raise
+        except Exception as e:
+            _discard(engine, output_file)
+            reason = "timed out" if isinstance(e, asyncio.TimeoutError) else str(e)
+            app_logger.error(f"TTS engine '{name}' failed: {reason}")
+            _COOLDOWN[name] = time.monotonic() + settings.tts_failure_cooldown_seconds
+            errors.append(f"{name}: {reason}")
+
+    raise TTSException(f"TTS failed: {'; '.join(errors) or 'no engine available'}")
+
+async def synthesize_to_file(text: str, out_path: str, lang: str = "en", engines: Optional[List[str]] = None,
+                             voice: Optional[str] = None) -> str:
+    return await synthesize(text, lang, out_path, engines, voice)
@@ -0,0 +1,153 @@
+# src/backend/warmup.py
+"""
+Startup warmup: import the pipeline, load the models and run one dummy
+inference per stage so the first real request does not pay for it.
+Readiness (/ready) is derived from WARMUP_STATE: ready once done, unless a
+required stage (WARMUP_REQUIRED_STAGES) failed, which leaves it degraded.
+"""
+import os
+import time
+import wave
+from typing import Callable, Dict, List, Optional
+from .config import settings
+from .logger import app_logger
+
+WARMUP_STATE = {
+    "status": "pending",   # pending -> running -> done | degraded
+    "started_at": None,
+    "finished_at": None,
+    "stages": {},
+}
+
+def _silence_wav(path: str, seconds: float = 1.0, rate: int = 16000) -> str:
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with wave.open(path, "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(rate)
+        w.writeframes(b"\x00\x00" * int(seconds * rate))
+    return path
+
+def _warm_imports():
+    from ..agents import orchestrator  # noqa: F401  (pulls torch/transformers/whisper)
+
+def _warm_asr():
+    from . import asr
+    from .config import settings
+    from .quality import PROFILES
+    path = _silence_wav(os.path.join("temp", "warmup_silence.wav"))
+    # The default model, plus the fast one when load may step down to it
+    sizes = [settings.whisper_model]
+    if settings.quality_adaptive and PROFILES["fast"].whisper_model not in sizes:
+        sizes.append(PROFILES["fast"].whisper_model)
+    try:
+        for size in sizes:
+            # Bypass the transcription cache: it survives restarts, and a hit would skip loading the model
+            asr.transcribe(path, lang_hint="en", model_size=size, use_cache=False)
+    finally:
+        if os.path.exists(path):
+            os.remove(path)
+
+def _warm_translation():
+    from . import translator
+    translator.translate("Hello, how are you?", "en", "de")
+
+def _warm_grammar():
+    from . import feedback
+    feedback.grammar_correct("Ich gehe in die Schule.", lang="de")
+
+def _warm_phrasebook():
+    from .phrasebook import PHRASEBOOK
+    PHRASEBOOK.load()
+
+def _warm_tts():
+    import asyncio
+    from . import tts
+    path = os.path.join("temp", "warmup_tts.mp3")
+    os.makedirs("temp", exist_ok=True)
+    try:
+        asyncio.run(tts.synthesize_to_file("Hello", path, lang="en"))
+    finally:
+        if os.path.exists(path):
+            os.remove(path)
+
+WORKER_POLL_SECONDS = 5.0
+
+def _warm_worker():
+    # Slim mode: the models live in the model worker; wait until it is up and warmed (it may start later)
+    from . import remote
+    give_up = time.monotonic() + settings.model_worker_ready_timeout_seconds
+    while True:
+        try:
+            remote.ready()
+            return
+        except Exception:
+            if time.monotonic() >= give_up:
+                raise
+            time.sleep(WORKER_POLL_SECONDS)
+
+STAGES: Dict[str, Callable[[], None]] = {
+    "imports": _warm_imports,
+    "asr": _warm_asr,
+    "translation": _warm_translation,
+    "grammar": _warm_grammar,
+    "phrasebook": _warm_phrasebook,
+    "tts": _warm_tts,
+    "worker": _warm_worker,
+}
+
+# Stages served by the model worker when MODEL_WORKER_URL is set
+WORKER_STAGES = ("asr", "translation", "grammar")
+
+def slim_stages(stages: List[str]) -> List[str]:
+    """API-side stages in slim mode: model stages become one model-worker check."""
+    local = [s for s in stages if s not in WORKER_STAGES]
+    return local + ["worker"] if len(local) < len(stages) else local
+
+def parse_stages(spec: str) -> List[str]:
+    names = [s.strip() for s in (spec or "").split(",") if s.strip()]
+    unknown = [n for n in names if n not in STAGES]
+    if unknown:
+        app_logger.warning(f"Ignoring unknown warmup stages: {unknown}")
+    return [n for n in names if n in STAGES]
+
+def run_warmup(stages: Optional[List[str]] = None, required: Optional[List[str]] = None) -> dict:
+    """
+    Run the given warmup stages in order (blocking). The import stage always
+    runs first. Each stage is timed; a failing stage is recorded and does not
+    stop the others, but if it is one of `required` (default
+    WARMUP_REQUIRED_STAGES) the warmup ends degraded instead of done.
+    """
+    if required is None:
+        required = [s.strip() for s in settings.warmup_required_stages.split(",") if s.strip()]
+    stages = ["imports"] + [s for s in (stages or []) if s != "imports"]
+    WARMUP_STATE["status"] = "running"
+    WARMUP_STATE["started_at"] = time.time()
+    WARMUP_STATE["stages"] = {name: {"status": "pending"} for name in stages}
+
+    for name in stages:
+        start = time.perf_counter()
+        try:
+            STAGES[name]()
+            WARMUP_STATE["stages"][name] = {"status": "ok"}
+        except Exception as e:
+            app_logger.error(f"Warmup stage '{name}' failed: {e}")
+            WARMUP_STATE["stages"][name] = {"status": "failed", "error": str(e)}
+        elapsed = time.perf_counter() - start
+        WARMUP_STATE["stages"][name]["seconds"] = round(elapsed, 3)
+        app_logger.info(f"Warmup stage '{name}' finished in {elapsed:.2f}s")
+
+    failed = [n for n in stages if n in required and WARMUP_STATE["stages"][n]["status"] == "failed"]
+    if failed:
+        app_logger.error(f"Warmup degraded: required stages failed: {failed}")
+    WARMUP_STATE["status"] = "degraded" if failed else "done"
+    WARMUP_STATE["finished_at"] = time.time()
+    return WARMUP_STATE
+
+def mark_skipped() -> None:
+    """Used when warmup is disabled: report ready immediately."""
+    WARMUP_STATE["status"] = "done"
+    WARMUP_STATE["finished_at"] = time.time()
+
+def is_ready() -> bool:
+    return WARMUP_STATE["status"] == "done"
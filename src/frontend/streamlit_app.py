@@ -7,14 +7,71 @@ project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..
 if project_root not in sys.path:
     sys.path.append(project_root)
 
-import asyncio
 from pathlib import Path
 import uuid
 import time
 import base64
+import httpx
 
-# Import backend modules directly
-from src.agents.orchestrator import handle_audio_interaction, handle_text_interaction
+# The UI talks to the backend job API; models live in the API process only
+API_BASE = os.environ.get("API_BASE", "http://localhost:8000").rstrip("/")
+STAGE_LABELS = {
+    "queued": "⏳ Queued...",
+    "started": "🚦 Starting...",
+    "asr": "🎧 Transcribing...",
+    "grammar": "📝 Checking grammar...",
+    "phrasebook": "📖 Looking it up...",
+    "llm": "🧠 Thinking...",
+    "tts": "🔊 Synthesizing voice...",
+}
+
+@st.cache_resource
+def get_api_client() -> httpx.Client:
+    # One pooled keep-alive client shared across reruns and sessions
+    return httpx.Client(
+        base_url=API_BASE,
+        timeout=httpx.Timeout(30.0, connect=5.0),
+        limits=httpx.Limits(max_connections=20, max_keepalive_connections=10),
+    )
+
+def run_job(data: dict, files: dict = None, poll_interval: float = 0.5, timeout: float = 300.0) -> dict:
+    """Submit a job, show its stage while polling, and return the finished result."""
+    client = get_api_client()
+    response = client.post("/jobs", data=data, files=files)
+    response.raise_for_status()
+    job_id = response.json()["data"]["job_id"]
+
+    status_box = st.empty()
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = client.get(f"/jobs/{job_id}").json()["data"]
+        status_box.caption(STAGE_LABELS.get(job["stage"], job["stage"] or ""))
+        if job["status"] == "done":
+            status_box.empty()
+            return job["result"]
+        if job["status"] == "failed":
+            status_box.empty()
+            raise RuntimeError(job["error"])
+        time.sleep(poll_interval)
+    raise TimeoutError("The backend did not finish in time")
+
+def fetch_audio(result: dict):
+    """Download reply audio bytes from /audio/{id} (None if there is no audio)."""
+    url = result.get("reply_audio_url")
+    if not url:
+        return None
+    try:
+        response = get_api_client().get(url)
+        response.raise_for_status()
+        return response.content
+    except httpx.HTTPError:
+        return None
+
+def api_online() -> bool:
+    try:
+        return get_api_client().get("/health", timeout=2.0).status_code == 200
+    except httpx.HTTPError:
+        return False
 
 # Page Config
 st.set_page_config(
@@ -157,13 +214,18 @@ if "messages" not in st.session_state:
     st.session_state.messages = []
 if "processing" not in st.session_state:
     st.session_state.processing = False
+if "session_id" not in st.session_state:
+    st.session_state.session_id = uuid.uuid4().hex
 
 # Sidebar
 with st.sidebar:
     st.title("⚙️ Control Panel")
     
-    # System Status (Internal)
-    st.markdown('<div><span class="status-dot status-online"></span>System Ready</div>', unsafe_allow_html=True)
+    # System Status (Backend API)
+    if api_online():
+        st.markdown('<div><span class="status-dot status-online"></span>System Ready</div>', unsafe_allow_html=True)
+    else:
+        st.markdown(f'<div><span class="status-dot status-offline"></span>Backend offline ({API_BASE})</div>', unsafe_allow_html=True)
         
     st.markdown("---")
     st.markdown("### 🌐 Settings")
@@ -244,20 +306,13 @@ with col1:
             if st.button("🚀 Process Audio", type="primary"):
                 with st.spinner("🔄 Transcribing & Translating..."):
                     try:
-                        # Save temp file
-                        temp_dir = Path("temp")
-                        temp_dir.mkdir(exist_ok=True)
-                        temp_path = temp_dir / f"{uuid.uuid4().hex}.wav"
-                        
-                        with open(temp_path, "wb") as f:
-                            f.write(input_audio.getbuffer())
-                        
-                        # Process directly using orchestrator
-                        result = asyncio.run(handle_audio_interaction(str(temp_path), target_lang=target_lang))
-                        
-                        # Cleanup
-                        if temp_path.exists():
-                            temp_path.unlink()
+                        # Submit to the backend job API
+                        suffix = Path(input_audio.name or "audio.wav").suffix or ".wav"
+                        files = {"file": (f"{uuid.uuid4().hex}{suffix}", input_audio.getvalue(), input_audio.type or "audio/wav")}
+                        result = run_job(
+                            {"target_lang": target_lang, "session_id": st.session_state.session_id},
+                            files=files,
+                        )
 
                         # Add User Message
                         st.session_state.messages.append({
@@ -271,7 +326,7 @@ with col1:
                             "role": "assistant",
                             "content": result["reply_text"],
                             "lang": target_lang,
-                            "audio": result["reply_audio_path"],
+                            "audio": fetch_audio(result),
                             "grammar": result["grammar_matches"]
                         })
                         
@@ -308,15 +363,15 @@ if prompt := st.chat_input("Type a message..."):
     
     with st.spinner("Thinking..."):
         try:
-            # Process directly using orchestrator
-            result = asyncio.run(handle_text_interaction(prompt, target_lang=target_lang))
+            # Submit to the backend job API
+            result = run_job({"text": prompt, "target_lang": target_lang, "session_id": st.session_state.session_id})
             
             # Add Bot Message
             st.session_state.messages.append({
                 "role": "assistant",
                 "content": result["reply_text"],
                 "lang": target_lang,
-                "audio": result["reply_audio_path"],
+                "audio": fetch_audio(result),
                 "grammar": result["grammar_matches"]
             })
         except Exception as e:
@@ -0,0 +1,309 @@
+# src/tools/batch.py
+"""
+Batch grading of recordings: transcription, grammar feedback and (when a
+reference text is given) pronunciation scoring, across a process pool whose
+workers load the models once.
+
+Inputs are a directory (searched recursively for audio; a `<name>.txt` next
+to a recording is its reference text) or a manifest (.csv or .jsonl with a
+`path` column and optional `id`, `reference`, `lang`):
+    python -m src.tools.batch recordings/ --out results.jsonl --workers 4
+    python -m src.tools.batch class.csv --out results/ --format parquet --lang de
+
+Results are written as they finish: one JSONL line per recording (flushed
+immediately) or Parquet part files renamed into place once complete (every
+--part-size records or --flush-seconds, whichever comes first; that is all
+an interrupted Parquet run can lose). The output is the checkpoint: re-running the same command skips recordings that
+already have a result, so an interrupted run resumes where it stopped
+(--retry-failed also re-runs the ones that errored).
+"""
+import argparse
+import csv
+import json
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional
+
+AUDIO_EXTENSIONS = {".wav", ".mp3", ".m4a", ".ogg", ".oga", ".opus", ".flac", ".webm", ".aac"}
+
+# --- inputs ---
+
+def scan_directory(root: str) -> List[dict]:
+    root_path = Path(root)
+    items = []
+    for path in sorted(p for p in root_path.rglob("*") if p.suffix.lower() in AUDIO_EXTENSIONS):
+        sidecar = path.with_suffix(".txt")
+        reference = sidecar.read_text(encoding="utf-8").strip() if sidecar.exists() else None
+        items.append({"id": path.relative_to(root_path).as_posix(), "path": str(path), "reference": reference})
+    return items
+
+def read_manifest(manifest: str) -> List[dict]:
+    """Rows of a .csv or .jsonl manifest; relative paths are resolved against its directory."""
+    base = Path(manifest).parent
+    with open(manifest, encoding="utf-8", newline="") as f:
+        if manifest.endswith(".csv"):
+            rows = list(csv.DictReader(f))
+        else:
+            rows = [json.loads(line) for line in f if line.strip()]
+    items = []
+    for n, row in enumerate(rows, 1):
+        path = row.get("path") or row.get("file") or row.get("audio")
+        if not path:
+            raise ValueError(f"{manifest}: row {n} has no path")
+        path = Path(path) if Path(path).is_absolute() else base / path
+        items.append({"id": str(row.get("id") or row.get("path") or path), "path": str(path),
+                      "reference": row.get("reference") or row.get("reference_text") or None,
+                      "lang": row.get("lang") or None})
+    return items
+
+def load_items(source: str) -> List[dict]:
+    items = scan_directory(source) if os.path.isdir(source) else read_manifest(source)
+    seen = set()
+    for item in items:
+        if item["id"] in seen:
+            raise ValueError(f"Duplicate id in input: {item['id']}")
+        seen.add(item["id"])
+    return items
+
+# --- outputs (also the checkpoint) ---
+
+class JsonlWriter:
+    """Appends one line per result; the last line of a crashed run may be cut off and is dropped."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = None
+
+    def done(self) -> Dict[str, bool]:
+        """id -> succeeded, from earlier runs (the latest record per id wins)."""
+        if not os.path.exists(self.path):
+            return {}
+        done, valid_bytes = {}, 0
+        with open(self.path, "rb") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    break
+                if not line.endswith(b"\n"):
+                    break
+                valid_bytes += len(line)
+                done[record["id"]] = record.get("error") is None
+        if valid_bytes < os.path.getsize(self.path):
+            with open(self.path, "r+b") as f:
+                f.truncate(valid_bytes)
+        return done
+
+    def write(self, record: dict) -> None:
+        if self._file is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._file = open(self.path, "a", encoding="utf-8")
+        self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._file.flush()
+
+    def close(self) -> None:
+        if self._file is not None:
+            os.fsync(self._file.fileno())
+            self._file.close()
+            self._file = None
+
+# One fixed schema for every part, whatever the values in it (a part of failures is all nulls).
+# List-valued fields are stored as JSON strings so the schema stays flat.
+RESULT_COLUMNS = (("id", "string"), ("path", "string"), ("reference", "string"), ("lang", "string"),
+                  ("text", "string"), ("segments", "string"), ("corrected", "string"),
+                  ("grammar_matches", "string"), ("pronunciation_score", "int64"),
+                  ("pronunciation_ratio", "float64"), ("error", "string"), ("seconds", "float64"))
+_JSON_COLUMNS = ("segments", "grammar_matches")
+
+class ParquetWriter:
+    """
+    Buffers results and writes them as part-NNNNN.parquet files (tmp file,
+    then rename) every `part_size` results or `flush_seconds`, whichever
+    comes first, so a crash loses at most that much work.
+    """
+
+    def __init__(self, directory: str, part_size: int = 100, flush_seconds: float = 60.0):
+        try:
+            import pyarrow as pa
+        except ImportError:
+            raise SystemExit("Parquet output needs pyarrow (pip install pyarrow); or use a .jsonl output")
+        self.directory = Path(directory)
+        self.part_size = part_size
+        self.flush_seconds = flush_seconds
+        self.schema = pa.schema([(name, pa.type_for_alias(type_)) for name, type_ in RESULT_COLUMNS])
+        self._rows: List[dict] = []
+        self._last_flush = time.monotonic()
+
+    def _parts(self) -> List[Path]:
+        return sorted(self.directory.glob("part-*.parquet")) if self.directory.exists() else []
+
+    def done(self) -> Dict[str, bool]:
+        import pyarrow.parquet as pq
+        done = {}
+        for part in self._parts():
+            table = pq.read_table(part, columns=["id", "error"]).to_pydict()
+            for id_, error in zip(table["id"], table["error"]):
+                done[id_] = error is None
+        return done
+
+    def write(self, record: dict) -> None:
+        row = dict(record)
+        for column in _JSON_COLUMNS:
+            row[column] = json.dumps(row.get(column), ensure_ascii=False)
+        self._rows.append(row)
+        if len(self._rows) >= self.part_size or time.monotonic() - self._last_flush >= self.flush_seconds:
+            self.flush()
+
+    def flush(self) -> None:
+        self._last_flush = time.monotonic()
+        if not self._rows:
+            return
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        self.directory.mkdir(parents=True, exist_ok=True)
+        parts = self._parts()
+        index = int(parts[-1].stem.split("-")[1]) + 1 if parts else 0
+        final = self.directory / f"part-{index:05d}.parquet"
+        tmp = final.with_suffix(".parquet.tmp")
+        # Keys outside the schema (e.g. debugging extras) are dropped, missing ones are null
+        pq.write_table(pa.Table.from_pylist(self._rows, schema=self.schema), tmp)
+        os.replace(tmp, final)
+        self._rows = []
+
+    def close(self) -> None:
+        self.flush()
+
+# --- worker side ---
+_WORKER: Dict = {}
+
+def init_worker(options: dict) -> None:
+    """Load the models once per worker process."""
+    from src.backend.config import settings
+    settings.asr_replicas = 1
+    settings.asr_cpu_threads = options.get("cpu_threads", 0)
+    from src.backend import asr
+    asr.get_pool(options.get("model"))
+    if options.get("grammar"):
+        from src.backend import feedback
+        feedback._get_tool(options.get("lang") or "de")  # starts LanguageTool
+    _WORKER.update(options)
+
+def process_item(item: dict) -> dict:
+    """One recording -> one result record; failures are recorded, never raised."""
+    t0 = time.monotonic()
+    record = {"id": item["id"], "path": item["path"], "reference": item.get("reference"), "lang": None,
+              "text": None, "segments": None, "corrected": None, "grammar_matches": None,
+              "pronunciation_score": None, "pronunciation_ratio": None, "error": None}
+    try:
+        from src.backend import asr, feedback
+        lang = item.get("lang") or _WORKER.get("lang")
+        tr = asr.transcribe(item["path"], lang_hint=lang, model_size=_WORKER.get("model"))
+        record.update(text=tr["text"], lang=tr.get("lang"), segments=tr.get("segments", []))
+        if _WORKER.get("grammar") and tr["text"]:
+            grammar = feedback.grammar_correct(tr["text"], lang=lang or tr.get("lang") or "de")
+            record.update(corrected=grammar["corrected"], grammar_matches=grammar["matches"])
+        if item.get("reference"):
+            score = feedback.pronunciation_score(item["path"], item["reference"], asr_text=tr["text"])
+            record.update(pronunciation_score=score["score"], pronunciation_ratio=round(score["ratio"], 4))
+    except Exception as e:
+        record["error"] = f"{type(e).__name__}: {e}"
+    record["seconds"] = round(time.monotonic() - t0, 3)
+    return record
+
+# --- driver ---
+
+def pending_items(items: List[dict], done: Dict[str, bool], retry_failed: bool = False) -> List[dict]:
+    return [i for i in items if i["id"] not in done or (retry_failed and not done[i["id"]])]
+
+def _report(n: int, total: int, record: dict) -> None:
+    status = f"FAILED {record['error']}" if record["error"] else f"ok ({record['seconds']:.1f}s)"
+    print(f"[{n}/{total}] {record['id']} {status}", file=sys.stderr, flush=True)
+
+def run_batch(items: List[dict], writer, workers: int = 0, options: Optional[dict] = None,
+              process: Callable[[dict], dict] = process_item, initializer: Callable[[dict], None] = init_worker,
+              retry_failed: bool = False, report: Callable[[int, int, dict], None] = _report) -> dict:
+    """
+    Process the items that have no result in `writer` yet and write each
+    result as soon as it arrives. workers=0 runs in this process.
+    """
+    options = options or {}
+    todo = pending_items(items, writer.done(), retry_failed)
+    summary = {"total": len(items), "skipped": len(items) - len(todo), "processed": 0, "failed": 0}
+    t0 = time.monotonic()
+
+    def record_result(record: dict) -> None:
+        writer.write(record)
+        summary["processed"] += 1
+        summary["failed"] += record["error"] is not None
+        report(summary["skipped"] + summary["processed"], summary["total"], record)
+
+    try:
+        if todo and workers <= 0:
+            initializer(options)
+            for item in todo:
+                record_result(process(item))
+        elif todo:
+            pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"),
+                                       initializer=initializer, initargs=(options,))
+            queue: Iterable[dict] = iter(todo)
+            pending = set()
+            try:
+                while True:
+                    # Bounded window: results stream out while the rest waits in this process
+                    while len(pending) < 2 * workers:
+                        item = next(queue, None)
+                        if item is None:
+                            break
+                        pending.add(pool.submit(process, item))
+                    if not pending:
+                        break
+                    finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        record_result(future.result())
+            finally:
+                pool.shutdown(wait=not pending, cancel_futures=True)
+    finally:
+        writer.close()
+    summary["seconds"] = round(time.monotonic() - t0, 1)
+    return summary
+
+def make_writer(out: str, fmt: Optional[str] = None, part_size: int = 100, flush_seconds: float = 60.0):
+    fmt = fmt or ("jsonl" if out.endswith((".jsonl", ".json")) else "parquet")
+    return JsonlWriter(out) if fmt == "jsonl" else ParquetWriter(out, part_size, flush_seconds)
+
+def main():
+    parser = argparse.ArgumentParser(description="Transcribe, grammar-check and score a batch of recordings")
+    parser.add_argument("source", help="Directory of recordings or a .csv/.jsonl manifest")
+    parser.add_argument("--out", required=True, help="results.jsonl, or a directory for Parquet parts")
+    parser.add_argument("--format", choices=["jsonl", "parquet"], default=None, help="Default: from --out")
+    parser.add_argument("--workers", type=int, default=max(1, (multiprocessing.cpu_count() or 2) // 2),
+                        help="Worker processes, each with its own models (0 = run in this process)")
+    parser.add_argument("--cpu-threads", type=int, default=2, help="ASR threads per worker")
+    parser.add_argument("--model", default=None, help="Whisper model size (default WHISPER_MODEL)")
+    parser.add_argument("--lang", default=None, help="Language of the recordings, e.g. de")
+    parser.add_argument("--no-grammar", action="store_true", help="Skip grammar feedback")
+    # Parquet checkpoints once per part: an interrupted run redoes at most one part's worth of recordings
+    parser.add_argument("--part-size", type=int, default=100, help="Max records per Parquet part")
+    parser.add_argument("--flush-seconds", type=float, default=60.0,
+                        help="Also write a Parquet part after this many seconds, bounding lost work")
+    parser.add_argument("--retry-failed", action="store_true", help="Also re-run recordings that errored")
+    args = parser.parse_args()
+
+    items = load_items(args.source)
+    writer = make_writer(args.out, args.format, args.part_size, args.flush_seconds)
+    options = {"model": args.model, "lang": args.lang, "grammar": not args.no_grammar,
+               "cpu_threads": args.cpu_threads}
+    try:
+        summary = run_batch(items, writer, args.workers, options, retry_failed=args.retry_failed)
+    except KeyboardInterrupt:
+        print("Interrupted; re-run the same command to resume.", file=sys.stderr)
+        sys.exit(130)
+    print(json.dumps(summary))
+    sys.exit(1 if summary["failed"] else 0)
+
+if __name__ == "__main__":
+    main()
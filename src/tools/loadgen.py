@@ -0,0 +1,223 @@
+# src/tools/loadgen.py
+"""
+End-to-end HTTP load generator for /chat_text and /chat_audio.
+
+Start the server with stub backends so no models or network are needed:
+    STUB_BACKENDS=1 WARMUP_ENABLED=0 python -m src.backend.app --port 8000
+
+Then sweep concurrency (closed loop) or arrival rate (open loop):
+    python -m src.tools.loadgen --concurrency 1,2,4,8,16 --duration 20
+    python -m src.tools.loadgen --rate 2,4,8,16 --mix text=0.7,audio=0.3
+
+Each level reports throughput, p50/p95/p99 latency and error rate; the
+saturation knee is the last level before throughput stops scaling or
+latency/error rate blows up.
+"""
+import argparse
+import asyncio
+import glob
+import json
+import math
+import random
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+import httpx
+
+# None of these are phrasebook phrases, so every turn reaches the LLM (and grammar) stages
+DEFAULT_PROMPTS = [
+    "I would like to practice talking about my weekend plans.",
+    "Ich gehe morgen in die Schule.",
+    "My sister works as a nurse in a big hospital.",
+    "Gestern habe ich mit meinen Freunden Fußball gespielt.",
+    "Can you explain the difference between der, die and das?",
+]
+
+@dataclass
+class LevelResult:
+    mode: str
+    load: float
+    requests: int = 0
+    errors: int = 0
+    duration: float = 0.0
+    latencies: List[float] = field(default_factory=list, repr=False)
+
+    @property
+    def throughput(self) -> float:
+        return (self.requests - self.errors) / self.duration if self.duration else 0.0
+
+    @property
+    def error_rate(self) -> float:
+        return self.errors / self.requests if self.requests else 0.0
+
+    def summary(self) -> dict:
+        return {
+            "mode": self.mode,
+            "load": self.load,
+            "requests": self.requests,
+            "errors": self.errors,
+            "error_rate": round(self.error_rate, 4),
+            "throughput_rps": round(self.throughput, 2),
+            "p50_ms": round(percentile(self.latencies, 50) * 1000, 1),
+            "p95_ms": round(percentile(self.latencies, 95) * 1000, 1),
+            "p99_ms": round(percentile(self.latencies, 99) * 1000, 1),
+        }
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile (0 for an empty list)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100.0 * len(ordered)))
+    return ordered[rank - 1]
+
+def find_knee(levels: List[dict], min_gain: float = 0.10, latency_factor: float = 3.0,
+              max_error_rate: float = 0.01) -> Optional[dict]:
+    """
+    The saturation knee: the last level before throughput gains fall under
+    `min_gain`, p95 exceeds `latency_factor` x the first level's p95, or the
+    error rate passes `max_error_rate`. None if the sweep never saturated.
+    """
+    if not levels:
+        return None
+    base_p95 = levels[0]["p95_ms"] or 1.0
+    for prev, cur in zip(levels, levels[1:]):
+        gain = (cur["throughput_rps"] - prev["throughput_rps"]) / (prev["throughput_rps"] or 1.0)
+        if gain < min_gain or cur["p95_ms"] > latency_factor * base_p95 or cur["error_rate"] > max_error_rate:
+            return prev
+    return None
+
+def parse_mix(spec: str) -> Dict[str, float]:
+    mix = {}
+    for entry in spec.split(","):
+        name, _, weight = entry.partition("=")
+        mix[name.strip()] = float(weight or 1)
+    return mix
+
+class LoadGenerator:
+    def __init__(self, client: httpx.AsyncClient, mix: Dict[str, float], prompts: List[str],
+                 audio_files: List[str], target_lang: str = "de", seed: int = 0):
+        self.client = client
+        self.kinds = list(mix)
+        self.weights = [mix[k] for k in self.kinds]
+        self.prompts = prompts
+        self.audio = [(path, open(path, "rb").read()) for path in audio_files]
+        self.target_lang = target_lang
+        self.rng = random.Random(seed)
+        if "audio" in mix and not self.audio:
+            raise ValueError("Audio traffic requested but no audio files found")
+
+    async def one_request(self, result: LevelResult, client_id: str) -> None:
+        kind = self.rng.choices(self.kinds, self.weights)[0]
+        headers = {"X-Client-Id": client_id}
+        start = time.perf_counter()
+        try:
+            if kind == "audio":
+                path, data = self.rng.choice(self.audio)
+                response = await self.client.post(
+                    "/chat_audio",
+                    files={"file": (path.split("/")[-1], data, "audio/wav")},
+                    data={"target_lang": self.target_lang},
+                    headers=headers,
+                )
+            else:
+                response = await self.client.post(
+                    "/chat_text",
+                    json={"text": self.rng.choice(self.prompts), "target_lang": self.target_lang},
+                    headers=headers,
+                )
+            ok = response.status_code == 200 and response.json().get("success", False)
+        except Exception:
+            ok = False
+        result.latencies.append(time.perf_counter() - start)
+        result.requests += 1
+        if not ok:
+            result.errors += 1
+
+    async def closed_loop(self, concurrency: int, duration: float) -> LevelResult:
+        """`concurrency` virtual users, each sending its next request when the last returns."""
+        result = LevelResult("concurrency", concurrency)
+        stop = time.perf_counter() + duration
+
+        async def user(i: int):
+            while time.perf_counter() < stop:
+                await self.one_request(result, f"loadgen-{i}")
+
+        start = time.perf_counter()
+        await asyncio.gather(*(user(i) for i in range(concurrency)))
+        result.duration = time.perf_counter() - start
+        return result
+
+    async def open_loop(self, rate: float, duration: float) -> LevelResult:
+        """Poisson arrivals at `rate` req/s regardless of how fast the server answers."""
+        result = LevelResult("rate", rate)
+        tasks = []
+        start = time.perf_counter()
+        next_at = start
+        i = 0
+        while next_at < start + duration:
+            await asyncio.sleep(max(0.0, next_at - time.perf_counter()))
+            tasks.append(asyncio.create_task(self.one_request(result, f"loadgen-{i % 64}")))
+            i += 1
+            next_at += self.rng.expovariate(rate)
+        await asyncio.gather(*tasks)
+        result.duration = time.perf_counter() - start
+        return result
+
+async def run_sweep(base_url: str, levels: List[float], mode: str, duration: float, mix: Dict[str, float],
+                    prompts: List[str], audio_files: List[str], target_lang: str = "de",
+                    transport: Optional[httpx.AsyncBaseTransport] = None) -> dict:
+    limits = httpx.Limits(max_connections=max(int(max(levels)) * 2, 10))
+    async with httpx.AsyncClient(base_url=base_url, timeout=120.0, limits=limits, transport=transport) as client:
+        gen = LoadGenerator(client, mix, prompts, audio_files, target_lang)
+        summaries = []
+        for level in levels:
+            if mode == "rate":
+                result = await gen.open_loop(level, duration)
+            else:
+                result = await gen.closed_loop(int(level), duration)
+            summaries.append(result.summary())
+            print(format_row(summaries[-1]), flush=True)
+    return {"levels": summaries, "knee": find_knee(summaries)}
+
+def format_row(s: dict) -> str:
+    return (f"{s['mode']}={s['load']:<6g} reqs={s['requests']:<6} rps={s['throughput_rps']:<8} "
+            f"p50={s['p50_ms']:<8}ms p95={s['p95_ms']:<8}ms p99={s['p99_ms']:<8}ms err={s['error_rate']:.2%}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the chatbot API")
+    parser.add_argument("--url", default="http://localhost:8000")
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument("--concurrency", default=None, help="Comma-separated concurrency levels (closed loop)")
+    group.add_argument("--rate", default=None, help="Comma-separated arrival rates in req/s (open loop)")
+    parser.add_argument("--duration", type=float, default=15.0, help="Seconds per level")
+    parser.add_argument("--mix", default="text=0.8,audio=0.2", help="Traffic mix, e.g. text=0.8,audio=0.2")
+    parser.add_argument("--prompts", default=None, help="File with one text prompt per line")
+    parser.add_argument("--audio", default="samples/*.wav", help="Glob of audio files to upload")
+    parser.add_argument("--target-lang", default="de")
+    parser.add_argument("--json", default=None, help="Write the full report to this file")
+    args = parser.parse_args()
+
+    mode = "rate" if args.rate else "concurrency"
+    levels = [float(x) for x in (args.rate or args.concurrency or "1,2,4,8,16").split(",")]
+    prompts = DEFAULT_PROMPTS
+    if args.prompts:
+        with open(args.prompts, encoding="utf-8") as f:
+            prompts = [line.strip() for line in f if line.strip()]
+    mix = parse_mix(args.mix)
+    audio_files = sorted(glob.glob(args.audio)) if "audio" in mix else []
+
+    report = asyncio.run(run_sweep(args.url, levels, mode, args.duration, mix, prompts, audio_files, args.target_lang))
+    knee = report["knee"]
+    if knee:
+        print(f"\nSaturation knee at {knee['mode']}={knee['load']:g}: "
+              f"{knee['throughput_rps']} req/s, p95 {knee['p95_ms']} ms")
+    else:
+        print("\nNo saturation knee found; extend the sweep to higher load")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+# src/tools/miniredis.py
+"""
+In-memory Redis stand-in speaking RESP, backed by store.LocalStore.
+Enough of the protocol for the chatbot's shared store (strings with TTL,
+lists, pipelining), so multi-replica setups can be run and tested locally
+without a Redis install:
+    python -m src.tools.miniredis --port 6379
+    STORE_URL=redis://localhost:6379/0 python -m src.backend.app --port 8000
+"""
+import argparse
+import asyncio
+import threading
+from typing import List, Optional
+from src.backend.exceptions import StoreException
+from src.backend.store import LocalStore
+
+def _resp(value) -> bytes:
+    if value is None:
+        return b"$-1\r\n"
+    if isinstance(value, bool):
+        return f":{int(value)}\r\n".encode()
+    if isinstance(value, int):
+        return f":{value}\r\n".encode()
+    if isinstance(value, bytes):
+        return f"${len(value)}\r\n".encode() + value + b"\r\n"
+    if isinstance(value, list):
+        return f"*{len(value)}\r\n".encode() + b"".join(_resp(v) for v in value)
+    return f"+{value}\r\n".encode()
+
+async def _read_command(reader: asyncio.StreamReader) -> Optional[List[bytes]]:
+    line = await reader.readline()
+    if not line:
+        return None
+    if not line.startswith(b"*"):
+        return line.strip().split()  # inline command, e.g. from telnet
+    args = []
+    for _ in range(int(line[1:])):
+        size = int((await reader.readline())[1:])
+        args.append((await reader.readexactly(size + 2))[:-2])
+    return args
+
+class MiniRedis:
+    def __init__(self, host: str = "127.0.0.1", port: int = 6379):
+        self.host = host
+        self.port = port
+        self.data = LocalStore()
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def execute(self, args: List[bytes]) -> bytes:
+        name, rest = args[0].decode().upper(), args[1:]
+        text = [a.decode() for a in rest]
+        try:
+            if name == "PING":
+                return _resp(rest[0] if rest else "PONG")
+            if name in ("SELECT", "AUTH", "CLIENT"):
+                return _resp("OK")
+            if name == "GET":
+                return _resp(self.data._run_one("get", text[0]))
+            if name == "SET":
+                ttl, nx, i = None, False, 2
+                while i < len(text):
+                    opt = text[i].upper()
+                    if opt in ("EX", "PX"):
+                        ttl = float(text[i + 1]) / (1 if opt == "EX" else 1000)
+                        i += 1
+                    elif opt == "NX":
+                        nx = True
+                    i += 1
+                ok = self.data._run_one("set", text[0], rest[1], ttl, nx)
+                return _resp("OK") if ok else _resp(None)
+            if name == "DEL":
+                return _resp(self.data._run_one("delete", *text))
+            if name in ("EXPIRE", "PEXPIRE"):
+                ttl = float(text[1]) / (1 if name == "EXPIRE" else 1000)
+                return _resp(self.data._run_one("expire", text[0], ttl))
+            if name == "RPUSH":
+                return _resp(self.data._run_one("rpush", text[0], *rest[1:]))
+            if name == "LRANGE":
+                return _resp(self.data._run_one("lrange", text[0], int(text[1]), int(text[2])))
+            if name == "LTRIM":
+                self.data._run_one("ltrim", text[0], int(text[1]), int(text[2]))
+                return _resp("OK")
+            if name == "FLUSHDB":
+                self.data = LocalStore()
+                return _resp("OK")
+            return f"-ERR unknown command '{name}'\r\n".encode()
+        except StoreException as e:
+            return f"-{e}\r\n".encode()
+        except (IndexError, ValueError):
+            return f"-ERR wrong arguments for '{name}'\r\n".encode()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                args = await _read_command(reader)
+                if not args:
+                    break
+                if args[0].upper() == b"QUIT":
+                    writer.write(_resp("OK"))
+                    break
+                writer.write(self.execute(args))
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def start(self) -> int:
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self.port
+
+    def start_in_thread(self) -> int:
+        """Serve from a daemon thread (tests); returns the bound port (use port=0 for any)."""
+        ready = threading.Event()
+
+        def run():
+            self._loop = asyncio.new_event_loop()
+            self._loop.run_until_complete(self.start())
+            ready.set()
+            self._loop.run_forever()
+
+        threading.Thread(target=run, daemon=True, name="miniredis").start()
+        ready.wait()
+        return self.port
+
+    def stop(self) -> None:
+        if self._loop and self._server:
+            self._loop.call_soon_threadsafe(self._server.close)
+            self._loop.call_soon_threadsafe(self._loop.stop)
+
+def main():
+    parser = argparse.ArgumentParser(description="In-memory Redis stand-in")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=6379)
+    args = parser.parse_args()
+    server = MiniRedis(args.host, args.port)
+
+    async def serve():
+        await server.start()
+        print(f"miniredis listening on {server.host}:{server.port}", flush=True)
+        await asyncio.Event().wait()
+
+    asyncio.run(serve())
+
+if __name__ == "__main__":
+    main()
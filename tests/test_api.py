@@ -34,4 +34,137 @@ async def test_chat_audio_with_mock_file():
     
     # This will fail due to invalid audio, but tests the endpoint structure
     response = client.post("/chat_audio", files=files)
-    assert response.status_code in [400, 500]  # Expected to fail with mock data
\ No newline at end of file
+    assert response.status_code in [400, 500]  # Expected to fail with mock data
+
+def test_ready_endpoint_reports_warmup(monkeypatch):
+    from src.backend import warmup
+    monkeypatch.setitem(warmup.WARMUP_STATE, "status", "running")
+    response = client.get("/ready")
+    assert response.status_code == 503
+    assert response.json()["success"] is False
+
+    monkeypatch.setitem(warmup.WARMUP_STATE, "status", "done")
+    response = client.get("/ready")
+    assert response.status_code == 200
+    assert response.json()["success"] is True
+
+def test_run_warmup_times_each_stage(monkeypatch):
+    from src.backend import warmup
+    calls = []
+    monkeypatch.setitem(warmup.STAGES, "imports", lambda: calls.append("imports"))
+    monkeypatch.setitem(warmup.STAGES, "asr", lambda: calls.append("asr"))
+    def boom():
+        raise RuntimeError("no model")
+    monkeypatch.setitem(warmup.STAGES, "grammar", boom)
+
+    state = warmup.run_warmup(warmup.parse_stages("asr,grammar,bogus"))
+    assert calls == ["imports", "asr"]
+    assert state["status"] == "done"
+    assert state["stages"]["asr"]["status"] == "ok"
+    assert state["stages"]["grammar"]["status"] == "failed"
+    assert "seconds" in state["stages"]["asr"]
+
+def test_failed_required_stage_keeps_ready_at_503(monkeypatch):
+    from src.backend import warmup
+    monkeypatch.setattr(warmup, "WARMUP_STATE", {"status": "pending", "stages": {}})
+    monkeypatch.setitem(warmup.STAGES, "imports", lambda: None)
+    def boom():
+        raise RuntimeError("no TTS engine")
+    monkeypatch.setitem(warmup.STAGES, "tts", boom)
+
+    assert warmup.run_warmup(["tts"], required=["asr", "tts"])["status"] == "degraded"
+    response = client.get("/ready")
+    assert response.status_code == 503
+    assert response.json()["data"]["stages"]["tts"]["status"] == "failed"
+
+def test_slim_mode_waits_for_the_worker_and_is_degraded_without_it(monkeypatch):
+    from src.backend import remote, warmup
+    from src.backend.config import settings
+    from src.backend.exceptions import ASRException
+    monkeypatch.setattr(warmup, "WARMUP_STATE", {"status": "pending", "stages": {}})
+    monkeypatch.setattr(warmup, "WORKER_POLL_SECONDS", 0)
+    monkeypatch.setitem(warmup.STAGES, "imports", lambda: None)
+    monkeypatch.setattr(settings, "model_worker_ready_timeout_seconds", 0.05)
+    polls = []
+
+    def worker_ready():
+        polls.append(1)
+        if len(polls) < 3:
+            raise ASRException("worker warming up")
+
+    monkeypatch.setattr(remote, "ready", worker_ready)
+    stages = warmup.slim_stages(["asr", "tts"])
+    monkeypatch.setitem(warmup.STAGES, "tts", lambda: None)
+    assert warmup.run_warmup(stages)["status"] == "done" and len(polls) == 3
+
+    def unreachable():
+        raise ASRException("connection refused")
+
+    monkeypatch.setattr(remote, "ready", unreachable)
+    assert warmup.run_warmup(stages)["status"] == "degraded"
+    assert client.get("/ready").status_code == 503
+
+@pytest.fixture
+def reply_audio(tmp_path, monkeypatch):
+    from src.backend import audio_store
+    monkeypatch.setattr(audio_store, "AUDIO_DIR", tmp_path)
+    (tmp_path / "response_abc123.mp3").write_bytes(b"0123456789")
+    return "response_abc123"
+
+def test_audio_endpoint_serves_with_etag(reply_audio):
+    response = client.get(f"/audio/{reply_audio}")
+    assert response.status_code == 200
+    assert response.content == b"0123456789"
+    assert response.headers["content-type"] == "audio/mpeg"
+    assert "immutable" in response.headers["cache-control"]
+
+    etag = response.headers["etag"]
+    response = client.get(f"/audio/{reply_audio}", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+
+def test_audio_endpoint_range_requests(reply_audio):
+    response = client.get(f"/audio/{reply_audio}", headers={"Range": "bytes=2-5"})
+    assert response.status_code == 206
+    assert response.content == b"2345"
+    assert response.headers["content-range"] == "bytes 2-5/10"
+
+    response = client.get(f"/audio/{reply_audio}", headers={"Range": "bytes=-3"})
+    assert response.content == b"789"
+
+    response = client.get(f"/audio/{reply_audio}", headers={"Range": "bytes=50-"})
+    assert response.status_code == 416
+
+    # A stale If-Range validator gets the whole (changed) file
+    response = client.get(f"/audio/{reply_audio}", headers={"Range": "bytes=2-5", "If-Range": '"stale"'})
+    assert (response.status_code, response.content) == (200, b"0123456789")
+
+def test_concurrent_opus_transcodes_use_separate_tmp_files(reply_audio, tmp_path, monkeypatch):
+    import threading
+    from src.backend import audio_store
+    outputs, barrier = [], threading.Barrier(2)
+
+    def fake_ffmpeg(cmd, **kwargs):
+        outputs.append(cmd[-1])
+        barrier.wait(timeout=5)  # both transcodes in flight at once
+        with open(cmd[-1], "wb") as f:
+            f.write(b"\x1a\x45\xdf\xa3")
+
+    monkeypatch.setattr(audio_store.subprocess, "run", fake_ffmpeg)
+    source = tmp_path / f"{reply_audio}.mp3"
+    threads = [threading.Thread(target=audio_store.opus_version, args=(source,)) for _ in range(2)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(set(outputs)) == 2
+    assert (tmp_path / f"{reply_audio}.webm").read_bytes() == b"\x1a\x45\xdf\xa3"
+    assert not list(tmp_path.glob("*.tmp.webm"))
+
+def test_audio_endpoint_unknown_or_unsafe_id(reply_audio):
+    assert client.get("/audio/missing").status_code == 404
+    assert client.get("/audio/..%2Fsecret").status_code == 404
+
+def test_stats_endpoint():
+    response = client.get("/stats")
+    assert response.status_code == 200
+    assert "janitor" in response.json()["data"]
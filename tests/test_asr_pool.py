@@ -0,0 +1,58 @@
+import threading
+import time
+from src.backend.asr import ASRPool
+
+def test_pool_spreads_work_across_replicas():
+    loaded = []
+    def loader(model_size, cpu_threads, num_workers):
+        loaded.append((model_size, cpu_threads))
+        return ("fake", f"replica{len(loaded)}")
+
+    pool = ASRPool("tiny", replicas=2, cpu_threads=4, loader=loader)
+    assert loaded == [("tiny", 4), ("tiny", 4)]
+
+    used, peak, active, lock = set(), [0], [0], threading.Lock()
+    def work():
+        with pool.acquire() as (_, model):
+            with lock:
+                used.add(model)
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+            time.sleep(0.05)
+            with lock:
+                active[0] -= 1
+
+    threads = [threading.Thread(target=work) for _ in range(6)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert used == {"replica1", "replica2"}
+    assert peak[0] == 2
+    stats = pool.stats()
+    assert stats["requests"] == 6 and stats["busy"] == 0
+    assert 0 < stats["utilization"] <= 1
+
+def test_loading_one_size_does_not_block_stats_or_loaded_sizes(monkeypatch):
+    from src.backend import asr
+    monkeypatch.setattr(asr, "_POOLS", {})
+    monkeypatch.setattr(asr, "_CREATE_LOCKS", {})
+    release = threading.Event()
+
+    def loader(model_size, cpu_threads, num_workers):
+        if model_size == "medium":
+            release.wait(5)
+        return ("fake", model_size)
+
+    small = asr.get_pool("small", loader=loader)
+    slow = threading.Thread(target=asr.get_pool, args=("medium",), kwargs={"loader": loader})
+    slow.start()
+    time.sleep(0.05)
+    t0 = time.monotonic()
+    assert asr.get_pool("small", loader=loader) is small
+    assert [p["model_size"] for p in asr.pool_stats()] == ["small"]
+    assert time.monotonic() - t0 < 0.5
+    release.set()
+    slow.join()
+    assert sorted(p["model_size"] for p in asr.pool_stats()) == ["medium", "small"]
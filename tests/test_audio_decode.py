@@ -0,0 +1,66 @@
+import io
+import wave
+import numpy as np
+import pytest
+from src.backend import audio_decode
+from src.backend.audio_decode import AudioDecoder, resample, sniff_extension
+from src.backend.config import settings
+from src.backend.exceptions import ASRException
+
+def wav_bytes(samples: np.ndarray, rate: int, channels: int = 1) -> bytes:
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as w:
+        w.setnchannels(channels)
+        w.setsampwidth(2)
+        w.setframerate(rate)
+        w.writeframes((samples * 32767).astype("<i2").tobytes())
+    return buf.getvalue()
+
+@pytest.fixture
+def in_process_only(monkeypatch):
+    # Only the stdlib wave decoder; no pool processes
+    monkeypatch.setattr(audio_decode, "SOUNDFILE_AVAILABLE", False)
+    monkeypatch.setattr(audio_decode, "PYAV_AVAILABLE", False)
+    monkeypatch.setattr(settings, "audio_decode_workers", 0)
+
+def test_stereo_wav_bytes_to_16k_mono(in_process_only):
+    t = np.arange(44100) / 44100
+    tone = 0.5 * np.sin(2 * np.pi * 440 * t)
+    stereo = np.stack([tone, tone], axis=1).reshape(-1)
+    decoder = AudioDecoder()
+    audio = decoder.decode(wav_bytes(stereo, 44100, channels=2), "take.wav")
+    assert audio.dtype == np.float32
+    assert abs(len(audio) - 16000) <= 1
+    assert 0.45 < np.abs(audio).max() < 0.55
+    assert decoder.stats()["wave"] == 1
+
+def test_decodes_from_path(tmp_path, in_process_only):
+    path = tmp_path / "clip.wav"
+    path.write_bytes(wav_bytes(np.zeros(8000), 16000))
+    assert len(audio_decode.decode(str(path))) == 8000
+
+def test_resample_keeps_duration():
+    audio = np.random.default_rng(0).standard_normal(48000).astype(np.float32)
+    assert len(resample(audio, 48000, 16000)) == 16000
+    assert resample(audio, 16000, 16000) is audio
+
+def test_sniff_extension():
+    assert sniff_extension(wav_bytes(np.zeros(10), 16000)) == ".wav"
+    assert sniff_extension(b"OggS\x00\x02") == ".ogg"
+    assert sniff_extension(b"ID3\x04\x00") == ".mp3"
+    assert sniff_extension(b"\x1a\x45\xdf\xa3....") == ".webm"
+    assert sniff_extension(b"garbage") == ""
+
+def test_compressed_formats_try_pyav_first(monkeypatch):
+    monkeypatch.setattr(audio_decode, "SOUNDFILE_AVAILABLE", True)
+    monkeypatch.setattr(audio_decode, "PYAV_AVAILABLE", True)
+    monkeypatch.setattr(settings, "audio_decode_workers", 2)
+    decoder = AudioDecoder()
+    assert [n for n, _ in decoder._chain(".mp3")] == ["pyav", "soundfile", "pool"]
+    assert [n for n, _ in decoder._chain(".wav")] == ["soundfile", "wave", "pyav", "pool"]
+
+def test_undecodable_upload_raises(in_process_only):
+    decoder = AudioDecoder()
+    with pytest.raises(ASRException):
+        decoder.decode(b"fake audio content", "test.wav")
+    assert decoder.stats()["failed"] == 1
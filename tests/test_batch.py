@@ -0,0 +1,93 @@
+import json
+import os
+import pytest
+from src.tools import batch
+from src.tools.batch import JsonlWriter, load_items, run_batch
+
+def fake_init(options):
+    pass
+
+def fake_process(item):
+    # Module level so spawned pool workers can import it
+    error = "ASRException: bad file" if "broken" in item["id"] else None
+    return {"id": item["id"], "path": item["path"], "text": None if error else f"text of {item['id']}",
+            "error": error, "seconds": 0.0, "pid": os.getpid()}
+
+def make_items(n):
+    return [{"id": f"rec{i}.wav", "path": f"/data/rec{i}.wav"} for i in range(n)]
+
+def read_jsonl(path):
+    return [json.loads(line) for line in open(path, encoding="utf-8")]
+
+def quiet(*args):
+    pass
+
+def test_directory_scan_with_reference_sidecars(tmp_path):
+    (tmp_path / "anna").mkdir()
+    (tmp_path / "anna" / "take1.wav").write_bytes(b"")
+    (tmp_path / "anna" / "take1.txt").write_text("Guten Morgen\n", encoding="utf-8")
+    (tmp_path / "ben.mp3").write_bytes(b"")
+    (tmp_path / "notes.md").write_text("x")
+    items = load_items(str(tmp_path))
+    assert [(i["id"], i["reference"]) for i in items] == [("anna/take1.wav", "Guten Morgen"), ("ben.mp3", None)]
+
+def test_manifests_resolve_relative_paths(tmp_path):
+    (tmp_path / "class.csv").write_text("path,reference,lang\nclips/a.wav,Hallo,de\n/abs/b.wav,,\n", encoding="utf-8")
+    items = load_items(str(tmp_path / "class.csv"))
+    assert items[0]["path"] == str(tmp_path / "clips" / "a.wav")
+    assert (items[0]["reference"], items[0]["lang"]) == ("Hallo", "de")
+    assert (items[1]["path"], items[1]["reference"]) == ("/abs/b.wav", None)
+
+    rows = [{"id": "x", "path": "a.wav"}, {"id": "x", "path": "b.wav"}]
+    (tmp_path / "dup.jsonl").write_text("\n".join(json.dumps(r) for r in rows), encoding="utf-8")
+    with pytest.raises(ValueError):
+        load_items(str(tmp_path / "dup.jsonl"))
+
+def test_interrupted_run_resumes_where_it_stopped(tmp_path):
+    out = tmp_path / "results.jsonl"
+    items = make_items(5)
+    first = run_batch(items[:3], JsonlWriter(str(out)), process=fake_process, initializer=fake_init, report=quiet)
+    assert first["processed"] == 3
+    with open(out, "a", encoding="utf-8") as f:
+        f.write('{"id": "rec3.wav", "te')  # crash mid-write
+
+    second = run_batch(items, JsonlWriter(str(out)), process=fake_process, initializer=fake_init, report=quiet)
+    assert (second["skipped"], second["processed"]) == (3, 2)
+    assert [r["id"] for r in read_jsonl(out)] == [i["id"] for i in items]
+
+def test_failed_items_are_only_rerun_on_request(tmp_path):
+    out = str(tmp_path / "results.jsonl")
+    items = make_items(2) + [{"id": "broken.wav", "path": "/data/broken.wav"}]
+    first = run_batch(items, JsonlWriter(out), process=fake_process, initializer=fake_init, report=quiet)
+    assert first["failed"] == 1
+    rerun = run_batch(items, JsonlWriter(out), process=fake_process, initializer=fake_init, report=quiet)
+    assert rerun["processed"] == 0
+    again = run_batch(items, JsonlWriter(out), process=fake_process, initializer=fake_init, retry_failed=True,
+                      report=quiet)
+    assert (again["processed"], again["failed"]) == (1, 1)
+
+def test_process_pool_writes_every_result(tmp_path):
+    out = str(tmp_path / "results.jsonl")
+    summary = run_batch(make_items(6), JsonlWriter(out), workers=2, process=fake_process, initializer=fake_init,
+                        report=quiet)
+    records = read_jsonl(out)
+    assert summary["processed"] == 6
+    assert sorted(r["id"] for r in records) == [f"rec{i}.wav" for i in range(6)]
+    assert os.getpid() not in {r["pid"] for r in records}
+
+def test_parquet_parts(tmp_path):
+    pytest.importorskip("pyarrow")
+    writer = batch.make_writer(str(tmp_path / "out"), part_size=2)
+    run_batch(make_items(3), writer, process=fake_process, initializer=fake_init, report=quiet)
+    parts = sorted((tmp_path / "out").glob("part-*.parquet"))
+    assert len(parts) == 2
+    assert set(batch.make_writer(str(tmp_path / "out")).done()) == {"rec0.wav", "rec1.wav", "rec2.wav"}
+    # Same schema in every part, even where a column is all null
+    import pyarrow.parquet as pq
+    assert pq.read_schema(parts[0]) == pq.read_schema(parts[1])
+
+def test_parquet_flushes_on_time(tmp_path):
+    pytest.importorskip("pyarrow")
+    writer = batch.make_writer(str(tmp_path / "out"), part_size=100, flush_seconds=0)
+    writer.write(fake_process(make_items(1)[0]))
+    assert set(batch.make_writer(str(tmp_path / "out")).done()) == {"rec0.wav"}
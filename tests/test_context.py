@@ -0,0 +1,94 @@
+import json
+import pytest
+from src.backend.context import ConversationContext, estimate_tokens
+
+def fake_summarizer(previous, turns, max_tokens):
+    return (previous + " | " if previous else "") + ", ".join(t["user"] for t in turns)
+
+def make_context(tmp_path, budget=60, summary=20, **kwargs):
+    return ConversationContext(tmp_path / "memory", token_budget=budget, summary_tokens=summary,
+                               summarizer=fake_summarizer, **kwargs)
+
+def test_build_includes_recent_turns_in_order(tmp_path):
+    ctx = make_context(tmp_path, budget=200)
+    ctx.record("s1", "Hallo", "Hallo! Wie geht's?", "de")
+    ctx.record("s1", "Gut, danke", "Schön!", "de")
+    ctx.record("s2", "Hola", "¡Hola!", "es")
+
+    built = ctx.build("s1", "de")
+    assert built.startswith("User is practicing de.")
+    assert built.index("Hallo") < built.index("Gut, danke")
+    assert "Hola" not in built
+
+def test_old_turns_fold_into_summary_and_prompt_stays_bounded(tmp_path):
+    ctx = make_context(tmp_path, budget=60, summary=20)
+    for i in range(20):
+        ctx.record("s1", f"message number {i}", f"reply number {i}", "de")
+        assert estimate_tokens(ctx.build("s1", "de")) <= 60
+
+    session = ctx.session("s1")
+    assert session["summary"].endswith(f"message number {19 - len(session['turns'])}")
+    assert len(session["turns"]) < 20
+    assert "Earlier in this conversation" in ctx.build("s1", "de")
+
+def test_legacy_memory_file_is_migrated(tmp_path):
+    (tmp_path / "memory.json").write_text(json.dumps([{"user": "Hi", "reply": "Hallo", "lang": "de"}]))
+    ctx = make_context(tmp_path, budget=200, legacy_file=tmp_path / "memory.json")
+    assert "User: Hi" in ctx.build("default", "de")
+    assert not (tmp_path / "memory.json").exists()
+    # Migrated once; a restart reads the session file
+    assert "User: Hi" in make_context(tmp_path, budget=200).build("default", "de")
+
+def test_turn_rewrites_only_its_session_and_idle_sessions_expire(tmp_path, monkeypatch):
+    import os
+    import time
+    ctx = make_context(tmp_path, budget=200, cached_sessions=1, ttl_seconds=3600)
+    ctx.record("s1", "Hallo", "Hallo!", "de")
+    ctx.record("s2", "Hola", "¡Hola!", "es")
+    s1_file = ctx._file("s1")
+    written = s1_file.stat().st_mtime_ns
+    ctx.record("s2", "Adiós", "¡Adiós!", "es")
+    assert s1_file.stat().st_mtime_ns == written
+    assert len(list((tmp_path / "memory").glob("*.json"))) == 2
+    # Only one session stays in RAM; the other is read back from its file
+    assert list(ctx._sessions) == ["s2"]
+    assert ctx.session("s1")["turns"][0]["user"] == "Hallo"
+
+    later = time.time() + 7200
+    with monkeypatch.context() as m:
+        m.setattr(time, "time", lambda: later)
+        assert ctx.session("s1")["turns"] == []
+    old = time.time() - 7200
+    for session_id in ("s1", "s2"):
+        os.utime(ctx._file(session_id), (old, old))
+    ctx._last_sweep = 0.0
+    ctx.record("s3", "Hi", "Hallo", "de")  # a write sweeps expired files (at most hourly)
+    assert [p.name for p in (tmp_path / "memory").glob("*.json")] == [ctx._file("s3").name]
+
+def test_record_async_writes_off_the_event_loop(tmp_path):
+    import asyncio
+    import threading
+    ctx = make_context(tmp_path)
+    writers = []
+    append = ctx._append
+
+    def spy(*args):
+        writers.append(threading.current_thread())
+        return append(*args)
+
+    ctx._append = spy
+    asyncio.run(ctx.record_async("s1", "Hallo", "Hallo!", "de"))
+    assert writers and writers[0] is not threading.main_thread()
+    assert ctx.session("s1")["turns"][0]["user"] == "Hallo"
+
+def test_stub_mode_summarizes_without_gemini(monkeypatch):
+    import sys
+    import types
+    from src.backend import context
+    from src.backend.config import settings
+    monkeypatch.setattr(settings, "stub_backends", True)
+    fake = types.SimpleNamespace(summarize_conversation=lambda *a, **k: pytest.fail("Gemini called in stub mode"))
+    monkeypatch.setitem(sys.modules, "src.backend.llm_helper", fake)
+    monkeypatch.setattr(sys.modules["src.backend"], "llm_helper", fake, raising=False)
+    turns = [{"user": "Hallo", "reply": "Hallo!"}]
+    assert "Hallo" in context.llm_summary("", turns, 50)
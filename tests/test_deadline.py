@@ -0,0 +1,135 @@
+import asyncio
+import time
+import types
+import pytest
+from src.backend.config import settings
+from src.backend.deadline import Deadline
+from src.backend.exceptions import DeadlineException
+
+def test_header_overrides_default_up_to_the_cap(monkeypatch):
+    monkeypatch.setattr(settings, "request_timeout_seconds", 60.0)
+    monkeypatch.setattr(settings, "request_timeout_max_seconds", 120.0)
+    assert 9 < Deadline.from_header("10").remaining() <= 10
+    assert 119 < Deadline.from_header("600").remaining() <= 120
+    assert 59 < Deadline.from_header("soon").remaining() <= 60
+    monkeypatch.setattr(settings, "request_timeout_seconds", 0)
+    assert not Deadline.from_header(None).bounded
+
+def test_slow_stage_is_cancelled_at_the_deadline():
+    cancelled = []
+
+    async def slow():
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+
+    async def scenario():
+        deadline = Deadline(0.05)
+        assert await deadline.run("fast", asyncio.sleep(0, result="ok")) == "ok"
+        t0 = time.monotonic()
+        with pytest.raises(DeadlineException):
+            await deadline.run("tts", slow())
+        assert time.monotonic() - t0 < 1
+        await asyncio.sleep(0)
+        with pytest.raises(DeadlineException):
+            await deadline.call("llm", lambda: "never runs")
+        return deadline
+
+    deadline = asyncio.run(scenario())
+    assert cancelled == [True]
+    assert (deadline.stage, deadline.reason) == ("tts", "timeout")
+
+def test_client_disconnect_cancels_without_a_timeout():
+    polls = []
+
+    async def is_disconnected():
+        polls.append(1)
+        return len(polls) > 2
+
+    async def scenario():
+        deadline = Deadline(None, is_disconnected)
+        with pytest.raises(DeadlineException):
+            await deadline.run("asr", asyncio.sleep(5))
+        return deadline
+
+    t0 = time.monotonic()
+    assert asyncio.run(scenario()).reason == "disconnected"
+    assert time.monotonic() - t0 < 2
+
+def test_unbounded_call_still_leaves_the_event_loop_free():
+    import threading
+
+    def blocking(x):
+        time.sleep(0.2)
+        return x * 2, threading.current_thread()
+
+    async def scenario():
+        ticks = []
+
+        async def ticker():
+            for _ in range(5):
+                ticks.append(time.monotonic())
+                await asyncio.sleep(0.01)
+
+        (result, thread), _ = await asyncio.gather(Deadline().call("grammar", blocking, 21), ticker())
+        return result, thread, ticks
+
+    result, thread, ticks = asyncio.run(scenario())
+    assert result == 42 and thread is not threading.main_thread()
+    assert ticks[-1] - ticks[0] < 0.15  # the loop kept running during the call
+
+@pytest.fixture
+def orchestrator(monkeypatch):
+    monkeypatch.setattr(settings, "stub_backends", True)
+    monkeypatch.setattr(settings, "phrasebook_enabled", False)
+    from src.agents import orchestrator
+    recorded = []
+
+    async def slow_tts(text, out_path, lang="en", engines=None, voice=None):
+        await asyncio.sleep(5)
+        return out_path
+
+    monkeypatch.setattr(orchestrator, "llm_helper",
+                        types.SimpleNamespace(explain_in_target_lang=lambda text, target_lang: "Guten Tag!"))
+    monkeypatch.setattr(orchestrator, "tts", types.SimpleNamespace(synthesize_to_file=slow_tts))
+
+    async def record_async(*args):
+        recorded.append(args)
+
+    monkeypatch.setattr(orchestrator, "CONTEXT", types.SimpleNamespace(record_async=record_async))
+    orchestrator.recorded = recorded
+    return orchestrator
+
+def test_partial_reply_without_audio_when_tts_runs_out_of_time(orchestrator):
+    result = asyncio.run(orchestrator._process_text("good day", "en", "de", "s1", deadline=Deadline(0.3)))
+    assert result["reply_text"] == "Guten Tag!"
+    assert result["reply_audio_path"] is None
+    assert (result["partial"], result["cut_at"], result["cut_reason"]) == (True, "tts", "timeout")
+    assert len(orchestrator.recorded) == 1
+
+def test_anonymous_and_default_sessions_keep_no_history(orchestrator):
+    for session_id in (None, "default"):
+        asyncio.run(orchestrator._process_text("good day", "en", "de", session_id, deadline=Deadline(0.3)))
+    assert orchestrator.recorded == []
+
+def test_disconnected_client_skips_memory_write(orchestrator):
+    async def gone():
+        return True
+
+    result = asyncio.run(orchestrator._process_text("good day", "en", "de", "s1", deadline=Deadline(None, gone)))
+    assert (result["cut_at"], result["cut_reason"]) == ("llm", "disconnected")
+    assert result["reply_text"] == ""
+    assert orchestrator.recorded == []
+
+def test_chat_text_answers_504_when_the_deadline_passes(orchestrator, monkeypatch):
+    from fastapi.testclient import TestClient
+    from src.backend.app import app
+
+    async def out_of_time(*args, **kwargs):
+        raise DeadlineException("llm: timeout")
+
+    monkeypatch.setattr(orchestrator, "handle_text_interaction", out_of_time)
+    response = TestClient(app).post("/chat_text", json={"text": "good day"})
+    assert response.status_code == 504
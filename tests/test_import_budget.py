@@ -0,0 +1,44 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# Cold-start budget for the API process (serverless entry point)
+MAX_IMPORT_SECONDS = 3.0
+MAX_MODULES = 800
+HEAVY = ["torch", "transformers", "whisper", "faster_whisper", "ctranslate2", "language_tool_python",
+         "google.generativeai", "numpy", "soundfile", "av"]
+
+PROBE = """
+import json, sys, time
+t0 = time.perf_counter()
+for name in sys.argv[1:]:
+    __import__(name)
+print(json.dumps({"seconds": time.perf_counter() - t0, "modules": len(sys.modules),
+                  "heavy": [m for m in %r if m in sys.modules]}))
+""" % (HEAVY,)
+
+def import_cost(*modules: str, **env) -> dict:
+    environ = {k: v for k, v in os.environ.items() if k not in ("STUB_BACKENDS", "MODEL_WORKER_URL")}
+    out = subprocess.run([sys.executable, "-c", PROBE, *modules], cwd=ROOT, env={**environ, **env},
+                         capture_output=True, text=True, timeout=60)
+    assert out.returncode == 0, out.stderr
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+def test_app_import_is_light():
+    cost = import_cost("src.backend.app")
+    assert cost["heavy"] == []
+    assert cost["modules"] < MAX_MODULES
+    assert cost["seconds"] < MAX_IMPORT_SECONDS
+
+@pytest.mark.parametrize("entry", ["src.backend.app", "api.index"])
+def test_slim_mode_pipeline_stays_light(entry):
+    # What the first request imports too: the orchestrator with model-worker backends
+    cost = import_cost(entry, "src.agents.orchestrator", MODEL_WORKER_URL="http://worker:8100")
+    assert cost["heavy"] == []
+    assert cost["modules"] < MAX_MODULES
+    assert cost["seconds"] < MAX_IMPORT_SECONDS
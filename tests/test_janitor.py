@@ -0,0 +1,39 @@
+import os
+from src.backend.janitor import TempFileJanitor
+
+def write(path, size):
+    path.write_bytes(b"x" * size)
+    return str(path)
+
+def test_sweep_evicts_expired_files(tmp_path):
+    janitor = TempFileJanitor([str(tmp_path)], max_age_seconds=60, max_total_bytes=10_000)
+    old = write(tmp_path / "old.mp3", 10)
+    new = write(tmp_path / "new.mp3", 10)
+    janitor.register(old, created_at=1000)
+    janitor.register(new, created_at=1050)
+
+    assert janitor.sweep(now=1070) == 1
+    assert not os.path.exists(old) and os.path.exists(new)
+    assert janitor.stats()["files"] == 1
+
+def test_sweep_enforces_size_budget_oldest_first(tmp_path):
+    janitor = TempFileJanitor([str(tmp_path)], max_age_seconds=3600, max_total_bytes=25)
+    paths = [write(tmp_path / f"f{i}.mp3", 10) for i in range(4)]
+    for i, p in enumerate(paths):
+        janitor.register(p, created_at=100 + i)
+
+    assert janitor.sweep(now=200) == 2
+    assert [os.path.exists(p) for p in paths] == [False, False, True, True]
+    stats = janitor.stats()
+    assert stats["bytes"] == 20
+    assert stats["evicted_bytes"] == 20
+
+def test_bootstrap_and_forget(tmp_path):
+    write(tmp_path / "a.wav", 5)
+    write(tmp_path / "b.wav", 7)
+    janitor = TempFileJanitor([str(tmp_path), str(tmp_path / "missing")], max_age_seconds=3600, max_total_bytes=100)
+    assert janitor.bootstrap() == 2
+    assert janitor.stats()["bytes"] == 12
+
+    janitor.forget(str(tmp_path / "a.wav"))
+    assert janitor.stats()["files"] == 1
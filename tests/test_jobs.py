@@ -0,0 +1,57 @@
+import asyncio
+import pytest
+from fastapi.testclient import TestClient
+from src.backend import jobs
+from src.backend.app import app
+
+async def fake_runner(job, progress):
+    for stage in ("grammar", "llm", "tts"):
+        progress(stage)
+        await asyncio.sleep(0)
+    if job.payload.get("text") == "boom":
+        raise RuntimeError("pipeline failed")
+    return {"reply_text": f"echo: {job.payload['text']}"}
+
+def test_job_runs_and_streams_stages():
+    async def scenario():
+        manager = jobs.JobManager(workers=1, runner=fake_runner)
+        job = manager.submit("text", {"text": "Hallo", "target_lang": "de", "session_id": "s"})
+        stages = [event["stage"] async for event in manager.stream(job)]
+        return job, stages
+    job, stages = asyncio.run(scenario())
+    assert stages == ["queued", "started", "grammar", "llm", "tts", "done"]
+    assert job.result == {"reply_text": "echo: Hallo"}
+
+def test_failed_job_records_error():
+    async def scenario():
+        manager = jobs.JobManager(workers=1, runner=fake_runner)
+        job = manager.submit("text", {"text": "boom", "target_lang": "de", "session_id": "s"})
+        [_ async for _ in manager.stream(job)]
+        return job
+    job = asyncio.run(scenario())
+    assert job.status == "failed"
+    assert "pipeline failed" in job.error
+
+@pytest.fixture
+def api(monkeypatch):
+    monkeypatch.setattr(jobs.settings, "warmup_enabled", False)
+    monkeypatch.setattr(jobs.JOBS, "runner", fake_runner)
+    with TestClient(app) as client:
+        yield client
+
+def test_job_endpoints(api):
+    response = api.post("/jobs", data={"text": "Hallo", "target_lang": "de"})
+    assert response.status_code == 202
+    job_id = response.json()["data"]["job_id"]
+
+    with api.stream("GET", f"/jobs/{job_id}/events") as stream:
+        body = "".join(stream.iter_text())
+    assert "event: result" in body
+
+    data = api.get(f"/jobs/{job_id}").json()["data"]
+    assert data["status"] == "done"
+    assert data["result"]["reply_text"] == "echo: Hallo"
+
+def test_job_endpoints_validation(api):
+    assert api.post("/jobs", data={"target_lang": "de"}).status_code == 422
+    assert api.get("/jobs/unknown").status_code == 404
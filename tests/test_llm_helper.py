@@ -0,0 +1,32 @@
+import json
+import pytest
+from src.backend.llm_helper import apply_corrections, parse_single_pass
+
+TEXT = "Ich gehen gestern in die Schule"
+
+def test_parse_single_pass_builds_grammar_matches():
+    raw = json.dumps({"reply": "Schön!", "corrections": [
+        {"error": "gehen", "message": "Verbform", "replacements": ["ging"]},
+        {"error": "Schule", "message": "ok", "replacements": []},
+    ]})
+    out = parse_single_pass(f"```json\n{raw}\n```", TEXT)
+    assert out["reply"] == "Schön!"
+    matches = out["grammar"]["matches"]
+    assert [(m["offset"], m["length"]) for m in matches] == [(4, 5), (25, 6)]
+    assert out["grammar"]["corrected"] == "Ich ging gestern in die Schule"
+
+def test_unusable_corrections_keep_reply():
+    raw = json.dumps({"reply": "Gut", "corrections": [{"error": "nicht im Text", "replacements": ["x"]}]})
+    assert parse_single_pass(raw, TEXT) == {"reply": "Gut", "grammar": None}
+
+def test_missing_reply_raises():
+    with pytest.raises(ValueError):
+        parse_single_pass('{"corrections": []}', TEXT)
+    with pytest.raises(ValueError):
+        parse_single_pass("not json", TEXT)
+
+def test_apply_corrections_skips_overlaps():
+    matches = [{"offset": 0, "length": 3, "replacements": ["Du"]},
+               {"offset": 1, "length": 4, "replacements": ["zz"]},
+               {"offset": 4, "length": 5, "replacements": ["gehst"]}]
+    assert apply_corrections(TEXT, matches) == "Du gehst gestern in die Schule"
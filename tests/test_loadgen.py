@@ -0,0 +1,56 @@
+import asyncio
+import httpx
+from src.tools import loadgen
+
+def test_percentile_nearest_rank():
+    values = [float(v) for v in range(1, 101)]
+    assert loadgen.percentile(values, 50) == 50.0
+    assert loadgen.percentile(values, 99) == 99.0
+    assert loadgen.percentile([], 95) == 0.0
+
+def level(load, rps, p95, err=0.0):
+    return {"mode": "concurrency", "load": load, "throughput_rps": rps, "p95_ms": p95, "error_rate": err}
+
+def test_find_knee_on_throughput_plateau():
+    levels = [level(1, 5, 200), level(2, 10, 210), level(4, 19, 230), level(8, 20, 450)]
+    assert loadgen.find_knee(levels)["load"] == 4
+
+def test_find_knee_on_errors_and_no_knee():
+    assert loadgen.find_knee([level(1, 5, 200), level(2, 10, 200, err=0.2)])["load"] == 1
+    assert loadgen.find_knee([level(1, 5, 200), level(2, 10, 210)]) is None
+
+def test_sweep_against_stub_app():
+    async def handler(request):
+        if request.url.path == "/chat_text":
+            return httpx.Response(200, json={"success": True, "data": {}})
+        return httpx.Response(500, json={"detail": "boom"})
+
+    report = asyncio.run(loadgen.run_sweep(
+        "http://test", [1, 2], "concurrency", 0.05, {"text": 1.0}, ["Hallo"], [],
+        transport=httpx.MockTransport(handler),
+    ))
+    assert [lvl["load"] for lvl in report["levels"]] == [1, 2]
+    assert all(lvl["requests"] > 0 and lvl["errors"] == 0 for lvl in report["levels"])
+
+def test_stub_pipeline_reaches_the_llm(monkeypatch):
+    from src.agents import orchestrator
+    from src.backend import stubs
+    from src.backend.config import settings
+    monkeypatch.setattr(settings, "phrasebook_enabled", True)
+    for stage in ("asr", "llm", "tts"):
+        monkeypatch.setattr(settings, f"stub_{stage}_ms", 0)
+    for name in ("asr", "tts", "llm_helper", "feedback"):
+        monkeypatch.setattr(orchestrator, name, getattr(stubs, name))
+
+    def stages_for(turn):
+        stages = []
+        asyncio.run(turn(stages.append))
+        return stages
+
+    audio = stages_for(lambda progress: orchestrator.handle_audio_interaction(
+        "take.wav", target_lang="de", audio=b"RIFF", progress=progress))
+    assert "llm" in audio and "phrasebook" not in audio
+    for prompt in loadgen.DEFAULT_PROMPTS:
+        text = stages_for(lambda progress: orchestrator.handle_text_interaction(
+            prompt, target_lang="de", progress=progress))
+        assert "llm" in text and "phrasebook" not in text, prompt
@@ -0,0 +1,59 @@
+import numpy as np
+from src.backend import long_audio
+from src.backend.long_audio import SAMPLE_RATE, find_split_points, make_chunks, stitch
+
+def speech_with_pauses(seconds, pauses):
+    rng = np.random.default_rng(0)
+    audio = (rng.standard_normal(seconds * SAMPLE_RATE) * 0.3).astype(np.float32)
+    for start in pauses:
+        audio[int(start * SAMPLE_RATE):int((start + 0.6) * SAMPLE_RATE)] = 0.0
+    return audio
+
+def test_splits_land_in_silences():
+    audio = speech_with_pauses(95, pauses=[28.0, 61.5])
+    splits = [s / SAMPLE_RATE for s in find_split_points(audio, chunk_seconds=30, search_seconds=5)]
+    assert len(splits) == 2
+    assert 28.0 <= splits[0] <= 28.6
+    assert 61.5 <= splits[1] <= 62.1
+
+def test_short_audio_is_one_chunk():
+    audio = speech_with_pauses(10, pauses=[])
+    assert find_split_points(audio, chunk_seconds=30) == []
+    assert make_chunks(len(audio), []) == [(0, len(audio), 0, len(audio))]
+
+def test_make_chunks_overlap():
+    chunks = make_chunks(60 * SAMPLE_RATE, [30 * SAMPLE_RATE], overlap_seconds=1.0)
+    assert chunks == [
+        (0, 31 * SAMPLE_RATE, 0, 30 * SAMPLE_RATE),
+        (29 * SAMPLE_RATE, 60 * SAMPLE_RATE, 30 * SAMPLE_RATE, 60 * SAMPLE_RATE),
+    ]
+
+def test_stitch_drops_overlap_duplicates():
+    c1, c2 = make_chunks(60 * SAMPLE_RATE, [30 * SAMPLE_RATE], overlap_seconds=1.0)
+    first = [{"start": 0.0, "end": 10.0, "text": "Hallo"}, {"start": 28.5, "end": 30.8, "text": "wie geht's"}]
+    second = [{"start": 29.0, "end": 30.8, "text": "wie geht's"}, {"start": 31.0, "end": 35.0, "text": "gut"}]
+    merged = stitch([(c2, second), (c1, first)])
+    assert [s["text"] for s in merged] == ["Hallo", "wie geht's", "gut"]
+
+def test_transcribe_long_fixes_language_from_first_chunk(monkeypatch):
+    class InlinePool:
+        def submit(self, fn, *args):
+            class Done:
+                def __init__(self, value):
+                    self.value = value
+                def result(self):
+                    return self.value
+            return Done(fn(*args))
+
+    calls = []
+    def fake_chunk(audio, offset, lang):
+        calls.append(lang)
+        return [{"start": offset + 1.0, "end": offset + 2.0, "text": f"at {offset:.0f}"}], "de"
+
+    monkeypatch.setattr(long_audio, "_get_pool", lambda: InlinePool())
+    monkeypatch.setattr(long_audio, "_transcribe_chunk", fake_chunk)
+    monkeypatch.setattr(long_audio.settings, "long_audio_chunk_seconds", 30)
+    audio = speech_with_pauses(70, pauses=[30.0])
+    result = long_audio.transcribe_long("lecture.wav", audio=audio)
+    assert calls[0] is None and all(lang == "de" for lang in calls[1:])
+    assert result["lang"] == "de" and result["chunks"] == len(calls)
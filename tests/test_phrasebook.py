@@ -0,0 +1,54 @@
+import json
+import time
+from src.backend.phrasebook import Phrasebook, compile_index, normalize
+
+ENTRIES = {"entries": [
+    {"id": "how_are_you", "phrases": ["Hello, how are you?", "Wie geht's?"],
+     "answers": {"de": "Hallo, wie geht es dir?", "fr": "Bonjour, comment ça va ?"}},
+    {"id": "thanks", "phrases": ["thank you", "Merci beaucoup"], "answers": {"de": "Danke!"}},
+]}
+
+def _source(tmp_path):
+    path = tmp_path / "phrases.json"
+    path.write_text(json.dumps(ENTRIES), encoding="utf-8")
+    return path
+
+def test_normalize():
+    assert normalize("  Hello,  HOW are you?! ") == "hello how are you"
+    assert normalize("Wie spät ist es?") == "wie spat ist es"
+    assert normalize("आप कैसे हैं?") == "आप कैसे हैं"
+
+def test_exact_and_fuzzy_lookup(tmp_path):
+    book = Phrasebook(_source(tmp_path), min_score=0.8)
+    hit = book.lookup("hello how are you", "de")
+    assert hit["id"] == "how_are_you" and hit["score"] == 1.0
+    assert book.lookup("Hello, how are yuo?", "fr")["answer"] == "Bonjour, comment ça va ?"
+    assert book.lookup("merci beaucoup!", "de")["answer"] == "Danke!"
+    # No answer in that language, or nothing close enough
+    assert book.lookup("thank you", "fr") is None
+    assert book.lookup("Explain the German case system", "de") is None
+    assert book.stats()["hits"] == 3
+
+def test_lookup_is_fast(tmp_path):
+    book = Phrasebook(_source(tmp_path)).load()
+    start = time.perf_counter()
+    for _ in range(100):
+        book.lookup("Hello, how are yuo?", "de")
+    assert (time.perf_counter() - start) / 100 < 0.001
+
+def test_precompiled_index_used_until_source_changes(tmp_path):
+    source = _source(tmp_path)
+    index = compile_index(source, str(tmp_path / "index.json"))
+    book = Phrasebook(source, index_path=index).load()
+    assert book.lookup("thank you", "de")["answer"] == "Danke!"
+
+    data = json.loads(source.read_text(encoding="utf-8"))
+    data["entries"][1]["answers"]["de"] = "Vielen Dank!"
+    source.write_text(json.dumps(data), encoding="utf-8")
+    # Stale index is ignored and the source rebuilt
+    assert Phrasebook(source, index_path=index).lookup("thank you", "de")["answer"] == "Vielen Dank!"
+
+def test_bundled_phrasebook_answers_app_tip():
+    book = Phrasebook()
+    for lang in ("de", "es", "fr", "en", "hi"):
+        assert book.lookup("Hello, how are you?", lang)["id"] == "how_are_you"
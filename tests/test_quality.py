@@ -0,0 +1,61 @@
+import asyncio
+import pytest
+from src.backend.quality import PROFILES, QualityController, QualityProfile
+from src.backend.scheduler import AdmissionScheduler
+
+def controller(load, **kw):
+    return QualityController(lambda: load[0], default="balanced", queue_high=8, queue_low=2,
+                             p95_high_ms=5000, p95_low_ms=1000, cooldown_seconds=10, **kw)
+
+def test_requested_profile_honoured_when_idle():
+    ctl = controller([(0, 0.1)])
+    assert ctl.select().name == "balanced"
+    assert ctl.select("fast").name == "fast"
+    assert ctl.select("accurate").name == "accurate"
+    with pytest.raises(ValueError):
+        ctl.select("ultra")
+
+def test_steps_down_under_load_and_back_up():
+    load = [(12, 0.5)]
+    ctl = controller(load)
+    assert ctl.update(now=100) == "fast"
+    assert ctl.select("accurate").name == "balanced"
+    assert ctl.select("fast").name == "fast"
+
+    # Still loaded, or within the cooldown: stay put
+    load[0] = (0, 0.2)
+    assert ctl.update(now=105) == "fast"
+    assert ctl.update(now=111) == "balanced"
+    assert ctl.update(now=200) == "balanced"  # never above the default
+    assert (ctl.steps_down, ctl.steps_up) == (1, 1)
+
+def test_latency_alone_triggers_step_down():
+    ctl = controller([(0, 6.0)])
+    assert ctl.update(now=100) == "fast"
+
+def test_non_adaptive_controller_is_fixed():
+    ctl = controller([(50, 60.0)], adaptive=False)
+    assert ctl.update(now=100) == "balanced"
+
+def test_profiles_are_ordered_by_cost():
+    assert list(PROFILES) == ["fast", "balanced", "accurate"]
+    assert PROFILES["fast"].asr_beam_size <= PROFILES["balanced"].asr_beam_size
+
+def test_profile_voice_per_language():
+    profile = QualityProfile("x", "tiny", asr_beam_size=1, tts_voices="de:de-DE-ConradNeural; en:en-US-GuyNeural")
+    assert profile.tts_voice("de") == "de-DE-ConradNeural"
+    assert profile.tts_voice("en") == "en-US-GuyNeural"
+    assert profile.tts_voice("fr") is None
+    assert QualityProfile("y", "tiny", asr_beam_size=1).tts_voice("de") is None
+
+def test_scheduler_tracks_p95_latency():
+    sched = AdmissionScheduler(2, 2, {"interactive": 1})
+
+    async def run():
+        for delay in (0.0, 0.0, 0.05):
+            async with sched.slot("c"):
+                await asyncio.sleep(delay)
+
+    asyncio.run(run())
+    assert 0.04 < sched.p95_latency() < 1.0
+    assert sched.stats()["p95_ms"] > 40
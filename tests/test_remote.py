@@ -0,0 +1,38 @@
+import json
+import httpx
+import pytest
+from src.backend import remote
+from src.backend.exceptions import ASRException
+
+@pytest.fixture
+def worker(monkeypatch):
+    seen = []
+
+    def handler(request: httpx.Request):
+        seen.append(request)
+        if request.url.path == "/asr":
+            return httpx.Response(200, json={"success": True, "data": {"text": "Hallo", "segments": [], "lang": "de"}})
+        if request.url.path == "/translate":
+            body = json.loads(request.content)
+            return httpx.Response(200, json={"success": True, "data": {"translated_text": body["text"].upper()}})
+        return httpx.Response(503, json={"detail": "warming up"})
+
+    client = httpx.Client(base_url="http://worker", transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(remote, "_CLIENT", client)
+    return seen
+
+def test_transcribe_sends_the_upload_and_options(worker):
+    result = remote.asr.transcribe("take.webm", lang_hint="de", model_size="base", audio=b"\x1a\x45\xdf\xa3opus")
+    assert result["text"] == "Hallo"
+    body = worker[0].content
+    assert b'filename="take.webm"' in body and b"\x1a\x45\xdf\xa3opus" in body
+    assert b'name="model_size"\r\n\r\nbase' in body
+    assert b"beam_size" not in body
+
+def test_translate_and_grammar_fallback(worker):
+    assert remote.translator.translate("hallo", "de", "en")["translated_text"] == "HALLO"
+    # Grammar never fails a turn: an unavailable worker means no corrections
+    assert remote.feedback.grammar_correct("Ich gehen", lang="de") == {"corrected": "Ich gehen", "matches": []}
+    with pytest.raises(ASRException):
+        remote._call("GET", "/ready", ASRException)
+    assert remote.stats()["errors"] >= 2
@@ -0,0 +1,77 @@
+import json
+import sys
+import types
+from email import message_from_bytes
+import pytest
+from fastapi.testclient import TestClient
+from src.backend.app import app
+from src.backend.response_format import negotiate, pack_multipart
+
+client = TestClient(app)
+
+def test_negotiate():
+    assert negotiate(None) == "json"
+    assert negotiate("application/json, */*") == "json"
+    assert negotiate("multipart/mixed") == "multipart"
+    assert negotiate("application/json;q=0.5, multipart/mixed") == "multipart"
+    assert negotiate("text/html") == "json"
+
+def test_pack_multipart_round_trips():
+    body = {"success": True, "data": {"reply_text": "Hallo"}}
+    raw = pack_multipart(body, b"\xff\xfbID3", "audio/mpeg", "r.mp3", "BOUNDARY")
+    msg = message_from_bytes(b"Content-Type: multipart/mixed; boundary=BOUNDARY\r\n\r\n" + raw)
+    meta, audio = msg.get_payload()
+    assert json.loads(meta.get_payload(decode=True)) == body
+    assert audio.get_content_type() == "audio/mpeg"
+    assert audio.get_payload(decode=True) == b"\xff\xfbID3"
+
+@pytest.fixture
+def fake_orchestrator(tmp_path, monkeypatch):
+    audio = tmp_path / "response_x.mp3"
+    audio.write_bytes(b"\xff\xfb" + b"\x00" * 64)
+
+    async def handle_text_interaction(text, target_lang="de", session_id=None, progress=None, quality=None,
+                                      deadline=None):
+        fake.sessions.append(session_id)
+        return {"user_text": text, "detected_lang": "en", "reply_text": "Antwort " * 200,
+                "reply_audio_path": str(audio), "reply_audio_url": "/audio/response_x", "grammar_matches": []}
+
+    fake = types.SimpleNamespace(handle_text_interaction=handle_text_interaction, sessions=[])
+    monkeypatch.setitem(sys.modules, "src.agents.orchestrator", fake)
+    return audio
+
+def test_chat_text_multipart_inlines_audio(fake_orchestrator):
+    response = client.post("/chat_text", json={"text": "Hi"}, headers={"Accept": "multipart/mixed"})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("multipart/mixed; boundary=")
+    msg = message_from_bytes(b"Content-Type: " + response.headers["content-type"].encode() + b"\r\n\r\n"
+                             + response.content)
+    meta, audio = msg.get_payload()
+    assert json.loads(meta.get_payload(decode=True))["data"]["reply_audio_url"] == "/audio/response_x"
+    assert audio.get_payload(decode=True) == fake_orchestrator.read_bytes()
+
+def test_chat_text_msgpack(fake_orchestrator):
+    msgpack = pytest.importorskip("msgpack")
+    response = client.post("/chat_text", json={"text": "Hi"}, headers={"Accept": "application/msgpack"})
+    assert response.headers["content-type"] == "application/msgpack"
+    data = msgpack.unpackb(response.content, raw=False)["data"]
+    assert data["reply_audio"] == fake_orchestrator.read_bytes()
+    assert data["reply_audio_type"] == "audio/mpeg"
+
+def test_json_is_gzipped_but_audio_is_not(fake_orchestrator, monkeypatch, tmp_path):
+    response = client.post("/chat_text", json={"text": "Hi"}, headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.json()["data"]["reply_text"].startswith("Antwort")
+
+    from src.backend import audio_store
+    monkeypatch.setattr(audio_store, "AUDIO_DIR", tmp_path)
+    response = client.get("/audio/response_x", headers={"Accept-Encoding": "gzip"})
+    assert response.status_code == 200
+    assert "content-encoding" not in response.headers
+
+def test_chat_text_without_session_gets_a_fresh_one(fake_orchestrator):
+    first = client.post("/chat_text", json={"text": "Hi"}).json()["data"]["session_id"]
+    second = client.post("/chat_text", json={"text": "Hi"}).json()["data"]["session_id"]
+    assert first != second and "default" not in (first, second)
+    client.post("/chat_text", json={"text": "Hi", "session_id": first})
+    assert sys.modules["src.agents.orchestrator"].sessions == [first, second, first]
@@ -0,0 +1,122 @@
+import asyncio
+import pytest
+from src.backend.scheduler import AdmissionScheduler, audio_duration, parse_weights, INTERACTIVE, BULK
+from src.backend.exceptions import OverloadedException
+
+def make_scheduler(**kwargs):
+    options = dict(max_concurrency=1, per_client_limit=1, weights=parse_weights("interactive:4,bulk:1"))
+    options.update(kwargs)
+    return AdmissionScheduler(**options)
+
+async def request(scheduler, order, name, client, klass, cost, hold=0.01):
+    async with scheduler.slot(client, klass, cost):
+        order.append(name)
+        await asyncio.sleep(hold)
+
+def test_interactive_and_shortest_jobs_go_first():
+    async def scenario():
+        scheduler, order = make_scheduler(), []
+        blocker = asyncio.create_task(request(scheduler, order, "blocker", "x", BULK, 1, hold=0.05))
+        await asyncio.sleep(0)
+        tasks = [
+            asyncio.create_task(request(scheduler, order, "long-audio", "a", BULK, 60)),
+            asyncio.create_task(request(scheduler, order, "short-audio", "b", BULK, 5)),
+            asyncio.create_task(request(scheduler, order, "text", "c", INTERACTIVE, 1)),
+        ]
+        await asyncio.gather(blocker, *tasks)
+        return order
+    assert asyncio.run(scenario()) == ["blocker", "text", "short-audio", "long-audio"]
+
+def test_per_client_cap_lets_other_clients_through():
+    async def scenario():
+        scheduler, order = make_scheduler(max_concurrency=2), []
+        tasks = [asyncio.create_task(request(scheduler, order, f"heavy{i}", "heavy", BULK, 1, hold=0.05)) for i in range(3)]
+        await asyncio.sleep(0)
+        tasks.append(asyncio.create_task(request(scheduler, order, "light", "light", BULK, 1)))
+        await asyncio.gather(*tasks)
+        return order
+    order = asyncio.run(scenario())
+    assert order.index("light") < order.index("heavy1")
+
+def test_queue_limit_rejects():
+    async def scenario():
+        scheduler = make_scheduler(max_queue=1)
+        order = []
+        first = asyncio.create_task(request(scheduler, order, "a", "a", BULK, 1, hold=0.05))
+        await asyncio.sleep(0)
+        second = asyncio.create_task(request(scheduler, order, "b", "b", BULK, 1))
+        await asyncio.sleep(0)
+        with pytest.raises(OverloadedException):
+            await request(scheduler, order, "c", "c", BULK, 1)
+        await asyncio.gather(first, second)
+        return scheduler.stats()
+    stats = asyncio.run(scenario())
+    assert stats["rejected"] == 1 and stats["running"] == 0
+
+def test_cancelled_waiter_leaves_queue():
+    async def scenario():
+        scheduler, order = make_scheduler(), []
+        first = asyncio.create_task(request(scheduler, order, "a", "a", BULK, 1, hold=0.05))
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(request(scheduler, order, "b", "b", BULK, 1))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        await first
+        return scheduler.stats(), order
+    stats, order = asyncio.run(scenario())
+    assert order == ["a"]
+    assert stats["queued"] == {"interactive": 0, "bulk": 0} and stats["running"] == 0
+
+def test_upload_duration_from_wav_header_or_size():
+    import io
+    import wave
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(8000)
+        w.writeframes(b"\x00\x00" * 4000)
+    assert audio_duration(buf.getvalue()) == 0.5
+    assert audio_duration(b"\x1a\x45\xdf\xa3" + b"\x00" * 31996) == 2.0  # compressed: ~128 kbps
+
+def test_waiter_cancelled_while_a_slot_is_released():
+    async def scenario():
+        scheduler, order = make_scheduler(), []
+        release = asyncio.Event()
+
+        async def holder():
+            async with scheduler.slot("a", BULK, 1):
+                await release.wait()
+
+        held = asyncio.create_task(holder())
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(request(scheduler, order, "b", "b", BULK, 1))
+        await asyncio.sleep(0)
+        release.set()
+        waiter.cancel()  # same loop iteration as the release
+        await held
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        await request(scheduler, order, "c", "c", BULK, 1)
+        return scheduler.stats(), order
+    stats, order = asyncio.run(scenario())
+    assert order == ["c"]
+    assert stats["running"] == 0 and stats["clients"] == {}
+
+def test_class_returning_from_idle_does_not_starve_the_other():
+    async def scenario():
+        scheduler, order = make_scheduler(), []
+        for i in range(20):  # bulk-only traffic; interactive sits idle
+            await request(scheduler, order, "warm", f"w{i}", BULK, 1, hold=0)
+        order.clear()
+        blocker = asyncio.create_task(request(scheduler, order, "blocker", "x", BULK, 1, hold=0.02))
+        await asyncio.sleep(0)
+        tasks = [asyncio.create_task(request(scheduler, order, "text", f"t{i}", INTERACTIVE, 1, hold=0))
+                 for i in range(12)]
+        tasks += [asyncio.create_task(request(scheduler, order, "upload", f"u{i}", BULK, 1, hold=0))
+                  for i in range(3)]
+        await asyncio.gather(blocker, *tasks)
+        return order
+    order = asyncio.run(scenario())
+    # interactive:4,bulk:1 shares, not 20 banked rounds of interactive first
+    assert order.index("upload") <= 6
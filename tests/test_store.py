@@ -0,0 +1,114 @@
+import threading
+import time
+import pytest
+from src.backend.context import ConversationContext
+from src.backend.exceptions import StoreException
+from src.backend.store import LocalStore, RedisStore, make_store
+from src.backend.transcription_cache import TranscriptionCache
+from src.tools.miniredis import MiniRedis
+
+@pytest.fixture(scope="module")
+def redis_url():
+    server = MiniRedis(port=0)
+    port = server.start_in_thread()
+    yield f"redis://127.0.0.1:{port}/0"
+    server.stop()
+
+@pytest.fixture(params=["memory", "redis"])
+def store(request, redis_url):
+    prefix = f"test-{time.monotonic_ns()}:"
+    if request.param == "memory":
+        yield LocalStore(prefix)
+        return
+    s = RedisStore(redis_url, pool_size=2, prefix=prefix)
+    yield s
+    s.close()
+
+def test_strings_ttl_and_nx(store):
+    assert store.get("missing") is None
+    assert store.set("k", "v") and store.get("k") == b"v"
+    assert store.set("k", "other", nx=True) is False
+    assert store.set("short", "x", ttl=0.05)
+    time.sleep(0.1)
+    assert store.get("short") is None
+    assert store.delete("k", "short") == 1
+
+def test_lists(store):
+    assert store.rpush("l", "a", "b", "c", "d") == 4
+    assert store.lrange("l", 0, -1) == [b"a", b"b", b"c", b"d"]
+    assert store.lrange("l", -2, -1) == [b"c", b"d"]
+    store.ltrim("l", 2, -1)
+    assert store.lrange("l", 0, -1) == [b"c", b"d"]
+    with pytest.raises(StoreException):
+        store.get("l")
+
+def test_pipeline_batches_commands(store):
+    with store.pipeline() as p:
+        p.set("a", 1).rpush("q", "x", "y").get("a").lrange("q", 0, -1)
+    assert p.results == [True, 2, b"1", [b"x", b"y"]]
+    if isinstance(store, RedisStore):
+        before = store.round_trips
+        store.pipeline().get("a").get("q2").get("a").execute()
+        assert store.round_trips == before + 1
+
+def test_redis_pool_is_bounded(redis_url):
+    s = RedisStore(redis_url, pool_size=2)
+    threads = [threading.Thread(target=lambda i=i: [s.set(f"p{i}", j) for j in range(20)]) for i in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert s.stats()["connections"] <= 2
+    assert s.get("p7") == b"19"
+
+def test_redis_connection_is_dropped_after_a_malformed_reply(redis_url, monkeypatch):
+    from src.backend import store as store_module
+    s = RedisStore(redis_url, pool_size=1)
+    s.set("k", "v")
+    real_read_reply = store_module.read_reply
+
+    def garbled(reader):
+        reader.readline()  # consume part of the reply, then fail to parse it
+        raise ValueError("invalid literal for int()")
+
+    monkeypatch.setattr(store_module, "read_reply", garbled)
+    with pytest.raises(StoreException):
+        s.get("k")
+    assert s._idle.qsize() == 0
+    monkeypatch.setattr(store_module, "read_reply", real_read_reply)
+    assert s.get("k") == b"v"
+    assert s.opened == 2
+    s.close()
+
+def test_unreachable_redis_raises_store_exception():
+    s = RedisStore("redis://127.0.0.1:1/0", timeout=0.5)
+    with pytest.raises(StoreException):
+        s.get("k")
+
+def test_make_store():
+    assert isinstance(make_store(""), LocalStore)
+    assert make_store("redis://cache:6380/2").port == 6380
+    with pytest.raises(ValueError):
+        make_store("memcached://x")
+
+def test_sessions_shared_between_replicas(tmp_path, redis_url):
+    def replica(name):
+        return ConversationContext(tmp_path / f"{name}.json", token_budget=60, summary_tokens=20,
+                                   summarizer=lambda prev, turns, n: ", ".join(t["user"] for t in turns),
+                                   store=RedisStore(redis_url, prefix="ctx-test:"))
+    a, b = replica("a"), replica("b")
+    for i in range(10):
+        (a if i % 2 else b).record("s1", f"message number {i}", f"reply {i}", "de")
+    session = b.session("s1")
+    assert session == a.session("s1")
+    assert session["summary"] and len(session["turns"]) < 10
+    assert session["turns"][-1]["user"] == "message number 9"
+    assert not (tmp_path / "a.json").exists()
+
+def test_transcription_cache_shared_tier(tmp_path, redis_url):
+    shared = RedisStore(redis_url, prefix="asr-test:")
+    first = TranscriptionCache(str(tmp_path / "r1"), 8, 10_000, store=shared)
+    second = TranscriptionCache(str(tmp_path / "r2"), 8, 10_000, store=shared)
+    first.put("k1", {"text": "Hallo"})
+    assert second.get("k1") == {"text": "Hallo"}
+    assert second.stats()["store_hits"] == 1
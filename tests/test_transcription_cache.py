@@ -0,0 +1,83 @@
+import wave
+import pytest
+from src.backend import asr
+from src.backend.config import settings
+from src.backend.transcription_cache import TranscriptionCache, audio_digest, make_key
+
+def test_key_depends_on_content_and_options(tmp_path):
+    a, b = tmp_path / "a.wav", tmp_path / "b.wav"
+    a.write_bytes(b"RIFF" + b"\x01" * 100)
+    b.write_bytes(b"RIFF" + b"\x01" * 100)
+    da, db = audio_digest(str(a)), audio_digest(str(b))
+    assert da == db
+    base = make_key(da, "small", "de", {"beam_size": 5})
+    assert make_key(db, "small", "de", {"beam_size": 5}) == base
+    assert make_key(da, "base", "de", {"beam_size": 5}) != base
+    assert make_key(da, "small", None, {"beam_size": 5}) != base
+    assert make_key(da, "small", "de", {"beam_size": 1}) != base
+
+def test_memory_then_disk_tiers(tmp_path):
+    cache = TranscriptionCache(str(tmp_path), memory_entries=1, disk_max_bytes=10_000)
+    cache.put("aa1", {"text": "eins"})
+    cache.put("bb2", {"text": "zwei"})  # pushes aa1 out of memory
+    assert cache.get("bb2") == {"text": "zwei"}
+    assert cache.get("aa1") == {"text": "eins"}
+    assert cache.get("cc3") is None
+    stats = cache.stats()
+    assert (stats["memory_hits"], stats["disk_hits"], stats["misses"]) == (1, 1, 1)
+
+    # A fresh instance (e.g. after restart) finds entries on disk
+    reopened = TranscriptionCache(str(tmp_path), memory_entries=1, disk_max_bytes=10_000)
+    assert reopened.get("bb2") == {"text": "zwei"}
+
+def test_disk_budget_evicts_least_recently_used(tmp_path):
+    entry = {"text": "x" * 100}
+    cache = TranscriptionCache(str(tmp_path), memory_entries=0, disk_max_bytes=250)
+    cache.put("k1", entry)
+    cache.put("k2", entry)
+    cache.get("k1")  # k2 is now the oldest
+    cache.put("k3", entry)
+    assert cache.get("k2") is None
+    assert cache.get("k1") == entry and cache.get("k3") == entry
+    assert cache.stats()["disk_bytes"] <= 250
+    assert len(list(tmp_path.glob("*/*.json"))) == 2
+
+def test_transcribe_skips_model_on_repeat(tmp_path, monkeypatch):
+    from src.backend import transcription_cache
+    monkeypatch.setattr(transcription_cache, "TRANSCRIPTION_CACHE",
+                        TranscriptionCache(str(tmp_path / "cache"), 8, 1_000_000))
+    monkeypatch.setattr(settings, "transcription_cache_enabled", True)
+    calls = []
+
+    class FakeModel:
+        def transcribe(self, path, language=None, **options):
+            calls.append(path)
+            return {"text": " Hallo ", "segments": [], "language": "de"}
+
+    class FakePool:
+        def acquire(self):
+            from contextlib import nullcontext
+            return nullcontext(("openai", FakeModel()))
+
+    monkeypatch.setattr(asr, "get_pool", lambda model_size=None: FakePool())
+    audio = tmp_path / "take.wav"
+    with wave.open(str(audio), "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(16000)
+        w.writeframes(b"\x00\x01" * 1600)
+
+    first = asr.transcribe(str(audio), lang_hint="de")
+    again = asr.transcribe(str(audio), lang_hint="de")
+    assert first == again == {"text": "Hallo", "segments": [], "lang": "de"}
+    assert len(calls) == 1
+    asr.transcribe(str(audio), lang_hint="en")
+    assert len(calls) == 2
+    # Warmup must always reach the model, even when the result is cached
+    asr.transcribe(str(audio), lang_hint="de", use_cache=False)
+    assert len(calls) == 3
+    # An upload with the same bytes hits the same entry without being decoded
+    from src.backend import audio_decode
+    monkeypatch.setattr(audio_decode, "decode", lambda *a, **k: pytest.fail("decoded on a cache hit"))
+    assert asr.transcribe("upload.wav", lang_hint="de", audio=audio.read_bytes()) == first
+    assert len(calls) == 3
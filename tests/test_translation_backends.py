@@ -0,0 +1,82 @@
+import types
+import pytest
+from src.backend import translation_backends as tb
+
+class FakeEngine:
+    def __init__(self, model_name, model_dir=None, fail=False):
+        if fail:
+            raise RuntimeError("bad model")
+        self.model_name = model_name
+        self.model_dir = model_dir
+
+class FakeTransformers(FakeEngine):
+    name = "transformers"
+
+class FakeCT2(FakeEngine):
+    name = "ctranslate2"
+
+@pytest.fixture
+def engines(tmp_path, monkeypatch):
+    monkeypatch.setattr(tb.settings, "translation_model_dir", str(tmp_path))
+    monkeypatch.setattr(tb, "TransformersEngine", FakeTransformers)
+    monkeypatch.setattr(tb, "CTranslate2Engine", FakeCT2)
+    monkeypatch.setattr(tb, "CT2_AVAILABLE", True)
+    model = "Helsinki-NLP/opus-mt-en-de"
+    tb.converted_dir(model).mkdir()
+    return model
+
+def test_auto_prefers_a_converted_ctranslate2_model(engines):
+    engine = tb.load_engine(engines, "auto")
+    assert engine.name == "ctranslate2"
+    assert engine.model_dir.name == "Helsinki-NLP--opus-mt-en-de-int8"
+    assert tb.load_engine(engines, "transformers").name == "transformers"
+
+def test_falls_back_to_marian_when_ctranslate2_is_unusable(engines, monkeypatch):
+    # Not converted
+    assert tb.load_engine("Helsinki-NLP/opus-mt-de-en", "ctranslate2").name == "transformers"
+    # Not installed
+    monkeypatch.setattr(tb, "CT2_AVAILABLE", False)
+    assert tb.load_engine(engines, "auto").name == "transformers"
+    # Installed and converted, but the model fails to load
+    monkeypatch.setattr(tb, "CT2_AVAILABLE", True)
+    monkeypatch.setattr(tb, "CTranslate2Engine", lambda name, model_dir: FakeCT2(name, fail=True))
+    assert tb.load_engine(engines, "auto").name == "transformers"
+
+class FakeTokenizer:
+    """Word-level vocabulary with an end-of-sentence id, like the Marian SentencePiece tokenizer."""
+    EOS = 0
+
+    def __init__(self):
+        self.vocab = {"</s>": self.EOS}
+
+    def encode(self, text):
+        return [self.vocab.setdefault(w, len(self.vocab)) for w in text.split()] + [self.EOS]
+
+    def convert_ids_to_tokens(self, ids):
+        inverse = {i: w for w, i in self.vocab.items()}
+        return [inverse[i] for i in ids]
+
+    def convert_tokens_to_ids(self, tokens):
+        return [self.vocab.setdefault(t, len(self.vocab)) for t in tokens]
+
+    def decode(self, ids, skip_special_tokens=False):
+        inverse = {i: w for w, i in self.vocab.items()}
+        return " ".join(inverse[i] for i in ids if not (skip_special_tokens and i == self.EOS))
+
+def test_ctranslate2_engine_round_trips_tokens():
+    seen = {}
+
+    def translate_batch(batch, beam_size, max_decoding_length):
+        seen.update(batch=batch, beam_size=beam_size, max_length=max_decoding_length)
+        # "Translate" by upper-casing each source token (dropping </s>, as CTranslate2 does)
+        return [types.SimpleNamespace(hypotheses=[[t.upper() for t in tokens if t != "</s>"]]) for tokens in batch]
+
+    engine = object.__new__(tb.CTranslate2Engine)
+    engine.tokenizer = FakeTokenizer()
+    engine.translator = types.SimpleNamespace(translate_batch=translate_batch)
+
+    assert engine.translate_batch(["guten morgen", "danke"], max_length=64, num_beams=2) == ["GUTEN MORGEN", "DANKE"]
+    assert seen["batch"] == [["guten", "morgen", "</s>"], ["danke", "</s>"]]
+    assert (seen["beam_size"], seen["max_length"]) == (2, 64)
+    engine.translate_batch(["hallo"])
+    assert seen["beam_size"] == 4
@@ -0,0 +1,47 @@
+import threading
+import time
+import pytest
+from src.backend.translation_models import TranslationModelManager, resolve_route
+from src.backend.exceptions import TranslationException
+
+MB = 1024 * 1024
+
+def make_manager(budget_mb=2, load_delay=0.0):
+    loads = []
+    def loader(name):
+        loads.append(name)
+        time.sleep(load_delay)
+        return ("tok", name)
+    manager = TranslationModelManager(loader, memory_budget_mb=budget_mb, sizer=lambda entry: MB)
+    return manager, loads
+
+def test_resolve_direct_and_pivot_routes():
+    assert resolve_route("en", "de") == ["en-de"]
+    assert resolve_route("es", "de") == ["es-de"]
+    assert resolve_route("hi", "de") == ["hi-en", "en-de"]
+    assert resolve_route("de", "de") == []
+
+def test_resolve_unsupported_pair():
+    with pytest.raises(TranslationException):
+        resolve_route("xx", "de")
+
+def test_lru_eviction_under_budget():
+    manager, loads = make_manager(budget_mb=2)
+    manager.get("en-de")
+    manager.get("de-en")
+    manager.get("en-de")          # touch: de-en is now least recently used
+    manager.get("en-fr")          # over budget -> evict de-en
+    assert manager.loaded_pairs() == ["en-de", "en-fr"]
+    assert manager.stats()["evictions"] == 1
+    assert loads.count("Helsinki-NLP/opus-mt-en-de") == 1
+
+def test_concurrent_loads_are_deduplicated():
+    manager, loads = make_manager(load_delay=0.1)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(manager.get("en-es"))) for _ in range(5)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert loads == ["Helsinki-NLP/opus-mt-en-es"]
+    assert len(results) == 5 and all(r == results[0] for r in results)
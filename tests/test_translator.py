@@ -0,0 +1,54 @@
+from src.backend import translator
+from src.backend.translation_models import TranslationModelManager
+
+class FakeEngine:
+    name = "fake"
+    size_bytes = 1
+
+    def __init__(self, model_name):
+        self.model_name = model_name
+        self.batches = []
+
+    def translate_batch(self, texts, max_length=512, num_beams=None):
+        self.batches.append(list(texts))
+        return [f"<{t}>" for t in texts]
+
+def use_fake_models(monkeypatch):
+    engines = {}
+    def loader(name):
+        engines[name] = FakeEngine(name)
+        return engines[name]
+    monkeypatch.setattr(translator, "MODEL_MANAGER", TranslationModelManager(loader))
+    return engines
+
+def test_split_sentences_keeps_separators():
+    pieces = translator.split_sentences("Hello there. How are you?\nFine!")
+    assert pieces == [("Hello there.", " "), ("How are you?", "\n"), ("Fine!", "")]
+
+def test_split_sentences_cuts_overlong_sentences():
+    pieces = translator.split_sentences("word " * 200, max_chars=50)
+    assert all(len(s) <= 50 for s, _ in pieces)
+
+def test_split_sentences_round_trips_the_text():
+    url = "https://example.com/" + "a" * 120
+    cjk = "\u4eca\u5929\u5929\u6c14\u5f88\u597d" * 30
+    for text in (url, cjk, "Siehe " + url + " und  dann   weiter. " + "word " * 40):
+        pieces = translator.split_sentences(text, max_chars=50)
+        assert all(len(s) <= 50 for s, _ in pieces)
+        assert "".join(s + sep for s, sep in pieces) == text
+
+def test_translate_batches_sorted_sentences_in_order(monkeypatch):
+    engines = use_fake_models(monkeypatch)
+    text = "A very long first sentence here. Short. Medium one here."
+    result = translator.translate(text, "en", "de", batch_size=2)
+    assert result["translated_text"] == "<A very long first sentence here.> <Short.> <Medium one here.>"
+    batches = engines["Helsinki-NLP/opus-mt-en-de"].batches
+    assert batches == [["Short.", "Medium one here."], ["A very long first sentence here."]]
+
+def test_translate_stream_matches_translate_with_pivot(monkeypatch):
+    use_fake_models(monkeypatch)
+    text = "Namaste. Aap kaise hain?"
+    chunks = list(translator.translate_stream(text, "hi", "de", batch_size=1))
+    assert len(chunks) == 2
+    assert "".join(chunks) == translator.translate(text, "hi", "de")["translated_text"]
+    assert translator.translate(text, "hi", "de")["route"] == ["hi-en", "en-de"]
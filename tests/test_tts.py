@@ -0,0 +1,74 @@
+import asyncio
+import pytest
+from src.backend import tts
+from src.backend.exceptions import TTSException
+
+class FakeEngine(tts.TTSEngine):
+    def __init__(self, name, fail=False, delay=0.0):
+        self.name = name
+        self.fail = fail
+        self.delay = delay
+        self.calls = 0
+
+    async def synthesize(self, text, lang, out_path, voice=None):
+        self.calls += 1
+        self.voice = voice
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("offline")
+        return f"{out_path}.{self.name}"
+
+@pytest.fixture
+def engines(monkeypatch):
+    primary, backup = FakeEngine("primary", fail=True), FakeEngine("backup")
+    monkeypatch.setattr(tts, "ENGINES", {"primary": primary, "backup": backup})
+    monkeypatch.setattr(tts, "_COOLDOWN", {})
+    monkeypatch.setattr(tts.settings, "tts_engines", "primary,backup")
+    monkeypatch.setattr(tts.settings, "tts_language_engines", "hi:backup")
+    return primary, backup
+
+def test_engines_for_language_override(engines):
+    assert tts.engines_for("de") == ["primary", "backup"]
+    assert tts.engines_for("hi") == ["backup"]
+
+def test_failover_and_cooldown(engines):
+    primary, backup = engines
+    assert asyncio.run(tts.synthesize("Hallo", "de", "out.mp3")) == "out.mp3.backup"
+    assert asyncio.run(tts.synthesize("Hallo", "de", "out.mp3")) == "out.mp3.backup"
+    assert primary.calls == 1   # skipped while cooling down
+
+def test_slow_engine_times_out(engines, monkeypatch):
+    primary, backup = engines
+    primary.fail, primary.delay = False, 1.0
+    monkeypatch.setattr(tts.settings, "tts_timeout_seconds", 0.05)
+    assert asyncio.run(tts.synthesize("Hallo", "de", "out.mp3")) == "out.mp3.backup"
+
+def test_all_engines_failing_raises(engines):
+    engines[1].fail = True
+    with pytest.raises(TTSException):
+        asyncio.run(tts.synthesize("Hallo", "de", "out.mp3"))
+
+def test_voice_reaches_the_engine(engines):
+    asyncio.run(tts.synthesize_to_file("Hallo", "out.mp3", lang="hi", voice="hi-IN-MadhurNeural"))
+    assert engines[1].voice == "hi-IN-MadhurNeural"
+
+def test_cooling_engines_are_still_tried_when_nothing_else_is_left(engines):
+    primary, backup = engines
+    now = tts.time.monotonic()
+    tts._COOLDOWN.update(primary=now + 60, backup=now + 30)
+    assert asyncio.run(tts.synthesize("Hallo", "de", "out.mp3")) == "out.mp3.backup"
+    assert primary.calls == 0   # backup's cooldown ends first, so it went first
+
+def test_failed_engine_leaves_no_partial_file(engines, tmp_path):
+    primary, backup = engines
+    out = tmp_path / "reply.mp3"
+
+    async def half_written(text, lang, out_path, voice=None):
+        primary.calls += 1
+        with open(out_path, "wb") as f:
+            f.write(b"\xff\xfb")
+        raise RuntimeError("connection reset")
+
+    primary.synthesize = half_written
+    assert asyncio.run(tts.synthesize("Hallo", "de", str(out))) == f"{out}.backup"
+    assert not out.exists()